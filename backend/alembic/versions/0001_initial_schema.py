@@ -0,0 +1,48 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+Databases created by ``Base.metadata.create_all`` before migrations existed
+already have these tables, so they are only created when missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    tables = sa.inspect(op.get_bind()).get_table_names()
+
+    if "pages" not in tables:
+        op.create_table(
+            "pages",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("title", sa.String()),
+            sa.Column("content", sa.JSON()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("is_public", sa.Boolean()),
+            sa.Column("share_token", sa.String(), unique=True, nullable=True),
+        )
+        op.create_index("ix_pages_id", "pages", ["id"])
+        op.create_index("ix_pages_title", "pages", ["title"])
+
+    if "fact_check_cache" not in tables:
+        op.create_table(
+            "fact_check_cache",
+            sa.Column("key", sa.String(64), primary_key=True),
+            sa.Column("result", sa.JSON(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_fact_check_cache_created_at", "fact_check_cache", ["created_at"])
+
+def downgrade() -> None:
+    op.drop_table("fact_check_cache")
+    op.drop_table("pages")
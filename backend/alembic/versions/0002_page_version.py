@@ -0,0 +1,24 @@
+"""add pages.version
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("pages")}
+    if "version" not in columns:
+        op.add_column("pages", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+def downgrade() -> None:
+    op.drop_column("pages", "version")
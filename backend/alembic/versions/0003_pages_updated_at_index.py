@@ -0,0 +1,24 @@
+"""index pages (updated_at, id) for keyset pagination
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    indexes = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("pages")}
+    if "ix_pages_updated_at_id" not in indexes:
+        op.create_index("ix_pages_updated_at_id", "pages", ["updated_at", "id"])
+
+def downgrade() -> None:
+    op.drop_index("ix_pages_updated_at_id", table_name="pages")
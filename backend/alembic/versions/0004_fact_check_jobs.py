@@ -0,0 +1,49 @@
+"""add fact_check_jobs and block_fact_checks
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if "fact_check_jobs" not in tables:
+        op.create_table(
+            "fact_check_jobs",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("page_id", sa.String(), nullable=False),
+            sa.Column("status", sa.String(16), nullable=False),
+            sa.Column("page_version", sa.Integer(), nullable=True),
+            sa.Column("blocks", sa.JSON(), nullable=True),
+            sa.Column("block_count", sa.Integer(), nullable=False),
+            sa.Column("checked_block_count", sa.Integer(), nullable=False),
+            sa.Column("reused_block_count", sa.Integer(), nullable=False),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index("ix_fact_check_jobs_page_id_created_at", "fact_check_jobs", ["page_id", "created_at"])
+    if "block_fact_checks" not in tables:
+        op.create_table(
+            "block_fact_checks",
+            sa.Column("page_id", sa.String(), primary_key=True),
+            sa.Column("block_hash", sa.String(64), primary_key=True),
+            sa.Column("claims", sa.JSON(), nullable=False),
+            sa.Column("checked_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+def downgrade() -> None:
+    op.drop_table("block_fact_checks")
+    op.drop_index("ix_fact_check_jobs_page_id_created_at", table_name="fact_check_jobs")
+    op.drop_table("fact_check_jobs")
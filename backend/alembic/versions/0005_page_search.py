@@ -0,0 +1,40 @@
+"""add pages.search_text and the full-text search vector
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+
+Existing pages are indexed by ``python -m app.services.page_search``, which
+runs in batches instead of inside this migration's transaction.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("pages")}
+    if "search_text" not in columns:
+        op.add_column("pages", sa.Column("search_text", sa.Text(), nullable=True))
+    if "search_vector" not in columns:
+        vector_type = postgresql.TSVECTOR() if bind.dialect.name == "postgresql" else sa.Text()
+        op.add_column("pages", sa.Column("search_vector", vector_type, nullable=True))
+
+    indexes = {index["name"] for index in inspector.get_indexes("pages")}
+    if bind.dialect.name == "postgresql" and "ix_pages_search_vector" not in indexes:
+        op.create_index("ix_pages_search_vector", "pages", ["search_vector"], postgresql_using="gin")
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_pages_search_vector", table_name="pages")
+    op.drop_column("pages", "search_vector")
+    op.drop_column("pages", "search_text")
@@ -0,0 +1,128 @@
+"""add page_blocks and pages.storage_mode, converting large pages to block rows
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+
+Pages with at least ``BLOCK_STORAGE_MIN_BLOCKS`` top-level blocks are split
+into ordered ``page_blocks`` rows; smaller pages stay in document mode and can
+be switched later through ``PUT /pages/{id}/storage``. Versions and
+updated_at are left alone, so clients see no change.
+
+"""
+import json
+import uuid
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.services.claims import iter_text_blocks
+from app.services.fractional_index import evenly_spaced_keys
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 100
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("pages")}
+    if "storage_mode" not in columns:
+        op.add_column(
+            "pages",
+            sa.Column("storage_mode", sa.String(16), nullable=False, server_default="document"),
+        )
+
+    if not inspector.has_table("page_blocks"):
+        # Fractional keys must sort byte-wise, not by the locale's collation
+        collation = "C" if bind.dialect.name == "postgresql" else None
+        op.create_table(
+            "page_blocks",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("page_id", sa.String(), nullable=False),
+            sa.Column("position", sa.String(collation=collation), nullable=False),
+            sa.Column("content", sa.JSON(), nullable=False),
+            sa.Column("text", sa.Text(), nullable=False, server_default=""),
+            sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_page_blocks_page_id_position", "page_blocks", ["page_id", "position"], unique=True)
+
+    if settings.block_storage_min_blocks > 0:
+        _convert_large_pages(bind, settings.block_storage_min_blocks)
+
+def _convert_large_pages(bind, min_blocks: int) -> None:
+    pages = sa.table(
+        "pages",
+        sa.column("id", sa.String()),
+        sa.column("content", sa.JSON()),
+        sa.column("storage_mode", sa.String()),
+    )
+    blocks = sa.table(
+        "page_blocks",
+        sa.column("id", sa.String()),
+        sa.column("page_id", sa.String()),
+        sa.column("position", sa.String()),
+        sa.column("content", sa.JSON()),
+        sa.column("text", sa.Text()),
+        sa.column("version", sa.Integer()),
+        sa.column("updated_at", sa.DateTime(timezone=True)),
+    )
+
+    last_id = ""
+    while True:
+        rows = bind.execute(
+            sa.select(pages.c.id, pages.c.content)
+            .where(pages.c.id > last_id, pages.c.storage_mode == "document")
+            .order_by(pages.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+
+        now = datetime.utcnow()
+        for row in rows:
+            content = row.content
+            if isinstance(content, str):
+                content = json.loads(content)
+            if not isinstance(content, list) or len(content) < min_blocks:
+                continue
+            bind.execute(blocks.insert(), [
+                {
+                    "id": str(uuid.uuid4()),
+                    "page_id": row.id,
+                    "position": position,
+                    "content": node,
+                    "text": "\n".join(text for _, text in iter_text_blocks([node])),
+                    "version": 1,
+                    "updated_at": now,
+                }
+                for position, node in zip(evenly_spaced_keys(len(content)), content)
+            ])
+            bind.execute(
+                pages.update().where(pages.c.id == row.id).values(content=[], storage_mode="blocks")
+            )
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    pages = sa.table("pages", sa.column("id", sa.String()), sa.column("content", sa.JSON()),
+                     sa.column("storage_mode", sa.String()))
+    blocks = sa.table("page_blocks", sa.column("page_id", sa.String()), sa.column("position", sa.String()),
+                      sa.column("content", sa.JSON()))
+    page_ids = bind.execute(sa.select(pages.c.id).where(pages.c.storage_mode == "blocks")).scalars().all()
+    for page_id in page_ids:
+        content = bind.execute(
+            sa.select(blocks.c.content).where(blocks.c.page_id == page_id).order_by(blocks.c.position)
+        ).scalars().all()
+        bind.execute(pages.update().where(pages.c.id == page_id).values(content=list(content)))
+
+    op.drop_index("ix_page_blocks_page_id_position", table_name="page_blocks")
+    op.drop_table("page_blocks")
+    op.drop_column("pages", "storage_mode")
@@ -0,0 +1,35 @@
+"""add page_versions for snapshot and delta page history
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00
+
+Existing pages get their first snapshot on their next write.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("page_versions"):
+        op.create_table(
+            "page_versions",
+            sa.Column("page_id", sa.String(), primary_key=True),
+            sa.Column("version", sa.Integer(), primary_key=True),
+            sa.Column("kind", sa.String(8), nullable=False),
+            sa.Column("encoding", sa.String(8), nullable=False),
+            sa.Column("payload", sa.LargeBinary(), nullable=False),
+            sa.Column("size", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+def downgrade() -> None:
+    op.drop_table("page_versions")
@@ -0,0 +1,127 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from .config import settings
+
+_request_id: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="")
+# Background work (workers, startup) logs in full; requests are sampled
+_sampled: contextvars.ContextVar[bool] = contextvars.ContextVar("log_sampled", default=True)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional["_NonBlockingQueueHandler"] = None
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread; drops them rather than block when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve what may not survive the hop to another thread (the
+        # arguments and traceback); formatting happens in the listener
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _ContextFilter(logging.Filter):
+    """Tags records with the request id and drops unsampled requests' debug/info records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        return record.levelno >= logging.WARNING or _sampled.get()
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", ""):
+            entry["requestId"] = record.request_id
+        entry.update(getattr(record, "fields", None) or {})
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and key != "fields":
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+def configure_logging(level: Optional[str] = None, format: Optional[str] = None) -> None:
+    """Route all logging through a bounded queue to a background writer thread.
+
+    Safe to call more than once; only the first call installs handlers.
+    """
+    global _listener, _handler
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    if (format or settings.log_format) == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+    _handler = _NonBlockingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    _handler.addFilter(_ContextFilter())
+    root = logging.getLogger()
+    root.handlers = [_handler]
+    root.setLevel((level or settings.log_level).upper())
+    # Uvicorn's access log duplicates the request log written by MetricsMiddleware
+    logging.getLogger("uvicorn.access").disabled = True
+    # httpx logs every provider call at INFO, including URLs carrying API keys
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    for name in ("uvicorn", "uvicorn.error"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+
+    _listener = logging.handlers.QueueListener(_handler.queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def begin_request(request_id: Optional[str] = None) -> Tuple[contextvars.Token, contextvars.Token]:
+    """Give the current request an id and decide once whether its info logs are kept."""
+    return (
+        _request_id.set(request_id or uuid.uuid4().hex[:16]),
+        _sampled.set(random.random() < settings.log_sample_rate),
+    )
+
+def end_request(tokens: Tuple[contextvars.Token, contextvars.Token]) -> None:
+    _request_id.reset(tokens[0])
+    _sampled.reset(tokens[1])
+
+def request_id() -> str:
+    return _request_id.get()
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler is not None else 0
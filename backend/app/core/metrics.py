@@ -0,0 +1,276 @@
+import bisect
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from . import log
+
+# Seconds; covers fast cache hits up to slow provider calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, values: LabelValues, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{self._labels(key)} {_number(value)}"
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{self._labels(key)} {_number(value)}"
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+
+    def samples(self) -> Iterable[str]:
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _number(bound)
+                bucket = 'le="' + le + '"'
+                yield f"{self.name}_bucket{self._labels(key, bucket)} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {_number(total[0])}"
+            yield f"{self.name}_count{self._labels(key)} {cumulative}"
+
+class CallbackMetric(_Metric):
+    """A counter or gauge read from existing service state at scrape time."""
+
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[LabelValues, float]]]):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self.collect():
+            yield f"{self.name}{self._labels(key)} {_number(value)}"
+
+class Registry:
+    """Process-local metrics in the Prometheus text exposition format.
+
+    Updates are plain dict arithmetic on the event loop thread, so recording
+    a sample costs about as much as a dict lookup.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, kind: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[LabelValues, float]]]) -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, kind, labelnames, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                logging.getLogger(__name__).warning("Could not collect %s: %s", metric.name, e)
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ["method", "route", "status"]
+)
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests being served")
+provider_call_duration = registry.histogram(
+    "provider_call_duration_seconds", "Fact-check provider call latency", ["provider", "outcome"]
+)
+provider_fallbacks = registry.counter(
+    "provider_fallbacks_total", "Fact-checks that moved past a provider, by reason", ["provider", "reason"]
+)
+fact_check_verdicts = registry.counter(
+    "fact_check_verdicts_total", "Fact-check verdicts by where they came from", ["source"]
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "Database statement execution time", ["operation"]
+)
+db_errors = registry.counter("db_errors_total", "Database statements that raised", ["operation"])
+log_records_dropped = registry.callback(
+    "log_records_dropped_total", "Log records dropped because the log queue was full", "counter", [],
+    lambda: [((), log.dropped_records())],
+)
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request and scoping its log sampling.
+
+    Requests are labelled by route template (``/api/pages/{page_id}``), not
+    raw path, so label cardinality stays bounded. Streaming responses are
+    timed until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.logger = logging.getLogger("app.request")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _header(scope, b"x-request-id")
+        tokens = log.begin_request(request_id)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", log.request_id().encode())]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            http_requests_in_flight.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_request_duration.observe(duration, method=scope["method"], route=route, status=status)
+            self.logger.info(
+                "%s %s %s", scope["method"], route, status,
+                extra={"fields": {"path": scope["path"], "status": status, "durationMs": round(duration * 1000, 2)}},
+            )
+            log.end_request(tokens)
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")[:128]
+    return None
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement and expose connection pool usage."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        db_query_duration.observe(time.perf_counter() - started, operation=_operation(statement))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        db_errors.inc(operation=_operation(context.statement or ""))
+
+    pool = sync_engine.pool
+
+    def pool_usage():
+        usage = []
+        for state, reader in (("checked_out", "checkedout"), ("idle", "checkedin"), ("overflow", "overflow")):
+            method = getattr(pool, reader, None)
+            if method is not None:
+                usage.append(((state,), max(method(), 0)))
+        return usage
+
+    registry.callback("db_pool_connections", "Database pool connections by state", "gauge", ["state"], pool_usage)
+    if hasattr(pool, "size"):
+        registry.callback("db_pool_size", "Configured database pool size", "gauge", [], lambda: [((), pool.size())])
+
+def _operation(statement: str) -> str:
+    word = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    return word if word in ("select", "insert", "update", "delete", "with") else "other"
@@ -0,0 +1,26 @@
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+else:
+    DefaultResponse = JSONResponse
+
+def dumps(value: Any) -> bytes:
+    """Compact JSON bytes, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,32 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+def event_stream(events: AsyncIterator[Tuple[str, Any]], format: str) -> StreamingResponse:
+    """Encode (event, data) pairs as Server-Sent Events or NDJSON."""
+    async def encode():
+        # An immediate first event gets headers and a byte to the client right away
+        yield encode_event("start", {}, format)
+        try:
+            async for event, data in events:
+                yield encode_event(event, data, format)
+        except Exception as e:
+            logger.error("Streaming fact check error: %s", e)
+            yield encode_event("error", {"detail": f"Fact check failed: {str(e)}"}, format)
+        yield encode_event("done", {}, format)
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(
+        encode(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def encode_event(event: str, data: Any, format: str) -> str:
+    if format == "ndjson":
+        return json.dumps({"event": event, "data": data}) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -1,23 +1,47 @@
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 
 from .core.database import engine
-from .models import database
+from .core.log import configure_logging
+from .core.metrics import MetricsMiddleware, instrument_engine, registry
+from .core.serialization import DefaultResponse
 from .routers import pages, ai
+from .services.admission import admission
+from .services.ai_service import ai_service
+from .services.fact_check_cache import fact_check_cache
+from .services.fact_check_jobs import fact_check_jobs
+from .services.page_history import page_history
+from .services.page_transfer import page_transfer
+from .services.shared_page_cache import shared_page_cache
+from .services.write_coalescer import write_coalescer
+
+configure_logging()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    database.Base.metadata.create_all(bind=engine)
+    # The schema is managed by Alembic (python -m app.serve runs it before
+    # starting workers), keeping DDL off every process's cold start
+    await ai_service.startup()
+    await write_coalescer.start()
+    await fact_check_jobs.start()
+    await page_history.start()
     yield
+    await page_history.stop()
+    await fact_check_jobs.stop()
+    await write_coalescer.stop()
+    await ai_service.shutdown()
+    await engine.dispose()
 
 app = FastAPI(
     title="AI Fact-Check Editor API",
     description="Backend API for AI fact-checking editor with Plate.js",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=DefaultResponse
 )
 
 frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
@@ -30,6 +54,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+
+registry.callback(
+    "admission_requests", "Fact-checks holding or waiting for a provider slot", "gauge", ["state"],
+    lambda: [(("active",), admission.snapshot()["active"]), (("queued",), admission.snapshot()["queued"])],
+)
+registry.callback(
+    "provider_circuit_open", "1 while a provider's circuit breaker is open", "gauge", ["provider"],
+    lambda: [((name,), int(not health.available)) for name, health in ai_service.provider_health.items()],
+)
+registry.callback(
+    "cache_lookups_total", "Cache lookups by cache and result", "counter", ["cache", "result"],
+    lambda: [
+        (("fact_check", "hit"), fact_check_cache.stats()["hits"]),
+        (("fact_check", "miss"), fact_check_cache.stats()["misses"]),
+        (("shared_page", "hit"), shared_page_cache.stats()["hits"]),
+        (("shared_page", "miss"), shared_page_cache.stats()["misses"]),
+    ],
+)
+
 app.include_router(pages.router, prefix="/api")
 app.include_router(ai.router, prefix="/api")
 
@@ -37,6 +82,18 @@ app.include_router(ai.router, prefix="/api")
 async def root():
     return {"message": "AI Fact-Check Editor API"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {
+        "status": "healthy",
+        "factCheckCache": fact_check_cache.stats(),
+        "writeCoalescer": write_coalescer.stats(),
+        "sharedPageCache": shared_page_cache.stats(),
+        "factCheckJobs": fact_check_jobs.stats(),
+        "pageHistory": page_history.stats(),
+        "pageTransfer": page_transfer.stats(),
+    }
\ No newline at end of file
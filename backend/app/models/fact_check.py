@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Text, Index
+from sqlalchemy.sql import func
+from .database import Base
+import uuid
+
+class FactCheckCacheEntry(Base):
+    __tablename__ = "fact_check_cache"
+
+    key = Column(String(64), primary_key=True)
+    result = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class FactCheckJob(Base):
+    __tablename__ = "fact_check_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    page_id = Column(String, nullable=False)
+    # queued -> running -> completed | failed
+    status = Column(String(16), nullable=False, default="queued")
+    page_version = Column(Integer, nullable=True)
+    # [{"path": [...], "hash": "..."}] for every text block, in document order
+    blocks = Column(JSON, nullable=True)
+    block_count = Column(Integer, nullable=False, default=0)
+    checked_block_count = Column(Integer, nullable=False, default=0)
+    reused_block_count = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_fact_check_jobs_page_id_created_at", "page_id", "created_at"),
+    )
+
+class BlockFactCheck(Base):
+    """Claim verdicts for one block of a page, keyed by the block's text hash."""
+    __tablename__ = "block_fact_checks"
+
+    page_id = Column(String, primary_key=True)
+    block_hash = Column(String(64), primary_key=True)
+    # [{"text", "start", "end", "result", "confidence", "sources"}] per claim
+    claims = Column(JSON, nullable=False)
+    checked_at = Column(DateTime(timezone=True), server_default=func.now())
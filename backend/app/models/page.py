@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, LargeBinary, Text, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from .database import Base
 import uuid
@@ -12,4 +14,53 @@ class Page(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
     is_public = Column(Boolean, default=False)
-    share_token = Column(String, unique=True, nullable=True)
\ No newline at end of file
+    share_token = Column(String, unique=True, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # "document": content holds the whole tree; "blocks": top-level nodes live in page_blocks
+    storage_mode = Column(String(16), nullable=False, default="document", server_default="document")
+    # Plain text of the Slate content and its full-text vector, maintained on
+    # writes that change the content (see services/page_search.py)
+    search_text = deferred(Column(Text, nullable=True))
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True))
+
+    __table_args__ = (
+        # Keyset pagination for the sidebar listing, newest first
+        Index("ix_pages_updated_at_id", "updated_at", "id"),
+        Index("ix_pages_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
+    # Every ORM UPDATE is conditional on the loaded version and increments it
+    __mapper_args__ = {"version_id_col": version}
+
+class PageBlock(Base):
+    """One top-level Slate node of a page stored in block mode."""
+    __tablename__ = "page_blocks"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    page_id = Column(String, nullable=False)
+    # Fractional index key; blocks are ordered by byte-wise string comparison,
+    # hence the "C" collation on Postgres
+    position = Column(String().with_variant(String(collation="C"), "postgresql"), nullable=False)
+    content = Column(JSON, nullable=False)
+    # Plain text of the node, aggregated into pages.search_text
+    text = Column(Text, nullable=False, default="")
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_page_blocks_page_id_position", "page_id", "position", unique=True),
+    )
+
+class PageVersion(Base):
+    """One entry of a page's history: a full snapshot, or a delta from the previous entry."""
+    __tablename__ = "page_versions"
+
+    page_id = Column(String, primary_key=True)
+    version = Column(Integer, primary_key=True)
+    # "snapshot": {"title", "content"}; "delta": {"ops": JSON Patch, "title"?}
+    kind = Column(String(8), nullable=False)
+    # Compression of the JSON payload: "zlib" or "zstd"
+    encoding = Column(String(8), nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,34 +1,152 @@
+from typing import Any, List, Literal, Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 import logging
 
+from ..core.config import settings
+from ..core.streaming import event_stream
+from ..services.admission import admission, AdmissionRejected
 from ..services.ai_service import ai_service
+from ..services.claims import Claim, extract_claims, split_claims
+from ..services.fact_check_cache import fact_check_cache
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
+Priority = Literal["interactive", "bulk"]
+
 class FactCheckRequest(BaseModel):
     text: str
+    priority: Priority = "interactive"
 
 class FactCheckResponse(BaseModel):
     result: str
     confidence: float
     sources: list = []
+    cached: bool = False
+    # Set when the verdict was reused from a reworded earlier claim
+    matchScore: Optional[float] = None
+    matchedText: Optional[str] = None
+    # False when the text was not sent to a provider because it is not a
+    # factual claim; category says why (opinion, question, fragment, ...)
+    checkable: bool = True
+    category: Optional[str] = None
+
+class BatchFactCheckRequest(BaseModel):
+    texts: Optional[List[str]] = None
+    content: Optional[List[Any]] = None
+    priority: Priority = "bulk"
+
+class ClaimFactCheckResponse(FactCheckResponse):
+    text: str
+    textIndex: Optional[int] = None
+    path: Optional[List[int]] = None
+    start: int
+    end: int
+
+class BatchFactCheckResponse(BaseModel):
+    results: List[ClaimFactCheckResponse]
+    claimCount: int
+    uniqueClaimCount: int
+
+def _batch_claims(request: BatchFactCheckRequest) -> List[Claim]:
+    if request.texts is None and request.content is None:
+        raise HTTPException(status_code=400, detail="Either texts or content is required")
+
+    claims = []
+    for index, text in enumerate(request.texts or []):
+        claims.extend(split_claims(text, text_index=index))
+    if request.content is not None:
+        claims.extend(extract_claims(request.content))
+
+    if len(claims) > settings.batch_max_claims:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many claims ({len(claims)}); the limit is {settings.batch_max_claims}"
+        )
+    return claims
+
+def _claim_response(claim: Claim, verdict: dict) -> ClaimFactCheckResponse:
+    return ClaimFactCheckResponse(
+        text=claim.text,
+        textIndex=claim.text_index,
+        path=claim.path,
+        start=claim.start,
+        end=claim.end,
+        **verdict
+    )
+
+def _too_busy(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=str(e),
+        headers={"Retry-After": str(int(e.retry_after + 0.999))},
+    )
 
 @router.post("/fact-check", response_model=FactCheckResponse)
 async def fact_check(request: FactCheckRequest):
     try:
-        logger.info(f"Received fact-check request for text: '{request.text}'")
-        
         if not request.text or not request.text.strip():
             raise HTTPException(status_code=400, detail="Text is required")
             
-        result = await ai_service.fact_check(request.text)
-        logger.info(f"Fact-check result: {result}")
+        result = await ai_service.fact_check(request.text, request.priority)
+        logger.debug("Fact-checked %d characters (confidence %s, cached %s)",
+                     len(request.text), result.get("confidence"), result.get("cached", False))
         
         return FactCheckResponse(**result)
+    except AdmissionRejected as e:
+        raise _too_busy(e)
     except Exception as e:
-        logger.error(f"Fact check error: {e}")
-        raise HTTPException(status_code=500, detail=f"Fact check failed: {str(e)}")
\ No newline at end of file
+        logger.error("Fact check error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Fact check failed: {str(e)}")
+
+@router.post("/fact-check/batch", response_model=BatchFactCheckResponse)
+async def fact_check_batch(request: BatchFactCheckRequest):
+    claims = _batch_claims(request)
+    try:
+        verdicts = await ai_service.fact_check_many([claim.text for claim in claims], request.priority)
+    except AdmissionRejected as e:
+        raise _too_busy(e)
+
+    return BatchFactCheckResponse(
+        results=[_claim_response(claim, verdict) for claim, verdict in zip(claims, verdicts)],
+        claimCount=len(claims),
+        uniqueClaimCount=len({fact_check_cache.make_key(claim.text) for claim in claims}),
+    )
+
+@router.post("/fact-check/stream")
+async def fact_check_stream(request: FactCheckRequest, format: Literal["sse", "ndjson"] = "sse"):
+    if not request.text or not request.text.strip():
+        raise HTTPException(status_code=400, detail="Text is required")
+    try:
+        admission.check()
+    except AdmissionRejected as e:
+        raise _too_busy(e)
+
+    return event_stream(ai_service.fact_check_stream(request.text, request.priority), format)
+
+@router.post("/fact-check/batch/stream")
+async def fact_check_batch_stream(request: BatchFactCheckRequest, format: Literal["sse", "ndjson"] = "sse"):
+    claims = _batch_claims(request)
+    try:
+        admission.check()
+    except AdmissionRejected as e:
+        raise _too_busy(e)
+
+    claims_by_key = {}
+    for claim in claims:
+        claims_by_key.setdefault(fact_check_cache.make_key(claim.text), []).append(claim)
+
+    async def events():
+        yield "claims", {"claimCount": len(claims), "uniqueClaimCount": len(claims_by_key)}
+        texts = [claim.text for claim in claims]
+        async for key, verdict in ai_service.iter_fact_check_many(texts, request.priority):
+            for claim in claims_by_key[key]:
+                yield "claim", _claim_response(claim, verdict).model_dump()
+
+    return event_stream(events(), format)
+
+@router.get("/providers")
+async def provider_status():
+    return ai_service.provider_status()
@@ -1,69 +1,332 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.config import settings
 from ..core.database import get_db
-from ..schemas.page import Page, PageCreate, PageUpdate, ShareResponse
-from ..services.page_service import page_service
+from ..core.streaming import event_stream
+from ..schemas.fact_check import FactCheckJob
+from ..schemas.page import (
+    Page, PageBlock, PageBlockCreate, PageBlockRange, PageBlockUpdate, PageBlockWriteResponse, PageCreate,
+    PageImportResult, PageUpdate, PagePatch, PagePatchResponse, PageSearchResults, PageStorage, PageSummaryList, PageVersionContent,
+    PageVersionList, ShareResponse
+)
+from ..services.content_patch import PatchError
+from ..services.fact_check_jobs import fact_check_jobs
+from ..services.page_service import page_service, StorageModeError, VersionConflictError
+from ..services.page_transfer import page_transfer
+from ..services.shared_page_cache import shared_page_cache
+from ..services.write_coalescer import write_coalescer
 
 router = APIRouter(prefix="/pages", tags=["pages"])
 
+def _etag(version: int) -> str:
+    return f'"{version}"'
+
+def _if_match_version(if_match: Optional[str]) -> Optional[int]:
+    """The page version an If-Match header requires, or None for no condition."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.split(",")[0].strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid If-Match header")
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def _not_modified(request: Request, etag: str, last_modified: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in tags or "*" in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _conditional_json(request: Request, body: bytes, etag: str, last_modified: str,
+                      cache_control: str) -> Response:
+    """A pre-serialized JSON body, or 304 when the client's copy is current."""
+    headers = {"ETag": etag, "Last-Modified": last_modified, "Cache-Control": cache_control}
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _version_conflict(e: VersionConflictError) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail={"message": "Page has been modified", "currentVersion": e.current_version},
+        headers={"ETag": _etag(e.current_version)},
+    )
+
+def _block_response(block, page_version: int, updated_at: datetime, response: Response) -> PageBlockWriteResponse:
+    response.headers["ETag"] = _etag(page_version)
+    return PageBlockWriteResponse(
+        id=block.id, position=block.position, version=block.version, pageVersion=page_version, updatedAt=updated_at
+    )
+
 @router.post("/", response_model=Page)
-def create_page(page: PageCreate, db: Session = Depends(get_db)):
-    return page_service.create_page(db=db, page=page)
+async def create_page(page: PageCreate, db: AsyncSession = Depends(get_db)):
+    return await page_service.create_page(db=db, page=page)
 
 @router.get("/", response_model=List[Page])
-def read_pages(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return page_service.get_pages(db, skip=skip, limit=limit)
+async def read_pages(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+    return await page_service.get_pages(db, skip=skip, limit=limit)
 
 # IMPORTANT: Put specific routes BEFORE generic ones
+@router.get("/summaries", response_model=PageSummaryList)
+async def read_page_summaries(limit: int = Query(default=50, ge=1, le=500), cursor: Optional[str] = None,
+                              db: AsyncSession = Depends(get_db)):
+    try:
+        rows, next_cursor = await page_service.get_page_summaries(db, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return PageSummaryList(items=rows, nextCursor=next_cursor)
+
+@router.get("/search", response_model=PageSearchResults)
+async def search_pages(q: str = Query(min_length=1, max_length=500), limit: int = Query(default=20, ge=1, le=100),
+                       cursor: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    try:
+        rows, next_cursor = await page_service.search_pages(db, query=q, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return PageSearchResults(items=rows, nextCursor=next_cursor)
+
+@router.get("/export")
+async def export_pages(gzip: bool = False):
+    filename = f"pages-{datetime.utcnow():%Y%m%d-%H%M%S}.ndjson" + (".gz" if gzip else "")
+    return StreamingResponse(
+        page_transfer.export(compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/import", response_model=PageImportResult)
+async def import_pages(request: Request):
+    summary = await page_transfer.import_pages(request.stream())
+    return PageImportResult(
+        imported=summary.imported, skipped=summary.skipped, failed=summary.failed, errors=summary.errors
+    )
+
 @router.get("/shared/{token}", response_model=Page)
-def read_shared_page(token: str, db: Session = Depends(get_db)):
-    print(f"[ROUTER] Received request for shared page with token: {token}")
-    
-    db_page = page_service.get_page_by_share_token(db, token=token)
-    
-    if db_page is None:
-        print(f"[ROUTER] No shared page found for token: {token}")
-        raise HTTPException(status_code=404, detail="Shared page not found or not public")
-    
-    print(f"[ROUTER] Successfully found shared page: {db_page.id}")
-    return db_page
+async def read_shared_page(token: str, request: Request, db: AsyncSession = Depends(get_db)):
+    entry = shared_page_cache.get(token)
+    if entry is None:
+        page_json = await page_service.get_page_json(db, share_token=token)
+        if page_json is not None and await write_coalescer.flush_page(page_json.id):
+            # Serve the latest acknowledged autosave, not the row it will replace
+            page_json = await page_service.get_page_json(db, share_token=token)
+        if page_json is None:
+            # Never cached, so a CDN does not keep hiding the page once it is shared again
+            raise HTTPException(status_code=404, detail="Shared page not found or not public",
+                                headers={"Cache-Control": "no-store"})
+
+        entry = shared_page_cache.set(
+            token,
+            page_id=page_json.id,
+            body=page_json.body,
+            etag=_etag(page_json.version),
+            last_modified=_http_date(page_json.updated_at),
+        )
+
+    cache_control = f"public, max-age={settings.shared_page_max_age}, s-maxage={settings.shared_page_s_maxage}"
+    return _conditional_json(request, entry.body, entry.etag, entry.last_modified, cache_control)
 
 @router.post("/{page_id}/share")
-def share_page(page_id: str, db: Session = Depends(get_db)):
-    print(f"[ROUTER] Sharing page: {page_id}")
-    share_token = page_service.share_page(db, page_id=page_id)
+async def share_page(page_id: str, db: AsyncSession = Depends(get_db)):
+    await write_coalescer.flush_page(page_id)
+    share_token = await page_service.share_page(db, page_id=page_id)
     if share_token is None:
         raise HTTPException(status_code=404, detail="Page not found")
     return {"shareToken": share_token}  
 
 @router.delete("/{page_id}/share")
-def unshare_page(page_id: str, db: Session = Depends(get_db)):
-    print(f"[ROUTER] Unsharing page: {page_id}")
-    success = page_service.unshare_page(db, page_id=page_id)
+async def unshare_page(page_id: str, db: AsyncSession = Depends(get_db)):
+    await write_coalescer.flush_page(page_id)
+    success = await page_service.unshare_page(db, page_id=page_id)
     if not success:
         raise HTTPException(status_code=404, detail="Page not found")
     return {"message": "Page unshared successfully"}
 
+@router.post("/{page_id}/fact-check", response_model=FactCheckJob, status_code=202)
+async def start_page_fact_check(page_id: str, db: AsyncSession = Depends(get_db)):
+    await write_coalescer.flush_page(page_id)
+    job = await fact_check_jobs.enqueue(db, page_id=page_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Page not found")
+    return FactCheckJob.model_validate(job)
+
+@router.get("/{page_id}/fact-check/{job_id}", response_model=FactCheckJob)
+async def read_page_fact_check(page_id: str, job_id: str, db: AsyncSession = Depends(get_db)):
+    job = await fact_check_jobs.get_job(db, page_id=page_id, job_id=job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Fact-check job not found")
+    return job
+
+@router.get("/{page_id}/fact-check/{job_id}/stream")
+async def stream_page_fact_check(page_id: str, job_id: str, format: Literal["sse", "ndjson"] = "sse",
+                                 db: AsyncSession = Depends(get_db)):
+    events = await fact_check_jobs.subscribe(db, page_id=page_id, job_id=job_id)
+    if events is None:
+        raise HTTPException(status_code=404, detail="Fact-check job not found")
+    return event_stream(events, format)
+
+@router.get("/{page_id}/versions", response_model=PageVersionList)
+async def read_page_versions(page_id: str, limit: int = Query(default=50, ge=1, le=500),
+                             before: Optional[int] = None, db: AsyncSession = Depends(get_db)):
+    await write_coalescer.flush_page(page_id)
+    result = await page_service.get_versions(db, page_id=page_id, limit=limit, before=before)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Page not found")
+    rows, next_cursor = result
+    return PageVersionList(items=rows, nextCursor=next_cursor)
+
+@router.get("/{page_id}/versions/{version}", response_model=PageVersionContent)
+async def read_page_version(page_id: str, version: int, db: AsyncSession = Depends(get_db)):
+    await write_coalescer.flush_page(page_id)
+    result = await page_service.get_version(db, page_id=page_id, version=version)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    created_at, title, content = result
+    return PageVersionContent(pageId=page_id, version=version, title=title, content=content, createdAt=created_at)
+
+@router.put("/{page_id}/storage")
+async def set_page_storage(page_id: str, storage: PageStorage, response: Response,
+                           db: AsyncSession = Depends(get_db)):
+    await write_coalescer.flush_page(page_id)
+    db_page = await page_service.set_storage_mode(db, page_id=page_id, mode=storage.mode)
+    if db_page is None:
+        raise HTTPException(status_code=404, detail="Page not found")
+    response.headers["ETag"] = _etag(db_page.version)
+    return {"storageMode": db_page.storage_mode, "version": db_page.version}
+
+@router.get("/{page_id}/blocks", response_model=PageBlockRange)
+async def read_page_blocks(page_id: str, limit: int = Query(default=50, ge=1, le=500), cursor: Optional[str] = None,
+                           db: AsyncSession = Depends(get_db)):
+    await write_coalescer.flush_page(page_id)
+    try:
+        result = await page_service.get_block_range(db, page_id=page_id, limit=limit, cursor=cursor)
+    except StorageModeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Page not found")
+    page_version, blocks, next_cursor = result
+    return PageBlockRange(
+        pageId=page_id,
+        pageVersion=page_version,
+        items=[PageBlock(id=b.id, position=b.position, version=b.version, content=b.content) for b in blocks],
+        nextCursor=next_cursor,
+    )
+
+@router.post("/{page_id}/blocks", response_model=PageBlockWriteResponse, status_code=201)
+async def create_page_block(page_id: str, block: PageBlockCreate, response: Response,
+                            db: AsyncSession = Depends(get_db)):
+    await write_coalescer.flush_page(page_id)
+    try:
+        result = await page_service.insert_block(
+            db, page_id=page_id, content=block.content, after_id=block.afterId, before_id=block.beforeId
+        )
+    except StorageModeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except VersionConflictError as e:
+        raise _version_conflict(e)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Page or neighbour block not found")
+    return _block_response(*result, response)
+
+@router.put("/{page_id}/blocks/{block_id}", response_model=PageBlockWriteResponse)
+async def update_page_block(page_id: str, block_id: str, block: PageBlockUpdate, response: Response,
+                            db: AsyncSession = Depends(get_db)):
+    await write_coalescer.flush_page(page_id)
+    try:
+        result = await page_service.update_block(
+            db, page_id=page_id, block_id=block_id, content=block.content, base_version=block.baseVersion
+        )
+    except VersionConflictError as e:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Block has been modified", "currentVersion": e.current_version},
+        )
+    if result is None:
+        raise HTTPException(status_code=404, detail="Block not found")
+    return _block_response(*result, response)
+
+@router.delete("/{page_id}/blocks/{block_id}", response_model=PagePatchResponse)
+async def delete_page_block(page_id: str, block_id: str, response: Response, db: AsyncSession = Depends(get_db)):
+    await write_coalescer.flush_page(page_id)
+    result = await page_service.delete_block(db, page_id=page_id, block_id=block_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Block not found")
+    version, updated_at = result
+    response.headers["ETag"] = _etag(version)
+    return PagePatchResponse(version=version, updatedAt=updated_at)
+
 # Generic routes go AFTER specific ones
 @router.get("/{page_id}", response_model=Page)
-def read_page(page_id: str, db: Session = Depends(get_db)):
-    db_page = page_service.get_page(db, page_id=page_id)
-    if db_page is None:
+async def read_page(page_id: str, request: Request, db: AsyncSession = Depends(get_db)):
+    # A write the flush dropped is reported to the next PUT, not to readers
+    await write_coalescer.flush_page(page_id)
+    page_json = await page_service.get_page_json(db, page_id=page_id)
+    if page_json is None:
         raise HTTPException(status_code=404, detail="Page not found")
-    return db_page
+    return _conditional_json(
+        request, page_json.body, _etag(page_json.version), _http_date(page_json.updated_at), "no-cache"
+    )
 
 @router.put("/{page_id}", response_model=Page)
-def update_page(page_id: str, page: PageUpdate, db: Session = Depends(get_db)):
-    db_page = page_service.update_page(db, page_id=page_id, page_update=page)
+async def update_page(page_id: str, page: PageUpdate, response: Response,
+                      if_match: Optional[str] = Header(default=None),
+                      db: AsyncSession = Depends(get_db)):
+    expected_version = _if_match_version(if_match)
+    try:
+        if write_coalescer.enabled:
+            db_page = await write_coalescer.submit(db, page_id, page, expected_version=expected_version)
+        else:
+            db_page = await page_service.update_page(
+                db, page_id=page_id, page_update=page, expected_version=expected_version
+            )
+    except VersionConflictError as e:
+        raise _version_conflict(e)
+
     if db_page is None:
         raise HTTPException(status_code=404, detail="Page not found")
+    response.headers["ETag"] = _etag(db_page.version)
     return db_page
 
+@router.patch("/{page_id}", response_model=PagePatchResponse)
+async def patch_page(page_id: str, page_patch: PagePatch, response: Response,
+                     db: AsyncSession = Depends(get_db)):
+    await write_coalescer.flush_page(page_id)
+    try:
+        result = await page_service.patch_page(db, page_id=page_id, page_patch=page_patch)
+    except VersionConflictError as e:
+        raise _version_conflict(e)
+    except PatchError as e:
+        raise HTTPException(status_code=422, detail=f"Patch could not be applied: {e}")
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="Page not found")
+    version, updated_at = result
+    response.headers["ETag"] = _etag(version)
+    return PagePatchResponse(version=version, updatedAt=updated_at)
+
 @router.delete("/{page_id}")
-def delete_page(page_id: str, db: Session = Depends(get_db)):
-    success = page_service.delete_page(db, page_id=page_id)
+async def delete_page(page_id: str, db: AsyncSession = Depends(get_db)):
+    write_coalescer.discard(page_id)
+    success = await page_service.delete_page(db, page_id=page_id)
     if not success:
         raise HTTPException(status_code=404, detail="Page not found")
     return {"message": "Page deleted successfully"}
\ No newline at end of file
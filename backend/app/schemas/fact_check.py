@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+from datetime import datetime
+
+class ClaimVerdict(BaseModel):
+    text: str
+    start: int
+    end: int
+    result: str
+    confidence: float
+    sources: List[Any] = []
+
+class BlockFactCheckResult(BaseModel):
+    path: List[int]
+    hash: str
+    reused: bool = False
+    claims: List[ClaimVerdict] = []
+
+class FactCheckJob(BaseModel):
+    id: str
+    pageId: str = Field(validation_alias="page_id")
+    status: str
+    pageVersion: Optional[int] = Field(default=None, validation_alias="page_version")
+    blockCount: int = Field(default=0, validation_alias="block_count")
+    checkedBlockCount: int = Field(default=0, validation_alias="checked_block_count")
+    reusedBlockCount: int = Field(default=0, validation_alias="reused_block_count")
+    error: Optional[str] = None
+    createdAt: Optional[datetime] = Field(default=None, validation_alias="created_at")
+    startedAt: Optional[datetime] = Field(default=None, validation_alias="started_at")
+    finishedAt: Optional[datetime] = Field(default=None, validation_alias="finished_at")
+    results: Optional[List[BlockFactCheckResult]] = None
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
@@ -1,7 +1,9 @@
-from typing import List, Optional, Any
+from typing import List, Literal, Optional, Any, Dict
 from datetime import datetime
 from pydantic import BaseModel, Field
 
+from ..core.serialization import dumps
+
 class PageBase(BaseModel):
     title: str
     content: Optional[List[Any]] = []
@@ -19,6 +21,8 @@ class Page(PageBase):
     updatedAt: datetime = Field(alias="updated_at") 
     isPublic: bool = Field(alias="is_public")
     shareToken: Optional[str] = Field(alias="share_token", default=None)
+    version: int = 1
+    storageMode: str = Field(alias="storage_mode", default="document")
 
     class Config:
         from_attributes = True
@@ -27,5 +31,135 @@ class Page(PageBase):
             datetime: lambda v: v.isoformat()
         }
 
+def encode_page_json(page: Any, content_json: Optional[bytes]) -> bytes:
+    """Encode a page the way the ``Page`` schema would, splicing in raw content JSON.
+
+    ``page`` is any object with the page columns as attributes (an ORM row or
+    a result row); ``content_json`` is the content column's stored JSON text.
+    """
+    return b"".join([
+        b'{"title":', dumps(page.title),
+        b',"content":', content_json if content_json is not None else b"[]",
+        b',"id":', dumps(page.id),
+        b',"created_at":', dumps(page.created_at),
+        b',"updated_at":', dumps(page.updated_at),
+        b',"is_public":', dumps(bool(page.is_public)),
+        b',"share_token":', dumps(page.share_token),
+        b',"version":', dumps(page.version),
+        b',"storage_mode":', dumps(page.storage_mode),
+        b"}",
+    ])
+
+class PageSummary(BaseModel):
+    id: str
+    title: str
+    updatedAt: datetime = Field(alias="updated_at")
+    isPublic: bool = Field(alias="is_public")
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+class PageSummaryList(BaseModel):
+    items: List[PageSummary]
+    nextCursor: Optional[str] = None
+
+class PageSearchResult(BaseModel):
+    id: str
+    title: str
+    updatedAt: datetime = Field(validation_alias="updated_at")
+    rank: float
+    # Matching fragments with <b>...</b> around the hits
+    snippet: str = ""
+
+class PageSearchResults(BaseModel):
+    items: List[PageSearchResult]
+    nextCursor: Optional[str] = None
+
+class PagePatch(BaseModel):
+    baseVersion: int
+    title: Optional[str] = None
+    # Slate editor operations (insert_text, split_node, ...)
+    operations: Optional[List[Dict[str, Any]]] = None
+    # RFC 6902 JSON Patch against the content array
+    patch: Optional[List[Dict[str, Any]]] = None
+
+class PagePatchResponse(BaseModel):
+    version: int
+    updatedAt: datetime
+
+class PageVersionSummary(BaseModel):
+    version: int
+    kind: str
+    size: int
+    createdAt: datetime = Field(validation_alias="created_at")
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+class PageVersionList(BaseModel):
+    items: List[PageVersionSummary]
+    nextCursor: Optional[int] = None
+
+class PageVersionContent(BaseModel):
+    pageId: str
+    version: int
+    title: str
+    content: List[Any]
+    createdAt: datetime
+
+class PageStorage(BaseModel):
+    mode: Literal["document", "blocks"]
+
+class PageBlock(BaseModel):
+    id: str
+    position: str
+    version: int
+    content: Dict[str, Any]
+
+class PageBlockRange(BaseModel):
+    pageId: str
+    pageVersion: int
+    items: List[PageBlock]
+    nextCursor: Optional[str] = None
+
+class PageBlockCreate(BaseModel):
+    content: Dict[str, Any]
+    # Neighbour block ids; omit both to append at the end
+    afterId: Optional[str] = None
+    beforeId: Optional[str] = None
+
+class PageBlockUpdate(BaseModel):
+    content: Dict[str, Any]
+    baseVersion: int
+
+class PageBlockWriteResponse(BaseModel):
+    id: str
+    position: str
+    version: int
+    pageVersion: int
+    updatedAt: datetime
+
+class PageImport(BaseModel):
+    """One line of an import file; the ``Page`` fields of an export line, all but the title optional."""
+    title: str
+    content: Optional[List[Any]] = []
+    id: Optional[str] = Field(default=None, min_length=1, max_length=255)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    is_public: bool = False
+    share_token: Optional[str] = None
+
+class PageImportError(BaseModel):
+    line: int
+    message: str
+
+class PageImportResult(BaseModel):
+    imported: int
+    skipped: int
+    failed: int
+    errors: List[PageImportError]
+
 class ShareResponse(BaseModel):
     shareToken: str
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""Production entry point: migrate the schema, then serve on one worker process per CPU.
+
+    python -m app.serve [--workers N] [--host HOST] [--port PORT] [--skip-migrations]
+    python -m app.serve --migrate-only   # as a separate release step
+
+Workers use uvloop and httptools when installed (``uvicorn[standard]``).
+On SIGTERM each worker stops accepting connections, lets in-flight
+requests finish for up to GRACEFUL_SHUTDOWN_TIMEOUT seconds, then runs the
+app's shutdown (flushing buffered autosaves, stopping background jobs).
+
+Each worker has its own database pool, caches and /metrics counters, so
+size DB_POOL_SIZE + DB_MAX_OVERFLOW times the worker count against the
+database's connection limit.
+
+Admission limits and provider quotas are also enforced per process, so with
+several workers each gets an equal share of ADMISSION_MAX_CONCURRENCY,
+ADMISSION_MAX_QUEUE and the *_RPM / *_TPM settings, keeping the total within
+what is configured. The shared-page cache is turned off with more than one
+worker: an edit or unshare only invalidates the cache of the worker that
+handled it, and the others would keep serving the old page until its TTL.
+Autosave coalescing (AUTOSAVE_COALESCE_INTERVAL) is turned off too: a
+buffered write lives in one worker, so a read served by another would miss
+it, and two workers buffering the same page would conflict on flush.
+"""
+import argparse
+import asyncio
+import importlib.util
+import logging
+import math
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import uvicorn
+
+from .core.config import settings
+from .core.log import configure_logging
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic" / "alembic.ini"
+
+def available_cpus() -> int:
+    """CPUs this process may run on: its affinity mask, capped by a cgroup v2 CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+def worker_count(requested: int = 0) -> int:
+    # The app is async, so one process per core keeps every core busy
+    # without processes competing for the same core
+    return requested or settings.web_concurrency or available_cpus()
+
+# Limits each process enforces on its own
+_PER_WORKER_LIMITS = (
+    "ADMISSION_MAX_CONCURRENCY", "ADMISSION_MAX_QUEUE", "GEMINI_RPM", "GEMINI_TPM",
+    "OPENAI_RPM", "OPENAI_TPM", "HUGGINGFACE_RPM", "HUGGINGFACE_TPM",
+)
+
+def worker_environment(workers: int) -> Dict[str, str]:
+    """Setting overrides that make ``workers`` processes together honour the configured limits."""
+    if workers <= 1:
+        return {}
+    environment = {}
+    for name in _PER_WORKER_LIMITS:
+        value = getattr(settings, name.lower())
+        if value > 0:
+            share = value / workers
+            environment[name] = str(max(math.ceil(share), 1)) if isinstance(value, int) else str(share)
+    environment["SHARED_PAGE_CACHE_SIZE"] = "0"
+    if settings.autosave_coalesce_interval > 0:
+        logger.warning("Autosave coalescing needs a single worker; disabled for %d workers", workers)
+    environment["AUTOSAVE_COALESCE_INTERVAL"] = "0"
+    return environment
+
+def migrate() -> None:
+    """Bring the schema to the latest revision and requeue interrupted fact-check jobs.
+
+    Alembic runs in a child process so its logging setup does not replace
+    the server's.
+    """
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "-c", str(ALEMBIC_INI), "upgrade", "head"],
+        cwd=ALEMBIC_INI.parent.parent, check=True,
+    )
+    asyncio.run(_recover_jobs())
+
+async def _recover_jobs() -> None:
+    from .core.database import engine
+    from .services.fact_check_jobs import fact_check_jobs
+
+    try:
+        await fact_check_jobs.recover_interrupted()
+    finally:
+        await engine.dispose()
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API with multiple worker processes")
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=0, help="default: WEB_CONCURRENCY, else one per CPU")
+    parser.add_argument("--skip-migrations", action="store_true", help="assume the schema is already current")
+    parser.add_argument("--migrate-only", action="store_true", help="run migrations and exit")
+    args = parser.parse_args()
+    configure_logging()
+
+    if not args.skip_migrations:
+        try:
+            migrate()
+        except subprocess.CalledProcessError as e:
+            logger.error("Migrations failed with exit code %d", e.returncode)
+            sys.exit(e.returncode)
+    if args.migrate_only:
+        return
+
+    # Jobs were requeued above, before any worker could be running one
+    os.environ["FACT_CHECK_JOB_RECOVER"] = "false"
+    settings.fact_check_job_recover = False
+
+    workers = worker_count(args.workers)
+    # Workers are spawned and read their settings from the environment
+    os.environ.update(worker_environment(workers))
+    loop = "uvloop" if _installed("uvloop") else "asyncio"
+    http = "httptools" if _installed("httptools") else "h11"
+    logger.info("Serving on %s:%d with %d workers (%s, %s)", args.host, args.port, workers, loop, http)
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.forwarded_allow_ips,
+        timeout_keep_alive=settings.keep_alive_timeout,
+        timeout_graceful_shutdown=settings.graceful_shutdown_timeout,
+        # Logging is configured by the app (app.core.log) in each worker
+        log_config=None,
+        access_log=False,
+        server_header=False,
+    )
+
+if __name__ == "__main__":
+    main()
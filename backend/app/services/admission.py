@@ -0,0 +1,174 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+
+PRIORITIES = {"interactive": 0, "bulk": 1}
+
+class AdmissionRejected(Exception):
+    """The fact-check queue is full; the caller should retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Fact-check queue is full, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+class ProviderThrottled(Exception):
+    """A provider's request or token quota has no room for this call."""
+
+class TokenBucket:
+    """Refills ``per_minute`` units per minute up to a burst of ``capacity``."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (inf if it exceeds capacity)."""
+        self._refill()
+        if amount > self.capacity:
+            return float("inf")
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= amount
+
+class ProviderQuota:
+    """Requests-per-minute and tokens-per-minute buckets for one provider; 0 disables a limit."""
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.throttled = 0
+        self.waited = 0
+
+    def wait_time(self, tokens: float) -> float:
+        waits = [0.0]
+        if self.requests is not None:
+            waits.append(self.requests.wait_time(1))
+        if self.tokens is not None:
+            waits.append(self.tokens.wait_time(tokens))
+        return max(waits)
+
+    async def acquire(self, tokens: float, max_wait: float) -> None:
+        """Take one request and ``tokens`` tokens, waiting up to ``max_wait`` for a refill."""
+        wait = self.wait_time(tokens)
+        if wait > max_wait:
+            self.throttled += 1
+            raise ProviderThrottled(f"quota exhausted for {wait:.1f}s")
+        if wait > 0:
+            self.waited += 1
+            await asyncio.sleep(wait)
+
+        if self.requests is not None:
+            self.requests.consume(1)
+        if self.tokens is not None:
+            self.tokens.consume(tokens)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requestsAvailable": round(self.requests.tokens, 2) if self.requests else None,
+            "tokensAvailable": round(self.tokens.tokens) if self.tokens else None,
+            "throttled": self.throttled,
+            "waited": self.waited,
+        }
+
+class AdmissionController:
+    """Bounded priority queue in front of provider calls.
+
+    At most ``max_concurrency`` fact-checks talk to providers at once; up to
+    ``max_queue`` more wait, lower priority values first. Beyond that new
+    work is rejected so callers back off instead of piling up.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._active = 0
+        self._waiters: list = []
+        self._sequence = itertools.count()
+        # Exponential moving average of how long a slot is held
+        self._mean_service_time = 2.0
+
+        self.admitted = 0
+        self.rejected = 0
+
+    def check(self) -> None:
+        """Raise AdmissionRejected if new work would be turned away right now."""
+        if self._active >= self.max_concurrency and len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(self.retry_after())
+
+    def retry_after(self) -> float:
+        backlog = len(self._waiters) + 1
+        return max(1.0, backlog * self._mean_service_time / max(self.max_concurrency, 1))
+
+    @asynccontextmanager
+    async def slot(self, priority: str = "interactive"):
+        await self._acquire(PRIORITIES.get(priority, PRIORITIES["bulk"]))
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._mean_service_time = 0.9 * self._mean_service_time + 0.1 * (time.monotonic() - started)
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            self.admitted += 1
+            return
+
+        self.check()
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._sequence), future]
+        heapq.heappush(self._waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed to us just as we were cancelled
+                self._release()
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+        self.admitted += 1
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot straight to the next waiter
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "queued": len(self._waiters),
+            "maxConcurrency": self.max_concurrency,
+            "maxQueue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "meanServiceTime": round(self._mean_service_time, 3),
+        }
+
+admission = AdmissionController(
+    max_concurrency=settings.admission_max_concurrency,
+    max_queue=settings.admission_max_queue,
+)
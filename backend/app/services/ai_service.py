@@ -1,55 +1,600 @@
 import asyncio
 import json
+import logging
+import math
 import traceback
 import os
-from typing import Dict, Any
+import re
+import time
+from urllib.parse import urlencode
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable, AsyncIterator
 import httpx
 
+from ..core.config import settings
+from ..core.metrics import fact_check_verdicts, provider_fallbacks
+from .admission import admission, ProviderQuota
+from .claim_triage import claim_triage
+from .fact_check_cache import fact_check_cache
+from .knowledge_index import knowledge_index
+from .near_duplicate_cache import near_duplicate_cache
+from .provider_health import ProviderHealth, CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Source of the placeholder verdict returned when no provider could answer
+UNAVAILABLE_SOURCE = "System Error"
+
+def is_unavailable(verdict: Dict[str, Any]) -> bool:
+    """Whether a verdict is the placeholder for "no provider answered", not a real one."""
+    return UNAVAILABLE_SOURCE in (verdict.get("sources") or [])
+
 class AIService:
+    # Output-token ceilings per claim, alone and packed into a batch prompt;
+    # calls ask for a share sized to the claim and charge it to the token quota
+    OUTPUT_TOKENS = {"gemini": 400, "openai": 300, "huggingface": 100}
+    PACKED_OUTPUT_TOKENS = {"gemini": 200, "openai": 150, "huggingface": 100}
+
     def __init__(self):
         self.gemini_api_key = os.getenv('GEMINI_API_KEY', '')
         self.openai_api_key = os.getenv('OPENAI_API_KEY', '')
         
         self.use_gemini = bool(self.gemini_api_key)
         self.use_openai = bool(self.openai_api_key)
-        
-        print(f"[AI SERVICE] Gemini available: {self.use_gemini}")
-        print(f"[AI SERVICE] OpenAI available: {self.use_openai}")
-        print(f"[AI SERVICE] Hugging Face available: True (free)")
 
-    async def fact_check(self, text: str) -> Dict[str, Any]:
-        print(f"[AI SERVICE] Fact-checking: '{text}'")
-        
-        # Try Gemini first (free but can be overloaded)
-        if self.use_gemini:
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._openai_client = None
+
+        self.provider_health: Dict[str, ProviderHealth] = {
+            name: ProviderHealth(name, self._build_breaker()) for name in ("gemini", "openai", "huggingface")
+        }
+        self.provider_quotas: Dict[str, ProviderQuota] = {
+            "gemini": ProviderQuota(settings.gemini_rpm, settings.gemini_tpm),
+            "openai": ProviderQuota(settings.openai_rpm, settings.openai_tpm),
+            "huggingface": ProviderQuota(settings.huggingface_rpm, settings.huggingface_tpm),
+        }
+
+    async def startup(self) -> None:
+        """Open the pooled provider clients and local indexes; called from the app lifespan."""
+        logger.info("Providers: gemini=%s openai=%s huggingface=True", self.use_gemini, self.use_openai)
+        self._get_http_client()
+        try:
+            await asyncio.to_thread(claim_triage.load)
+        except Exception as e:
+            logger.warning("Claim classifier unavailable: %s", e)
+        try:
+            await asyncio.to_thread(knowledge_index.load)
+        except Exception as e:
+            logger.warning("Knowledge index unavailable: %s", e)
+        try:
+            await asyncio.to_thread(near_duplicate_cache.load)
+        except Exception as e:
+            logger.warning("Near-duplicate cache unavailable: %s", e)
+
+    async def shutdown(self) -> None:
+        await near_duplicate_cache.flush()
+        if self._openai_client is not None:
+            await self._openai_client.close()
+            self._openai_client = None
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def provider_status(self) -> Dict[str, Any]:
+        configured = {name for name, _ in self._configured_providers()}
+        return {
+            "strategy": settings.fact_check_strategy,
+            "ranking": [name for name, _ in self._providers()],
+            "providers": {
+                name: {
+                    "configured": name in configured,
+                    **health.snapshot(),
+                    "quota": self.provider_quotas[name].snapshot(),
+                }
+                for name, health in self.provider_health.items()
+            },
+            "admission": admission.snapshot(),
+            "triage": claim_triage.stats(),
+            "knowledge": knowledge_index.stats(),
+            "nearDuplicates": near_duplicate_cache.stats(),
+        }
+
+    def _build_breaker(self) -> CircuitBreaker:
+        return CircuitBreaker(
+            window=settings.breaker_window,
+            min_requests=settings.breaker_min_requests,
+            error_threshold=settings.breaker_error_threshold,
+            consecutive_failures=settings.breaker_consecutive_failures,
+            cooldown=settings.breaker_cooldown,
+            max_cooldown=settings.breaker_max_cooldown,
+            half_open_probes=settings.breaker_half_open_probes,
+        )
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = self._build_http_client()
+        return self._http_client
+
+    def _build_http_client(self) -> httpx.AsyncClient:
+        http2 = settings.ai_http2
+        if http2:
             try:
-                print("[AI SERVICE] Trying Gemini API...")
-                return await self._fact_check_with_gemini(text)
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("h2 is not installed, falling back to HTTP/1.1")
+                http2 = False
+
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.ai_max_connections,
+                max_keepalive_connections=settings.ai_max_keepalive_connections,
+                keepalive_expiry=settings.ai_keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.ai_connect_timeout,
+                read=settings.ai_read_timeout,
+                write=settings.ai_read_timeout,
+                pool=settings.ai_pool_timeout,
+            ),
+        )
+
+    def _get_openai_client(self):
+        if self._openai_client is None:
+            import openai
+            self._openai_client = openai.AsyncOpenAI(
+                api_key=self.openai_api_key,
+                base_url=settings.openai_base_url,
+                http_client=self._get_http_client(),
+                # Failures fall through to the next provider; the SDK's own
+                # retries would wait out Retry-After on a 429 first
+                max_retries=0,
+            )
+        return self._openai_client
+
+    async def fact_check(self, text: str, priority: str = "interactive") -> Dict[str, Any]:
+        skipped = self._triage(text)
+        if skipped is not None:
+            return skipped
+
+        cached = await self._recall(text)
+        if cached is not None:
+            return cached
+
+        local = await self._fact_check_locally(text)
+        if local is not None:
+            return local
+
+        async with admission.slot(priority):
+            result = await self._fact_check_with_providers(text)
+        if result is None:
+            return self._mock_response(text)
+
+        fact_check_verdicts.inc(source="provider")
+        await self._remember(text, result)
+        return result
+
+    async def fact_check_many(self, texts: List[str], priority: str = "bulk") -> List[Dict[str, Any]]:
+        """Fact-check several claims, deduplicated and packed into shared prompts.
+
+        Returns one verdict per input text, in input order.
+        """
+        verdicts: Dict[str, Dict[str, Any]] = {}
+        async for key, verdict in self.iter_fact_check_many(texts, priority):
+            verdicts[key] = verdict
+
+        return [dict(verdicts[fact_check_cache.make_key(text)]) for text in texts]
+
+    async def iter_fact_check_many(self, texts: List[str],
+                                   priority: str = "bulk") -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (cache key, verdict) for each distinct claim as soon as it is known."""
+        unique: Dict[str, str] = {}
+        for text in texts:
+            unique.setdefault(fact_check_cache.make_key(text), text)
+
+        misses = []
+        for key, text in unique.items():
+            skipped = self._triage(text)
+            if skipped is not None:
+                yield key, skipped
+                continue
+            cached = await self._recall(text)
+            if cached is not None:
+                yield key, cached
+                continue
+            local = await self._fact_check_locally(text)
+            if local is not None:
+                yield key, local
+            else:
+                misses.append((key, text))
+
+        if not misses:
+            return
+
+        semaphore = asyncio.Semaphore(max(settings.batch_concurrency, 1))
+        pack_size = max(settings.batch_pack_size, 1)
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def check_one(key, text):
+            async with semaphore:
+                try:
+                    queue.put_nowait((key, await self.fact_check(text, priority)))
+                except Exception as e:
+                    # Hand the failure (e.g. AdmissionRejected) to the consumer
+                    queue.put_nowait((key, e))
+
+        async def check_group(group):
+            try:
+                async with semaphore, admission.slot(priority):
+                    results = await self._fact_check_packed([text for _, text in group])
             except Exception as e:
-                print(f"[AI SERVICE] Gemini failed: {e}")
-        
-        # Try OpenAI second
+                logger.warning("Packed fact-check failed: %s", e)
+                results = None
+
+            if results is None:
+                # No provider could take the packed prompt; check claims one by one
+                await asyncio.gather(*(check_one(key, text) for key, text in group))
+                return
+
+            # The consumer waits for one item per claim, so every claim gets
+            # its verdict or the error, whatever fails
+            delivered = 0
+            try:
+                fact_check_verdicts.inc(len(results), source="provider")
+                for (key, text), result in zip(group, results):
+                    await self._remember(text, result)
+                    queue.put_nowait((key, result))
+                    delivered += 1
+            except Exception as e:
+                for key, _ in group[delivered:]:
+                    queue.put_nowait((key, e))
+
+        groups = [misses[i:i + pack_size] for i in range(0, len(misses), pack_size)]
+        tasks = [asyncio.create_task(check_group(group)) for group in groups]
+        try:
+            for _ in range(len(misses)):
+                key, result = await queue.get()
+                if isinstance(result, Exception):
+                    raise result
+                yield key, result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def fact_check_stream(self, text: str,
+                                priority: str = "interactive") -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Fact-check one claim, yielding (event, data) pairs as the answer is generated.
+
+        Events are ``token`` (raw provider output), ``field`` (a verdict field
+        parsed out of the partial output), ``reset`` (a provider failed
+        mid-stream and the next one takes over) and finally ``result``.
+        """
+        skipped = self._triage(text)
+        if skipped is not None:
+            yield "result", skipped
+            return
+
+        cached = await self._recall(text)
+        if cached is not None:
+            yield "result", cached
+            return
+
+        local = await self._fact_check_locally(text)
+        if local is not None:
+            yield "result", local
+            return
+
+        async with admission.slot(priority):
+            async for event in self._stream_with_providers(text):
+                yield event
+
+    async def _stream_with_providers(self, text: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        streaming_calls = {
+            "gemini": (self._stream_fact_check_with_gemini, "Gemini AI"),
+            "openai": (self._stream_fact_check_with_openai, "OpenAI"),
+        }
+        providers = self._providers()
+
+        for name, _ in providers:
+            if name not in streaming_calls:
+                continue
+            stream, default_source = streaming_calls[name]
+
+            health = self.provider_health[name]
+            try:
+                await self._admit_provider(name, text)
+            except Exception as e:
+                logger.info("Skipping %s: %s", name, e)
+                provider_fallbacks.inc(provider=name, reason="unavailable")
+                continue
+
+            start = time.perf_counter()
+            generated_text = ""
+            emitted_fields = set()
+            try:
+                async for token in stream(text):
+                    generated_text += token
+                    yield "token", {"provider": name, "text": token}
+                    for field_name, value in _partial_fields(generated_text, emitted_fields):
+                        emitted_fields.add(field_name)
+                        yield "field", {"name": field_name, "value": value}
+                result = self._parse_verdict(generated_text, default_source)
+            except (asyncio.CancelledError, GeneratorExit):
+                health.breaker.release()
+                raise
+            except Exception as e:
+                health.record_failure(time.perf_counter() - start)
+                logger.warning("Streaming %s failed: %s", name, e)
+                provider_fallbacks.inc(provider=name, reason="error")
+                if generated_text:
+                    yield "reset", {"provider": name}
+                continue
+
+            health.record_success(time.perf_counter() - start)
+            fact_check_verdicts.inc(source="provider")
+            await self._remember(text, result)
+            yield "result", result
+            return
+
+        # No streaming provider answered; use the remaining ones without streaming
+        fallback = [(name, call) for name, call in providers if name not in streaming_calls]
+        result = await self._fact_check_sequential(fallback, text)
+        if result is None:
+            yield "result", self._mock_response(text)
+            return
+
+        fact_check_verdicts.inc(source="provider")
+        await self._remember(text, result)
+        yield "result", result
+
+    def _triage(self, text: str) -> Optional[Dict[str, Any]]:
+        """The immediate verdict for text that is not a checkable factual claim."""
+        triage = claim_triage.triage(text)
+        if triage.checkable:
+            return None
+        fact_check_verdicts.inc(source="triage")
+        return claim_triage.verdict(triage)
+
+    def _output_tokens(self, name: str, texts: List[str], packed: bool = False) -> int:
+        """Output tokens to ask ``name`` for: each claim's share of the ceiling."""
+        ceiling = (self.PACKED_OUTPUT_TOKENS if packed else self.OUTPUT_TOKENS)[name]
+        if not settings.output_token_sizing:
+            return ceiling * len(texts)
+        return sum(math.ceil(ceiling * claim_triage.output_fraction(text)) for text in texts)
+
+    async def _recall(self, text: str) -> Optional[Dict[str, Any]]:
+        """A cached verdict for this exact claim, or for a near-duplicate of it."""
+        cached = await fact_check_cache.get(text)
+        if cached is not None:
+            fact_check_verdicts.inc(source="cache")
+        else:
+            cached = near_duplicate_cache.lookup(text)
+            if cached is not None:
+                logger.info("Near-duplicate hit (%s) for a %d-character claim", cached["matchScore"], len(text))
+                fact_check_verdicts.inc(source="near_duplicate")
+        if cached is not None:
+            cached["cached"] = True
+        return cached
+
+    async def _remember(self, text: str, result: Dict[str, Any]) -> None:
+        await fact_check_cache.set(text, result)
+        near_duplicate_cache.add(fact_check_cache.make_key(text), text, result)
+
+    async def _fact_check_locally(self, text: str) -> Optional[Dict[str, Any]]:
+        """Answer from the local knowledge index when a reference passage restates the claim."""
+        result = knowledge_index.answer(text)
+        if result is not None:
+            fact_check_verdicts.inc(source="knowledge")
+            await self._remember(text, result)
+        return result
+
+    async def _fact_check_packed(self, texts: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """Check several claims in one prompt with the first provider that supports it."""
+        if len(texts) == 1:
+            return None
+
+        packed_calls = {
+            "gemini": self._batch_fact_check_with_gemini,
+            "openai": self._batch_fact_check_with_openai,
+        }
+        for name, _ in self._providers():
+            call = packed_calls.get(name)
+            if call is None:
+                continue
+            try:
+                results = await self._call_provider(name, call, texts)
+            except Exception as e:
+                logger.warning("Packed %s call failed: %s", name, e)
+                provider_fallbacks.inc(provider=name, reason="error")
+                continue
+            if len(results) == len(texts):
+                return results
+            logger.warning("Packed %s call returned %d verdicts for %d claims", name, len(results), len(texts))
+            provider_fallbacks.inc(provider=name, reason="incomplete")
+        return None
+
+    async def _fact_check_with_providers(self, text: str) -> Optional[Dict[str, Any]]:
+        providers = self._providers()
+        strategy = settings.fact_check_strategy
+
+        if strategy == "race":
+            return await self._fact_check_race(providers, text)
+        if strategy == "hedged":
+            return await self._fact_check_hedged(providers, text)
+        return await self._fact_check_sequential(providers, text)
+
+    def _providers(self) -> List[Tuple[str, Callable[[str], Awaitable[Dict[str, Any]]]]]:
+        """Providers whose breaker is not open, best measured health first."""
+        providers = [
+            (name, call) for name, call in self._configured_providers()
+            if self.provider_health[name].available
+        ]
+        if settings.provider_dynamic_ranking:
+            # Stable sort: providers without measurements keep the configured order
+            providers.sort(key=lambda provider: (
+                self.provider_health[provider[0]].breaker.state != CircuitBreaker.CLOSED,
+                self.provider_health[provider[0]].expected_latency(settings.hedge_default_delay),
+            ))
+        return providers
+
+    def _configured_providers(self) -> List[Tuple[str, Callable[[str], Awaitable[Dict[str, Any]]]]]:
+        providers = []
+        # Gemini first (free but can be overloaded), then OpenAI
+        if self.use_gemini:
+            providers.append(("gemini", self._fact_check_with_gemini))
         if self.use_openai:
+            providers.append(("openai", self._fact_check_with_openai))
+        # Hugging Face is always available (free, no API key needed)
+        providers.append(("huggingface", self._fact_check_with_huggingface))
+        return providers
+
+    async def _admit_provider(self, name: str, payload: Any) -> None:
+        """Pass the provider's circuit breaker and charge its request/token quota."""
+        health = self.provider_health[name]
+        if not health.breaker.allow_request():
+            raise Exception(f"{name} circuit breaker is open")
+
+        texts = payload if isinstance(payload, list) else [payload]
+        tokens = sum(len(text) // 4 for text in texts) + self._output_tokens(name, texts, packed=len(texts) > 1)
+        try:
+            await self.provider_quotas[name].acquire(tokens, settings.quota_max_wait)
+        except BaseException:
+            health.breaker.release()
+            raise
+
+    async def _call_provider(self, name: str, call: Callable[[Any], Awaitable[Any]], text: Any) -> Any:
+        health = self.provider_health[name]
+        await self._admit_provider(name, text)
+
+        start = time.perf_counter()
+        try:
+            result = await call(text)
+        except asyncio.CancelledError:
+            health.breaker.release()
+            raise
+        except Exception:
+            health.record_failure(time.perf_counter() - start)
+            raise
+        health.record_success(time.perf_counter() - start)
+        return result
+
+    async def _fact_check_sequential(self, providers, text: str) -> Optional[Dict[str, Any]]:
+        for name, call in providers:
             try:
-                print("[AI SERVICE] Trying OpenAI API...")
-                return await self._fact_check_with_openai(text)
+                return await self._call_provider(name, call, text)
             except Exception as e:
-                print(f"[AI SERVICE] OpenAI failed: {e}")
-        
-        # Try Hugging Face (always free, no API key needed)
+                logger.warning("%s failed: %s", name, e)
+                provider_fallbacks.inc(provider=name, reason="error")
+        return None
+
+    async def _fact_check_hedged(self, providers, text: str) -> Optional[Dict[str, Any]]:
+        """Start the next provider whenever the newest one fails or outlives its hedge delay."""
+        remaining = list(providers)
+        pending = set()
+        delay = None
         try:
-            print("[AI SERVICE] Trying Hugging Face API...")
-            return await self._fact_check_with_huggingface(text)
-        except Exception as e:
-            print(f"[AI SERVICE] Hugging Face failed: {e}")
-        
-        # Final fallback
-        return self._mock_response(text)
+            while True:
+                if remaining:
+                    name, call = remaining.pop(0)
+                    task = asyncio.create_task(self._call_provider(name, call, text))
+                    task.provider_name = name
+                    pending.add(task)
+                    delay = self._hedge_delay(name)
+
+                if not pending:
+                    return None
+
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=delay if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    logger.info("No answer within %.2fs, hedging to next provider", delay)
+                    provider_fallbacks.inc(provider=name, reason="hedged")
+
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    logger.warning("%s failed: %s", task.provider_name, task.exception())
+                    provider_fallbacks.inc(provider=task.provider_name, reason="error")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fact_check_race(self, providers, text: str) -> Optional[Dict[str, Any]]:
+        """Run every provider at once; the first valid answer wins."""
+        pending = set()
+        for name, call in providers:
+            task = asyncio.create_task(self._call_provider(name, call, text))
+            task.provider_name = name
+            pending.add(task)
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    logger.warning("%s failed: %s", task.provider_name, task.exception())
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _hedge_delay(self, name: str) -> float:
+        return self.provider_health[name].hedge_delay(
+            percentile=settings.hedge_percentile,
+            default=settings.hedge_default_delay,
+            minimum=settings.hedge_min_delay,
+            maximum=settings.hedge_max_delay,
+            min_samples=settings.hedge_min_samples,
+        )
 
     async def _fact_check_with_gemini(self, text: str) -> Dict[str, Any]:
-        url = f"https://generativelanguage.googleapis.com/v1/models/gemini-1.5-flash:generateContent?key={self.gemini_api_key}"
+        url = self._gemini_url("generateContent")
+        
+        payload = {
+            "contents": [{"parts": [{"text": self._gemini_prompt(text)}]}],
+            "generationConfig": {"temperature": 0.2, "maxOutputTokens": self._output_tokens("gemini", [text])}
+        }
         
-        prompt = f'''Fact-check this statement: "{text}"
+        response = await self._get_http_client().post(url, json=payload)
+        
+        if response.status_code != 200:
+            raise Exception(f"Gemini API error: {response.status_code} - {response.text}")
+        
+        data = response.json()
+        generated_text = data['candidates'][0]['content']['parts'][0]['text']
+        return self._parse_verdict(generated_text, "Gemini AI")
+
+    async def _stream_fact_check_with_gemini(self, text: str) -> AsyncIterator[str]:
+        url = self._gemini_url("streamGenerateContent", alt="sse")
+
+        payload = {
+            "contents": [{"parts": [{"text": self._gemini_prompt(text)}]}],
+            "generationConfig": {"temperature": 0.2, "maxOutputTokens": self._output_tokens("gemini", [text])}
+        }
+
+        async with self._get_http_client().stream("POST", url, json=payload) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise Exception(f"Gemini API error: {response.status_code} - {body.decode(errors='replace')}")
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                chunk = json.loads(line[len("data:"):])
+                for candidate in chunk.get("candidates", []):
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+
+    def _gemini_url(self, method: str, **params: str) -> str:
+        query = urlencode({**params, "key": self.gemini_api_key})
+        return f"{settings.gemini_base_url}/v1/models/gemini-1.5-flash:{method}?{query}"
+
+    def _gemini_prompt(self, text: str) -> str:
+        return f'''{self._reference_passages([text])}Fact-check this statement: "{text}"
 
 Respond with a JSON object containing:
 - "result": Clear explanation of whether the statement is correct, incorrect, or uncertain
@@ -58,47 +603,38 @@ Respond with a JSON object containing:
 
 Example: {{"result": "Correct. Mount Everest is the tallest mountain on Earth at 8,848.86 meters above sea level.", "confidence": 0.95, "sources": ["Geographic Survey", "Mountain Records"]}}'''
 
-        payload = {
-            "contents": [{"parts": [{"text": prompt}]}],
-            "generationConfig": {"temperature": 0.2, "maxOutputTokens": 400}
-        }
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(url, json=payload)
-            
-            if response.status_code != 200:
-                raise Exception(f"Gemini API error: {response.status_code} - {response.text}")
-            
-            data = response.json()
-            generated_text = data['candidates'][0]['content']['parts'][0]['text']
-            
-            try:
-                clean_text = generated_text.strip()
-                if clean_text.startswith('`json'):
-                    clean_text = clean_text.split('`json')[1].split('`')[0].strip()
-                elif clean_text.startswith('`'):
-                    clean_text = clean_text.split('`')[1].split('`')[0].strip()
-                
-                result = json.loads(clean_text)
-                return {
-                    "result": str(result.get("result", generated_text)),
-                    "confidence": float(result.get("confidence", 0.7)),
-                    "sources": list(result.get("sources", ["Gemini AI"]))
-                }
-            except json.JSONDecodeError:
-                return {"result": generated_text, "confidence": 0.7, "sources": ["Gemini AI"]}
+    def _reference_passages(self, texts: List[str]) -> str:
+        """Prompt preamble quoting local reference passages relevant to the claims."""
+        passages = knowledge_index.context(texts)
+        if not passages:
+            return ""
+        quoted = "\n".join(f"- [{passage.source}] {passage.text}" for passage in passages)
+        return f'''Reference passages (prefer these over recall when they apply, and cite them in "sources"):
+{quoted}
+
+'''
+
+    def _parse_verdict(self, generated_text: str, default_source: str) -> Dict[str, Any]:
+        try:
+            result = json.loads(_strip_code_fence(generated_text))
+            return {
+                "result": str(result.get("result", generated_text)),
+                "confidence": float(result.get("confidence", 0.7)),
+                "sources": list(result.get("sources", [default_source]))
+            }
+        except (json.JSONDecodeError, AttributeError):
+            return {"result": generated_text, "confidence": 0.7, "sources": [default_source]}
 
     async def _fact_check_with_openai(self, text: str) -> Dict[str, Any]:
-        import openai
-        client = openai.AsyncOpenAI(api_key=self.openai_api_key)
+        client = self._get_openai_client()
         
         response = await client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "You are a fact-checker. Respond with JSON containing 'result', 'confidence', and 'sources' fields."},
-                {"role": "user", "content": f"Fact-check: {text}"}
+                {"role": "user", "content": f"{self._reference_passages([text])}Fact-check: {text}"}
             ],
-            max_tokens=300,
+            max_tokens=self._output_tokens("openai", [text]),
             temperature=0.2
         )
         
@@ -111,52 +647,156 @@ Example: {{"result": "Correct. Mount Everest is the tallest mountain on Earth at
             "sources": list(result_json.get("sources", ["OpenAI"]))
         }
 
+    async def _stream_fact_check_with_openai(self, text: str) -> AsyncIterator[str]:
+        client = self._get_openai_client()
+
+        stream = await client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are a fact-checker. Respond with JSON containing 'result', 'confidence', and 'sources' fields."},
+                {"role": "user", "content": f"{self._reference_passages([text])}Fact-check: {text}"}
+            ],
+            max_tokens=self._output_tokens("openai", [text]),
+            temperature=0.2,
+            stream=True
+        )
+
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
     async def _fact_check_with_huggingface(self, text: str) -> Dict[str, Any]:
         # Use Hugging Face Inference API (free, no API key needed)
-        url = "https://api-inference.huggingface.co/models/microsoft/DialoGPT-medium"
+        url = f"{settings.huggingface_base_url}/models/microsoft/DialoGPT-medium"
         
         prompt = f"Fact-check: {text}. Is this statement correct, incorrect, or uncertain? Explain briefly."
         
         payload = {"inputs": prompt}
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(url, json=payload)
+        response = await self._get_http_client().post(url, json=payload)
+        
+        if response.status_code != 200:
+            raise Exception(f"HuggingFace error: {response.status_code}")
+        
+        data = response.json()
+        
+        if isinstance(data, list) and len(data) > 0:
+            generated_text = data[0].get('generated_text', str(data))
             
-            if response.status_code != 200:
-                raise Exception(f"HuggingFace error: {response.status_code}")
+            # Extract just the response part
+            if prompt in generated_text:
+                generated_text = generated_text.replace(prompt, '').strip()
             
-            data = response.json()
+            # Determine confidence based on keywords
+            confidence = 0.6
+            lower_text = generated_text.lower()
+            if any(word in lower_text for word in ["correct", "true", "accurate"]):
+                confidence = 0.8
+            elif any(word in lower_text for word in ["incorrect", "false", "wrong"]):
+                confidence = 0.8
+            elif any(word in lower_text for word in ["uncertain", "unclear", "maybe"]):
+                confidence = 0.4
             
-            if isinstance(data, list) and len(data) > 0:
-                generated_text = data[0].get('generated_text', str(data))
-                
-                # Extract just the response part
-                if prompt in generated_text:
-                    generated_text = generated_text.replace(prompt, '').strip()
-                
-                # Determine confidence based on keywords
-                confidence = 0.6
-                lower_text = generated_text.lower()
-                if any(word in lower_text for word in ["correct", "true", "accurate"]):
-                    confidence = 0.8
-                elif any(word in lower_text for word in ["incorrect", "false", "wrong"]):
-                    confidence = 0.8
-                elif any(word in lower_text for word in ["uncertain", "unclear", "maybe"]):
-                    confidence = 0.4
-                
-                return {
-                    "result": generated_text,
-                    "confidence": confidence,
-                    "sources": ["Hugging Face AI"]
-                }
-            else:
-                raise Exception("Unexpected HuggingFace response format")
+            return {
+                "result": generated_text,
+                "confidence": confidence,
+                "sources": ["Hugging Face AI"]
+            }
+        else:
+            raise Exception("Unexpected HuggingFace response format")
+
+    async def _batch_fact_check_with_gemini(self, texts: List[str]) -> List[Dict[str, Any]]:
+        url = self._gemini_url("generateContent")
+
+        payload = {
+            "contents": [{"parts": [{"text": self._batch_prompt(texts)}]}],
+            "generationConfig": {"temperature": 0.2, "maxOutputTokens": self._output_tokens("gemini", texts, packed=True)}
+        }
+
+        response = await self._get_http_client().post(url, json=payload)
+
+        if response.status_code != 200:
+            raise Exception(f"Gemini API error: {response.status_code} - {response.text}")
+
+        data = response.json()
+        generated_text = data['candidates'][0]['content']['parts'][0]['text']
+        return self._parse_batch_results(generated_text, "Gemini AI")
+
+    async def _batch_fact_check_with_openai(self, texts: List[str]) -> List[Dict[str, Any]]:
+        client = self._get_openai_client()
+
+        response = await client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "You are a fact-checker. Respond only with a JSON array."},
+                {"role": "user", "content": self._batch_prompt(texts)}
+            ],
+            max_tokens=self._output_tokens("openai", texts, packed=True),
+            temperature=0.2
+        )
+
+        return self._parse_batch_results(response.choices[0].message.content, "OpenAI")
+
+    def _batch_prompt(self, texts: List[str]) -> str:
+        numbered = "\n".join(f"{i + 1}. {json.dumps(text)}" for i, text in enumerate(texts))
+        return f'''{self._reference_passages(texts)}Fact-check each of these {len(texts)} numbered statements:
+{numbered}
+
+Respond with a JSON array of exactly {len(texts)} objects, in the same order, each containing:
+- "result": Clear explanation of whether the statement is correct, incorrect, or uncertain
+- "confidence": Number between 0.0 and 1.0
+- "sources": Array of source types'''
+
+    def _parse_batch_results(self, generated_text: str, default_source: str) -> List[Dict[str, Any]]:
+        items = json.loads(_strip_code_fence(generated_text))
+        if not isinstance(items, list):
+            raise Exception("Expected a JSON array of verdicts")
+
+        return [
+            {
+                "result": str(item.get("result", "Unable to analyze")),
+                "confidence": float(item.get("confidence", 0.7)),
+                "sources": list(item.get("sources", [default_source]))
+            }
+            for item in items
+        ]
 
     def _mock_response(self, text: str) -> Dict[str, Any]:
+        fact_check_verdicts.inc(source="unavailable")
         return {
             "result": f"All AI services are temporarily unavailable. Please try again later.",
             "confidence": 0.0,
-            "sources": ["System Error"]
+            "sources": [UNAVAILABLE_SOURCE]
         }
 
+_PARTIAL_FIELDS = {
+    "result": re.compile(r'"result"\s*:\s*("(?:[^"\\]|\\.)*")'),
+    "confidence": re.compile(r'"confidence"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}\s]'),
+    "sources": re.compile(r'"sources"\s*:\s*(\[[^\]]*\])'),
+}
+
+def _partial_fields(partial_text: str, seen: set) -> List[Tuple[str, Any]]:
+    """Verdict fields that are already complete in a partially generated JSON object."""
+    fields = []
+    for name, pattern in _PARTIAL_FIELDS.items():
+        if name in seen:
+            continue
+        match = pattern.search(partial_text)
+        if match is None:
+            continue
+        try:
+            fields.append((name, json.loads(match.group(1))))
+        except json.JSONDecodeError:
+            continue
+    return fields
+
+def _strip_code_fence(generated_text: str) -> str:
+    """Remove a ```json ... ``` wrapper that models like to put around JSON."""
+    clean_text = generated_text.strip()
+    if clean_text.startswith("```"):
+        clean_text = clean_text.strip("`").strip()
+        if clean_text.startswith("json"):
+            clean_text = clean_text[len("json"):].strip()
+    return clean_text
+
 ai_service = AIService()
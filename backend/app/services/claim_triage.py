@@ -0,0 +1,265 @@
+import argparse
+import json
+import logging
+import math
+import random
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.log import configure_logging
+from .claims import numbers, split_sentences, tokenize
+
+logger = logging.getLogger(__name__)
+
+MODEL_FORMAT = 1
+
+# Modal verbs only mark an opinion with a first-person subject: "you must drink
+# eight glasses of water a day" is a checkable health claim
+_OPINION_PHRASES = (
+    "i think", "i believe", "i feel", "i guess", "i suppose", "i love", "i hate", "i like", "i prefer",
+    "i wish", "i hope", "in my opinion", "in my view", "imo", "imho", "personally",
+    "i should", "i must", "i ought", "we should", "we must", "we ought",
+)
+# Evaluative words; they only make an opinion as the predicate of a copula
+# ("this is the best"), not as part of a subject ("great white sharks", "the
+# best treatment for a cold is ...") or a fixed phrase ("cool air", "fun fact")
+_SUBJECTIVE = {
+    "best", "worst", "beautiful", "ugly", "amazing", "awesome", "terrible", "horrible", "boring", "delicious",
+    "overrated", "underrated", "wonderful", "awful", "great", "cool", "nice", "lovely", "stupid", "fun",
+    "favorite", "favourite", "gorgeous", "disgusting",
+}
+_BOILERPLATE_PHRASES = (
+    "all rights reserved", "click here", "read more", "lorem ipsum", "subscribe to", "sign up for",
+    "table of contents", "unsubscribe",
+)
+_COPULAS = {"is", "are", "was", "were", "s", "looks", "seems", "sounds", "tastes", "feels"}
+# Words that may stand between the copula and the evaluative word
+_INTENSIFIERS = {
+    "the", "a", "an", "so", "very", "really", "truly", "absolutely", "pretty", "quite", "most", "such",
+    "just", "simply", "totally", "incredibly", "extremely",
+}
+# After the evaluative word these start something checkable: "great for the heart", "worst on record"
+_QUALIFIERS = {
+    "for", "at", "in", "on", "of", "to", "than", "with", "by", "from", "because", "since", "when", "if",
+    "against", "as", "compared",
+}
+# Imperatives addressed to the reader; "let us not forget that ..." is a claim
+_INSTRUCTION_STARTS = {"please", "click", "tap", "imagine", "suppose"}
+_CONNECTIVES = {"and", "but", "because", "while", "although", "whereas", "which", "who", "since", "unless", "after", "before"}
+_PROPER_NOUN = re.compile(r"(?<=[a-z0-9,;:]\s)[A-Z][a-zA-Z]+")
+_URL_OR_EMAIL = re.compile(r"^(?:\S+@\S+\.\S+|(?:https?://|www\.)\S+)$")
+
+_MESSAGES = {
+    "question": "Not a factual claim: this is a question, so there is nothing to verify.",
+    "opinion": "Not a factual claim: this expresses an opinion or recommendation rather than a verifiable fact.",
+    "fragment": "Not a factual claim: this text is too short or incomplete to verify.",
+    "boilerplate": "Not a factual claim: this looks like boilerplate or non-prose text.",
+    "instruction": "Not a factual claim: this is an instruction or request.",
+    "classifier": "Not a factual claim: this does not read as a verifiable statement of fact.",
+}
+
+@dataclass
+class Triage:
+    checkable: bool
+    # "claim", or why the text is not worth checking (a key of _MESSAGES)
+    category: str
+
+class ClaimTriage:
+    """Sorts text into checkable factual claims and text not worth a provider call.
+
+    Cheap rules catch questions, opinions, instructions, fragments and
+    boilerplate. Text the rules let through can be given to an optional
+    linear classifier over hashed word features, trained with ``--train``
+    from labelled examples of the editor's own traffic. Rules only reject on
+    strong signals: a wasted provider call costs less than a claim that is
+    never checked.
+    """
+
+    def __init__(self, enabled: bool, classifier_path: str, classifier_threshold: float):
+        self.enabled = enabled
+        self.classifier_path = classifier_path
+        self.classifier_threshold = classifier_threshold
+        self._model: Optional[Dict[str, Any]] = None
+
+        self.checkable = 0
+        self.skipped: Dict[str, int] = {}
+
+    def load(self) -> None:
+        if not self.enabled or not self.classifier_path:
+            return
+        with open(self.classifier_path, encoding="utf-8") as f:
+            model = json.load(f)
+        if model.get("format") != MODEL_FORMAT:
+            raise ValueError(f"Unsupported claim classifier format {model.get('format')}")
+        model["weights"] = {int(index): weight for index, weight in model["weights"].items()}
+        self._model = model
+        logger.info("Loaded claim classifier with %d weights", len(model["weights"]))
+
+    def triage(self, text: str) -> Triage:
+        if not self.enabled:
+            return Triage(True, "claim")
+
+        categories = [_sentence_category(text[start:end]) for start, end in split_sentences(text)] or ["fragment"]
+        if "claim" not in categories:
+            result = Triage(False, categories[0])
+        elif self._model is not None and self.probability(text) < self.classifier_threshold:
+            result = Triage(False, "classifier")
+        else:
+            result = Triage(True, "claim")
+
+        if result.checkable:
+            self.checkable += 1
+        else:
+            self.skipped[result.category] = self.skipped.get(result.category, 0) + 1
+        return result
+
+    def verdict(self, triage: Triage) -> Dict[str, Any]:
+        """The immediate answer for text that is not a factual claim."""
+        return {
+            "result": _MESSAGES[triage.category],
+            "confidence": 0.0,
+            "sources": ["Claim triage"],
+            "checkable": False,
+            "category": triage.category,
+        }
+
+    def output_fraction(self, text: str) -> float:
+        """Share of the full output-token budget a verdict on ``text`` needs.
+
+        A one-line claim gets a one-line verdict; long, multi-part or number-
+        heavy claims need room to address each part.
+        """
+        tokens = tokenize(text)
+        score = (len(tokens) > 25) + (len(tokens) > 45) + (len(numbers(tokens)) >= 2)
+        score += sum(token in _CONNECTIVES for token in tokens) >= 2
+        score += min(len(split_sentences(text)) - 1, 2)
+        return (0.4, 0.6, 0.8)[score] if score < 3 else 1.0
+
+    def probability(self, text: str) -> float:
+        """Classifier probability that ``text`` is a checkable claim."""
+        model = self._model
+        weights = model["weights"]
+        z = model["bias"] + sum(weights.get(feature, 0.0) for feature in _features(text, model["dimensions"]))
+        return _sigmoid(z)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "classifier": self._model is not None,
+            "checkable": self.checkable,
+            "skipped": dict(self.skipped),
+        }
+
+def _sentence_category(sentence: str) -> str:
+    stripped = sentence.strip()
+    tokens = tokenize(stripped)
+    # Word count, not characters: "Water is H2O" is a complete claim
+    if len(tokens) < 3:
+        return "fragment"
+    lowered = " " + " ".join(tokens) + " "
+    letters = sum(ch.isalpha() for ch in stripped)
+    if (letters < 0.5 * sum(not ch.isspace() for ch in stripped) or _URL_OR_EMAIL.match(stripped)
+            or "©" in stripped or any(f" {phrase} " in lowered for phrase in _BOILERPLATE_PHRASES)):
+        return "boilerplate"
+    if stripped.rstrip("\"')]").endswith("?"):
+        return "question"
+    # "Please note that ..." wraps a statement in an instruction
+    if tokens[0] in _INSTRUCTION_STARTS and "that" not in tokens[:4]:
+        return "instruction"
+    if any(f" {phrase} " in lowered for phrase in _OPINION_PHRASES):
+        return "opinion"
+    # No verb test: no word list knows every verb ("Cows drink milk.")
+    if _is_evaluation(tokens) and not numbers(tokens) and not _PROPER_NOUN.search(stripped):
+        return "opinion"
+    return "claim"
+
+def _is_evaluation(tokens: List[str]) -> bool:
+    """A copula whose predicate is an evaluative word, with at most a short plain phrase after it.
+
+    "This is the best song ever written" and "the food was delicious" are
+    evaluations; "green tea is great for the heart" goes on to say
+    something checkable.
+    """
+    copula = next((index for index, token in enumerate(tokens) if token in _COPULAS), None)
+    if copula is None:
+        return False
+    predicate = [token for token in tokens[copula + 1:] if token not in _INTENSIFIERS]
+    if not predicate or predicate[0] not in _SUBJECTIVE:
+        return False
+    rest = predicate[1:]
+    return len(rest) <= 3 and not any(token in _QUALIFIERS for token in rest)
+
+def _features(text: str, dimensions: int) -> List[int]:
+    tokens = tokenize(text)
+    names = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    names.append(f"__category_{_sentence_category(text)}")
+    names.append(f"__length_{min(len(tokens) // 5, 8)}")
+    if numbers(tokens):
+        names.append("__number")
+    if _PROPER_NOUN.search(text):
+        names.append("__proper_noun")
+    return sorted({zlib.crc32(name.encode("utf-8")) % dimensions for name in names})
+
+def _sigmoid(z: float) -> float:
+    if z < -30:
+        return 0.0
+    return 1 / (1 + math.exp(-z))
+
+def train(examples: Iterable[Tuple[str, bool]], dimensions: int = 1 << 18, epochs: int = 10,
+          learning_rate: float = 0.2, l2: float = 1e-5, seed: int = 0) -> Dict[str, Any]:
+    """Fit a logistic regression on (text, is checkable claim) pairs by SGD."""
+    rows = [(_features(text, dimensions), 1.0 if label else 0.0) for text, label in examples]
+    if not rows:
+        raise ValueError("No training examples")
+    rng = random.Random(seed)
+    weights: Dict[int, float] = {}
+    bias = 0.0
+    for _ in range(epochs):
+        rng.shuffle(rows)
+        for features, label in rows:
+            error = _sigmoid(bias + sum(weights.get(feature, 0.0) for feature in features)) - label
+            bias -= learning_rate * error
+            for feature in features:
+                weight = weights.get(feature, 0.0)
+                weights[feature] = weight - learning_rate * (error + l2 * weight)
+    return {
+        "format": MODEL_FORMAT,
+        "dimensions": dimensions,
+        "bias": bias,
+        "weights": {str(index): round(weight, 6) for index, weight in weights.items() if abs(weight) > 1e-6},
+    }
+
+claim_triage = ClaimTriage(
+    enabled=settings.claim_triage,
+    classifier_path=settings.claim_classifier_path,
+    classifier_threshold=settings.claim_classifier_threshold,
+)
+
+if __name__ == "__main__":
+    # python -m app.services.claim_triage --train labelled.jsonl --output model.json
+    # python -m app.services.claim_triage "Some text to triage"
+    parser = argparse.ArgumentParser(description="Claim triage rules and classifier")
+    parser.add_argument("text", nargs="*", help="text to triage")
+    parser.add_argument("--train", help='JSON lines of {"text": ..., "checkable": true|false}')
+    parser.add_argument("--output", help="where to write the trained classifier")
+    parser.add_argument("--epochs", type=int, default=10)
+    args = parser.parse_args()
+    configure_logging()
+
+    if args.train:
+        with open(args.train, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        examples = [(row["text"], bool(row["checkable"])) for row in rows]
+        model = train(examples, epochs=args.epochs)
+        with open(args.output or "claim_classifier.json", "w", encoding="utf-8") as f:
+            json.dump(model, f)
+        print(f"[CLAIM TRIAGE] Trained on {len(examples)} examples, {len(model['weights'])} weights")
+    else:
+        claim_triage.load()
+        for text in args.text:
+            triage = claim_triage.triage(text)
+            print(json.dumps({"text": text, "checkable": triage.checkable, "category": triage.category,
+                              "outputFraction": claim_triage.output_fraction(text)}))
@@ -0,0 +1,119 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Sentence end: terminal punctuation (optionally followed by closing quotes or
+# brackets) and whitespace, unless the word before it is a common abbreviation.
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*(?=\s+|$)')
+_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e",
+    "inc", "ltd", "co", "corp", "no", "fig", "approx", "u.s", "u.k", "jan", "feb",
+    "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+}
+_INLINE_TYPES = {"a", "link", "mention", "inline_equation", "inline-code"}
+# Claims shorter than this many word characters are not worth a provider call
+MIN_CLAIM_CHARS = 12
+_WORD = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_NUMBER = re.compile(r"^[0-9]+(?:\.[0-9]+)?$")
+# Function words a rewording may add, drop or swap without changing what is claimed.
+# Quantifiers, negations, "or" and temporal words change it, so they are not here.
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "being", "am", "has", "have", "had", "do",
+    "does", "did", "it", "its", "this", "that", "these", "those", "there", "of", "in", "on", "at", "by",
+    "for", "with", "as", "to", "and", "which", "who", "also", "very", "just", "really", "actually", "indeed",
+}
+
+@dataclass
+class Claim:
+    text: str
+    start: int
+    end: int
+    text_index: Optional[int] = None
+    path: Optional[List[int]] = field(default=None)
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """Return (start, end) character offsets of the sentences in ``text``."""
+    spans = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        end = match.end()
+        words = text[start:match.start()].split()
+        if words and words[-1].rstrip(".").lower() in _ABBREVIATIONS:
+            continue
+        if words and len(words[-1]) == 1 and words[-1].isupper():
+            # Initials such as "J. R. R. Tolkien"
+            continue
+        spans.append((start, end))
+        start = end
+
+    if start < len(text):
+        spans.append((start, len(text)))
+
+    return [_strip_span(text, s, e) for s, e in spans if text[s:e].strip()]
+
+def split_claims(text: str, text_index: Optional[int] = None,
+                 path: Optional[List[int]] = None) -> List[Claim]:
+    claims = []
+    for start, end in split_sentences(text):
+        sentence = text[start:end]
+        if sum(ch.isalnum() for ch in sentence) < MIN_CLAIM_CHARS:
+            continue
+        claims.append(Claim(text=sentence, start=start, end=end, text_index=text_index, path=path))
+    return claims
+
+def extract_claims(content: List[Any]) -> List[Claim]:
+    """Split a Slate document into sentence claims tagged with their block path."""
+    claims = []
+    for path, text in iter_text_blocks(content):
+        claims.extend(split_claims(text, path=path))
+    return claims
+
+def iter_text_blocks(content: List[Any], path: Optional[List[int]] = None) -> Iterator[Tuple[List[int], str]]:
+    """Yield (path, plain text) for every block whose children are all inline.
+
+    Offsets inside the text are offsets into the concatenation of the block's
+    text leaves, which is how Slate addresses points within a block.
+    """
+    path = path or []
+    for index, node in enumerate(content or []):
+        if not isinstance(node, dict) or "children" not in node:
+            continue
+        node_path = path + [index]
+        children = node.get("children") or []
+        if any(isinstance(child, dict) and _is_block(child) for child in children):
+            yield from iter_text_blocks(children, node_path)
+        else:
+            text = node_text(node)
+            if text.strip():
+                yield node_path, text
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; decimals such as 27.3 stay one token."""
+    return _WORD.findall(text.lower())
+
+def numbers(tokens: Iterable[str]) -> Set[str]:
+    return {token for token in tokens if _NUMBER.match(token)}
+
+def content_terms(tokens: Iterable[str]) -> List[str]:
+    """The tokens other than stopwords, in order: the words a claim turns on."""
+    return [token for token in tokens if token not in STOPWORDS]
+
+def node_text(node: Any) -> str:
+    if isinstance(node, dict):
+        if "text" in node:
+            return str(node.get("text") or "")
+        return "".join(node_text(child) for child in node.get("children") or [])
+    return ""
+
+def _is_block(node: dict) -> bool:
+    """Element nodes containing other elements (not just leaves) are containers."""
+    if "children" not in node:
+        return False
+    return not node.get("inline", False) and node.get("type") not in _INLINE_TYPES
+
+def _strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
@@ -0,0 +1,311 @@
+import copy
+import difflib
+import json
+from typing import Any, Dict, List
+
+class PatchError(ValueError):
+    """Raised when a patch or operation cannot be applied to a document."""
+
+# RFC 6902 JSON Patch
+
+def apply_json_patch(document: Any, patch: List[Dict[str, Any]]) -> Any:
+    """Apply an RFC 6902 patch, returning the patched copy of ``document``."""
+    document = copy.deepcopy(document)
+    for operation in patch:
+        op = operation.get("op")
+        path = operation.get("path")
+        if not isinstance(path, str):
+            raise PatchError(f"Patch operation is missing a path: {operation}")
+
+        if op == "add":
+            document = _add(document, parse_pointer(path), _value(operation))
+        elif op == "remove":
+            document = _remove(document, parse_pointer(path))[0]
+        elif op == "replace":
+            tokens = parse_pointer(path)
+            _resolve(document, tokens)
+            document = _add(_remove(document, tokens)[0], tokens, _value(operation))
+        elif op == "move":
+            from_tokens = parse_pointer(_from(operation))
+            if tokens_are_prefix(from_tokens, parse_pointer(path)) and from_tokens != parse_pointer(path):
+                raise PatchError(f"Cannot move {operation['from']} into its own child {path}")
+            document, value = _remove(document, from_tokens)
+            document = _add(document, parse_pointer(path), value)
+        elif op == "copy":
+            value = copy.deepcopy(_resolve(document, parse_pointer(_from(operation))))
+            document = _add(document, parse_pointer(path), value)
+        elif op == "test":
+            if _resolve(document, parse_pointer(path)) != _value(operation):
+                raise PatchError(f"Test failed at {path}")
+        else:
+            raise PatchError(f"Unsupported patch operation: {op}")
+    return document
+
+def diff_json(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """An RFC 6902 patch turning ``old`` into ``new``; unchanged subtrees produce no operations.
+
+    Arrays are diffed by trimming the common prefix and suffix, so inserting
+    or deleting a block costs one operation rather than shifting the rest.
+    """
+    if type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+    if _equal(old, new):
+        return []
+
+    if isinstance(old, dict):
+        patch = [{"op": "remove", "path": _pointer(path, key)} for key in old if key not in new]
+        for key, value in new.items():
+            if key in old:
+                patch.extend(diff_json(old[key], value, _pointer(path, key)))
+            else:
+                patch.append({"op": "add", "path": _pointer(path, key), "value": value})
+        return patch
+
+    if isinstance(old, list):
+        shortest = min(len(old), len(new))
+        prefix = 0
+        while prefix < shortest and _equal(old[prefix], new[prefix]):
+            prefix += 1
+        suffix = 0
+        while suffix < shortest - prefix and _equal(old[-1 - suffix], new[-1 - suffix]):
+            suffix += 1
+        old_middle = old[prefix:len(old) - suffix]
+        new_middle = new[prefix:len(new) - suffix]
+
+        # Align the rest by element, so an insert and an edit further down
+        # stay two operations instead of shifting everything in between
+        matcher = difflib.SequenceMatcher(
+            None, [_key(item) for item in old_middle], [_key(item) for item in new_middle], autojunk=False
+        )
+        patch = []
+        for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            # Earlier opcodes already made the document match ``new`` up to here
+            index = prefix + new_start
+            common = min(old_end - old_start, new_end - new_start)
+            for offset in range(common):
+                patch.extend(diff_json(
+                    old_middle[old_start + offset], new_middle[new_start + offset], f"{path}/{index + offset}"
+                ))
+            for _ in range(old_end - old_start - common):
+                patch.append({"op": "remove", "path": f"{path}/{index + common}"})
+            for offset in range(common, new_end - new_start):
+                patch.append({"op": "add", "path": f"{path}/{index + offset}", "value": new_middle[new_start + offset]})
+        return patch
+
+    return [{"op": "replace", "path": path, "value": new}]
+
+def parse_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise PatchError(f"Invalid JSON pointer: {pointer}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+def _equal(a: Any, b: Any) -> bool:
+    """JSON equality: unlike ``==``, true is not 1 and 1.0 is not 1."""
+    return a == b and _same_types(a, b)
+
+def _same_types(a: Any, b: Any) -> bool:
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, list):
+        return all(_same_types(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict):
+        return all(_same_types(value, b[key]) for key, value in a.items())
+    return True
+
+def _key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True)
+
+def _pointer(path: str, key: str) -> str:
+    return f"{path}/{key.replace('~', '~0').replace('/', '~1')}"
+
+def tokens_are_prefix(prefix: List[str], tokens: List[str]) -> bool:
+    return tokens[:len(prefix)] == prefix
+
+def _value(operation: Dict[str, Any]) -> Any:
+    if "value" not in operation:
+        raise PatchError(f"Patch operation is missing a value: {operation}")
+    return copy.deepcopy(operation["value"])
+
+def _from(operation: Dict[str, Any]) -> str:
+    if not isinstance(operation.get("from"), str):
+        raise PatchError(f"Patch operation is missing from: {operation}")
+    return operation["from"]
+
+def _resolve(document: Any, tokens: List[str]) -> Any:
+    node = document
+    for token in tokens:
+        if isinstance(node, list):
+            node = node[_index(node, token)]
+        elif isinstance(node, dict):
+            if token not in node:
+                raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+            node = node[token]
+        else:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+    return node
+
+def _add(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent = _resolve(document, tokens[:-1])
+    token = tokens[-1]
+    if isinstance(parent, list):
+        index = len(parent) if token == "-" else _index(parent, token, allow_end=True)
+        parent.insert(index, value)
+    elif isinstance(parent, dict):
+        parent[token] = value
+    else:
+        raise PatchError(f"Cannot add to a scalar at /{'/'.join(tokens)}")
+    return document
+
+def _remove(document: Any, tokens: List[str]):
+    if not tokens:
+        return None, document
+    parent = _resolve(document, tokens[:-1])
+    token = tokens[-1]
+    if isinstance(parent, list):
+        value = parent.pop(_index(parent, token))
+    elif isinstance(parent, dict):
+        if token not in parent:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+        value = parent.pop(token)
+    else:
+        raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+    return document, value
+
+def is_array_index(token: str) -> bool:
+    """An RFC 6901 array index: ASCII digits without a leading zero."""
+    return token.isascii() and token.isdigit() and (len(token) == 1 or not token.startswith("0"))
+
+def _index(array: list, token: str, allow_end: bool = False) -> int:
+    if not is_array_index(token):
+        raise PatchError(f"Invalid array index: {token}")
+    index = int(token)
+    if index > len(array) or (index == len(array) and not allow_end):
+        raise PatchError(f"Array index out of range: {token}")
+    return index
+
+# Slate operations
+
+def apply_slate_operations(content: List[Any], operations: List[Dict[str, Any]]) -> List[Any]:
+    """Apply Slate editor operations to a copy of a document's top-level nodes.
+
+    Mirrors Slate's ``GeneralTransforms.transform``; selection operations are
+    ignored because the server does not track selections.
+    """
+    root = {"children": copy.deepcopy(content)}
+    for operation in operations:
+        op_type = operation.get("type")
+        handler = _SLATE_HANDLERS.get(op_type)
+        if handler is None:
+            if op_type == "set_selection":
+                continue
+            raise PatchError(f"Unsupported Slate operation: {op_type}")
+        try:
+            handler(root, operation)
+        except (KeyError, IndexError, TypeError) as e:
+            raise PatchError(f"Cannot apply {op_type} at {operation.get('path')}: {e}")
+    return root["children"]
+
+def _node(root: dict, path: List[int]) -> dict:
+    node = root
+    for index in path:
+        node = node["children"][index]
+    return node
+
+def _parent(root: dict, path: List[int]) -> dict:
+    if not path:
+        raise PatchError("Cannot address the parent of the root node")
+    return _node(root, path[:-1])
+
+def _insert_node(root: dict, operation: dict) -> None:
+    path = operation["path"]
+    _parent(root, path)["children"].insert(path[-1], copy.deepcopy(operation["node"]))
+
+def _remove_node(root: dict, operation: dict) -> None:
+    path = operation["path"]
+    _parent(root, path)["children"].pop(path[-1])
+
+def _insert_text(root: dict, operation: dict) -> None:
+    leaf = _node(root, operation["path"])
+    offset = operation["offset"]
+    leaf["text"] = leaf["text"][:offset] + operation["text"] + leaf["text"][offset:]
+
+def _remove_text(root: dict, operation: dict) -> None:
+    leaf = _node(root, operation["path"])
+    offset = operation["offset"]
+    leaf["text"] = leaf["text"][:offset] + leaf["text"][offset + len(operation["text"]):]
+
+def _set_node(root: dict, operation: dict) -> None:
+    node = _node(root, operation["path"])
+    properties = operation.get("properties") or {}
+    new_properties = operation.get("newProperties") or {}
+    for key, value in new_properties.items():
+        if key in ("children", "text"):
+            raise PatchError(f"Cannot set {key} with set_node")
+        if value is None:
+            node.pop(key, None)
+        else:
+            node[key] = value
+    for key in properties:
+        if key not in new_properties:
+            node.pop(key, None)
+
+def _merge_node(root: dict, operation: dict) -> None:
+    path = operation["path"]
+    if path[-1] == 0:
+        raise PatchError(f"Cannot merge the first node at {path}")
+    node = _node(root, path)
+    previous = _node(root, path[:-1] + [path[-1] - 1])
+    if "text" in node and "text" in previous:
+        previous["text"] += node["text"]
+    elif "children" in node and "children" in previous:
+        previous["children"].extend(node["children"])
+    else:
+        raise PatchError(f"Cannot merge nodes of different kinds at {path}")
+    _parent(root, path)["children"].pop(path[-1])
+
+def _split_node(root: dict, operation: dict) -> None:
+    path = operation["path"]
+    position = operation["position"]
+    node = _node(root, path)
+    properties = copy.deepcopy(operation.get("properties") or {})
+    if "text" in node:
+        new_node = {**properties, "text": node["text"][position:]}
+        node["text"] = node["text"][:position]
+    else:
+        new_node = {**properties, "children": node["children"][position:]}
+        node["children"] = node["children"][:position]
+    _parent(root, path)["children"].insert(path[-1] + 1, new_node)
+
+def _move_node(root: dict, operation: dict) -> None:
+    path = operation["path"]
+    new_path = operation["newPath"]
+    if path == new_path:
+        return
+    if new_path[:len(path)] == path:
+        raise PatchError(f"Cannot move {path} inside itself")
+
+    node = _parent(root, path)["children"].pop(path[-1])
+
+    # The removal shifts new_path when it points past an earlier sibling
+    true_path = list(new_path)
+    depth = len(path) - 1
+    if len(path) < len(new_path) and path[:depth] == new_path[:depth] and path[depth] < new_path[depth]:
+        true_path[depth] -= 1
+    _parent(root, true_path)["children"].insert(true_path[-1], node)
+
+_SLATE_HANDLERS = {
+    "insert_node": _insert_node,
+    "remove_node": _remove_node,
+    "insert_text": _insert_text,
+    "remove_text": _remove_text,
+    "set_node": _set_node,
+    "merge_node": _merge_node,
+    "split_node": _split_node,
+    "move_node": _move_node,
+}
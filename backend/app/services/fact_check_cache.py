@@ -0,0 +1,171 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from sqlalchemy import delete, func, select
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.fact_check import FactCheckCacheEntry
+
+logger = logging.getLogger(__name__)
+
+class FactCheckCache:
+    """Two-tier cache of fact-check verdicts keyed by normalized text.
+
+    The memory tier is an LRU with a per-entry TTL. The optional database
+    tier survives restarts and is shared between worker processes.
+    """
+
+    # Prune the database tier once every this many writes
+    DB_PRUNE_INTERVAL = 256
+
+    def __init__(self, max_entries: int, ttl: float, db_enabled: bool = False,
+                 db_ttl: float = 0, db_max_rows: int = 0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_enabled = db_enabled
+        self.db_ttl = db_ttl
+        self.db_max_rows = db_max_rows
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._db_writes = 0
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        normalized = " ".join(text.split()).casefold()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    async def get(self, text: str) -> Optional[Dict[str, Any]]:
+        key = self.make_key(text)
+
+        result = self._get_memory(key)
+        if result is not None:
+            self.memory_hits += 1
+            return result
+
+        if self.db_enabled:
+            try:
+                result = await self._get_db(key)
+            except Exception as e:
+                logger.warning("Fact-check cache lookup failed: %s", e)
+                result = None
+            if result is not None:
+                self.db_hits += 1
+                self._set_memory(key, result)
+                return result
+
+        self.misses += 1
+        return None
+
+    async def set(self, text: str, result: Dict[str, Any]) -> None:
+        key = self.make_key(text)
+        self._set_memory(key, result)
+
+        if self.db_enabled:
+            try:
+                await self._set_db(key, result)
+            except Exception as e:
+                logger.warning("Fact-check cache write failed: %s", e)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "hits": hits,
+            "memoryHits": self.memory_hits,
+            "dbHits": self.db_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRate": round(hits / lookups, 4) if lookups else 0.0,
+            "dbEnabled": self.db_enabled,
+        }
+
+    def _get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return dict(result)
+
+    def _set_memory(self, key: str, result: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, dict(result))
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _get_db(self, key: str) -> Optional[Dict[str, Any]]:
+        async with AsyncSessionLocal() as db:
+            entry = await db.get(FactCheckCacheEntry, key)
+            if entry is None:
+                return None
+            if entry.created_at and self._is_db_expired(entry.created_at):
+                return None
+            return dict(entry.result)
+
+    async def _set_db(self, key: str, result: Dict[str, Any]) -> None:
+        async with AsyncSessionLocal() as db:
+            try:
+                await db.merge(FactCheckCacheEntry(key=key, result=result, created_at=datetime.utcnow()))
+                await db.commit()
+
+                self._db_writes += 1
+                if self._db_writes % self.DB_PRUNE_INTERVAL == 0:
+                    await self._prune_db(db)
+            except Exception:
+                await db.rollback()
+                raise
+
+    async def _prune_db(self, db) -> None:
+        """Drop expired rows, then the oldest rows beyond the size limit."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.db_ttl)
+        await db.execute(delete(FactCheckCacheEntry).where(FactCheckCacheEntry.created_at < cutoff))
+
+        count = (await db.execute(select(func.count()).select_from(FactCheckCacheEntry))).scalar_one()
+        overflow = count - self.db_max_rows
+        if overflow > 0:
+            oldest = (
+                select(FactCheckCacheEntry.key)
+                .order_by(FactCheckCacheEntry.created_at.asc())
+                .limit(overflow)
+                .scalar_subquery()
+            )
+            await db.execute(delete(FactCheckCacheEntry).where(FactCheckCacheEntry.key.in_(oldest)))
+        await db.commit()
+
+    def _is_db_expired(self, created_at: datetime) -> bool:
+        if created_at.tzinfo is not None:
+            created_at = created_at.replace(tzinfo=None) - (created_at.utcoffset() or timedelta())
+        return created_at < datetime.utcnow() - timedelta(seconds=self.db_ttl)
+
+fact_check_cache = FactCheckCache(
+    max_entries=settings.fact_check_cache_size,
+    ttl=settings.fact_check_cache_ttl,
+    db_enabled=settings.fact_check_cache_db,
+    db_ttl=settings.fact_check_cache_db_ttl,
+    db_max_rows=settings.fact_check_cache_db_max_rows,
+)
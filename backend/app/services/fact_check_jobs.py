@@ -0,0 +1,366 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.fact_check import BlockFactCheck, FactCheckJob
+from ..models.page import Page
+from ..schemas.fact_check import BlockFactCheckResult, FactCheckJob as FactCheckJobSchema
+from .admission import AdmissionRejected
+from .ai_service import ai_service, is_unavailable
+from .claims import iter_text_blocks, split_claims
+from .fact_check_cache import fact_check_cache
+from .page_service import page_service
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+TERMINAL_STATUSES = ("completed", "failed")
+
+def block_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class FactCheckJobRunner:
+    """Runs whole-page fact-checks on a pool of background workers.
+
+    Verdicts are stored per (page, block text hash), so a re-check after an
+    edit only sends the blocks whose text changed; unchanged blocks reuse the
+    stored verdicts. A block with a claim no provider could answer is not
+    stored, so the next job checks it again. Progress is published to
+    in-process stream subscribers; subscribers also poll the database, so a
+    job run by another worker process still streams. Workers claim a job by
+    moving it from queued to running, so each job runs once however many
+    processes queue it.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(workers, 1)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._listeners: Dict[str, List[asyncio.Queue]] = {}
+
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        if settings.fact_check_job_recover:
+            await self.recover_interrupted()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(FactCheckJob.id)
+                .where(FactCheckJob.status == "queued")
+                .order_by(FactCheckJob.created_at)
+            )
+            for job_id in result.scalars():
+                self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def recover_interrupted(self) -> int:
+        """Requeue jobs left running by a stopped process; returns how many.
+
+        Only safe while no other process is running jobs, so multi-worker
+        servers do this once before starting their workers.
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(FactCheckJob).where(FactCheckJob.status == "running").values(status="queued")
+            )
+            await db.commit()
+        if result.rowcount:
+            logger.info("Requeued %d interrupted fact-check jobs", result.rowcount)
+        return result.rowcount
+
+    async def enqueue(self, db: AsyncSession, page_id: str) -> Optional[FactCheckJob]:
+        """Queue a fact-check of the page, or return the one already pending."""
+        if await db.get(Page, page_id) is None:
+            return None
+
+        result = await db.execute(
+            select(FactCheckJob)
+            .where(FactCheckJob.page_id == page_id, FactCheckJob.status.in_(ACTIVE_STATUSES))
+            .order_by(FactCheckJob.created_at.desc())
+            .limit(1)
+        )
+        job = result.scalars().first()
+        if job is not None:
+            return job
+
+        job = FactCheckJob(page_id=page_id, status="queued", created_at=datetime.utcnow())
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        if self._queue is not None:
+            self._queue.put_nowait(job.id)
+        return job
+
+    async def get_job(self, db: AsyncSession, page_id: str, job_id: str) -> Optional[FactCheckJobSchema]:
+        job = await db.get(FactCheckJob, job_id)
+        if job is None or job.page_id != page_id:
+            return None
+        schema = FactCheckJobSchema.model_validate(job)
+        schema.results = [BlockFactCheckResult(**block) for block in await self._block_results(db, job)]
+        return schema
+
+    async def subscribe(self, db: AsyncSession, page_id: str,
+                        job_id: str) -> Optional[AsyncIterator[Tuple[str, Any]]]:
+        """Stream (event, data) pairs for a job: its state, each block, then the outcome."""
+        job = await db.get(FactCheckJob, job_id)
+        if job is None or job.page_id != page_id:
+            return None
+
+        async def events():
+            # Registered once the stream is iterated, so a stream that never
+            # starts leaves no listener behind; listen before reading the
+            # snapshot so no block finishes unseen in between
+            queue: asyncio.Queue = asyncio.Queue()
+            self._listeners.setdefault(job_id, []).append(queue)
+            try:
+                # The request's session is closed by the time the stream runs
+                async with AsyncSessionLocal() as snapshot_db:
+                    job = await snapshot_db.get(FactCheckJob, job_id)
+                    if job is None:
+                        return
+                    snapshot = FactCheckJobSchema.model_validate(job)
+                    results = await self._block_results(snapshot_db, job)
+
+                sent: Set[Tuple[Tuple[int, ...], str]] = set()
+                # A job event is only news once the job starts or is planned
+                state = (snapshot.status, snapshot.pageVersion)
+                yield "job", _job_fields(snapshot)
+                for block in results:
+                    sent.add((tuple(block["path"]), block["hash"]))
+                    yield "block", block
+                if snapshot.status in TERMINAL_STATUSES:
+                    yield snapshot.status, _job_fields(snapshot)
+                    return
+
+                while True:
+                    try:
+                        pending = [await asyncio.wait_for(queue.get(), settings.fact_check_job_poll_interval)]
+                    except asyncio.TimeoutError:
+                        # Nothing published here; the job may be running in another process
+                        pending = await self._poll(job_id, state)
+                    for event, data in pending:
+                        if event == "block":
+                            key = (tuple(data["path"]), data["hash"])
+                            if key in sent:
+                                continue
+                            sent.add(key)
+                        elif event == "job":
+                            if (data["status"], data["pageVersion"]) == state:
+                                continue
+                            state = (data["status"], data["pageVersion"])
+                        yield event, data
+                        if event in TERMINAL_STATUSES:
+                            return
+            finally:
+                self._unsubscribe(job_id, queue)
+
+        return events()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "completed": self.completed,
+            "failed": self.failed,
+            "subscribers": sum(len(queues) for queues in self._listeners.values()),
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Fact-check job %s failed: %s", job_id, e)
+                await self._fail_job(job_id, str(e))
+
+    async def _run_job(self, job_id: str) -> None:
+        async with AsyncSessionLocal() as db:
+            claimed = await db.execute(
+                update(FactCheckJob)
+                .where(FactCheckJob.id == job_id, FactCheckJob.status == "queued")
+                .values(status="running", started_at=datetime.utcnow())
+            )
+            await db.commit()
+            if claimed.rowcount != 1:
+                return
+            job = await db.get(FactCheckJob, job_id)
+            page = await db.get(Page, job.page_id)
+            if page is None:
+                await self._fail_job(job_id, "Page not found")
+                return
+
+            content = await page_service.get_content(db, page)
+            blocks = [(path, text, block_hash(text)) for path, text in iter_text_blocks(content)]
+            hashes = {digest for _, _, digest in blocks}
+            stored = await self._stored_blocks(db, job.page_id, hashes)
+
+            job.page_version = page.version
+            job.blocks = [{"path": path, "hash": digest, "reused": digest in stored} for path, _, digest in blocks]
+            job.block_count = len(blocks)
+            job.reused_block_count = sum(1 for _, _, digest in blocks if digest in stored)
+            job.checked_block_count = 0
+            await db.commit()
+            logger.info("Fact-check job %s: %d blocks, %d unchanged", job_id, job.block_count, job.reused_block_count)
+            self._publish(job_id, "job", _job_fields(FactCheckJobSchema.model_validate(job)))
+
+            paths_by_hash: Dict[str, List[List[int]]] = {}
+            text_by_hash: Dict[str, str] = {}
+            for path, text, digest in blocks:
+                paths_by_hash.setdefault(digest, []).append(path)
+                text_by_hash[digest] = text
+                if digest in stored:
+                    self._publish(job_id, "block", _block_result(path, digest, True, stored[digest]))
+
+            changed = [digest for digest in paths_by_hash if digest not in stored]
+            await self._check_blocks(db, job, changed, text_by_hash, paths_by_hash)
+
+            # Verdicts for text that is no longer on the page will never be reused
+            stale = delete(BlockFactCheck).where(BlockFactCheck.page_id == job.page_id)
+            if hashes:
+                stale = stale.where(BlockFactCheck.block_hash.not_in(hashes))
+            await db.execute(stale)
+            job.status = "completed"
+            job.finished_at = datetime.utcnow()
+            await db.commit()
+            self.completed += 1
+            self._publish(job_id, "completed", _job_fields(FactCheckJobSchema.model_validate(job)))
+
+    async def _check_blocks(self, db: AsyncSession, job: FactCheckJob, changed: List[str],
+                            text_by_hash: Dict[str, str], paths_by_hash: Dict[str, List[List[int]]]) -> None:
+        """Fact-check the claims of changed blocks, storing each block as it completes."""
+        claims_by_hash = {digest: split_claims(text_by_hash[digest]) for digest in changed}
+        verdicts_by_hash: Dict[str, List[Optional[Dict[str, Any]]]] = {
+            digest: [None] * len(claims) for digest, claims in claims_by_hash.items()
+        }
+        remaining = {digest: len(claims) for digest, claims in claims_by_hash.items()}
+        waiting: Dict[str, List[Tuple[str, int]]] = {}
+        for digest, claims in claims_by_hash.items():
+            for index, claim in enumerate(claims):
+                waiting.setdefault(fact_check_cache.make_key(claim.text), []).append((digest, index))
+
+        # Blocks without any checkable sentence are complete straight away
+        for digest in [digest for digest, count in remaining.items() if count == 0]:
+            await self._store_block(db, job, digest, [], paths_by_hash[digest])
+
+        texts = {key: claims_by_hash[digest][index].text for key, [(digest, index), *_] in waiting.items()}
+        while waiting:
+            try:
+                pending = [texts[key] for key in waiting]
+                async for key, verdict in ai_service.iter_fact_check_many(pending, priority="bulk"):
+                    for digest, index in waiting.pop(key, []):
+                        claim = claims_by_hash[digest][index]
+                        verdicts_by_hash[digest][index] = {
+                            "text": claim.text,
+                            "start": claim.start,
+                            "end": claim.end,
+                            "result": verdict.get("result"),
+                            "confidence": verdict.get("confidence", 0.0),
+                            "sources": verdict.get("sources") or [],
+                        }
+                        remaining[digest] -= 1
+                        if remaining[digest] == 0:
+                            await self._store_block(db, job, digest, verdicts_by_hash[digest], paths_by_hash[digest])
+                return
+            except AdmissionRejected as e:
+                # Background work yields to interactive traffic; claims already
+                # verified are cache hits on the next pass
+                await asyncio.sleep(e.retry_after)
+
+    async def _store_block(self, db: AsyncSession, job: FactCheckJob, digest: str,
+                           claims: List[Dict[str, Any]], paths: List[List[int]]) -> None:
+        # "No provider answered" is not a verdict to reuse: the block is left
+        # unstored so the next job checks it again
+        if any(is_unavailable(claim) for claim in claims):
+            logger.warning("Fact-check job %s: no provider answered for block %s; not stored", job.id, digest[:12])
+        else:
+            await db.merge(BlockFactCheck(
+                page_id=job.page_id, block_hash=digest, claims=claims, checked_at=datetime.utcnow()
+            ))
+        job.checked_block_count += len(paths)
+        await db.commit()
+        for path in paths:
+            self._publish(job.id, "block", _block_result(path, digest, False, claims))
+
+    async def _stored_blocks(self, db: AsyncSession, page_id: str, hashes: Set[str]) -> Dict[str, List[Dict[str, Any]]]:
+        if not hashes:
+            return {}
+        result = await db.execute(
+            select(BlockFactCheck.block_hash, BlockFactCheck.claims)
+            .where(BlockFactCheck.page_id == page_id, BlockFactCheck.block_hash.in_(hashes))
+        )
+        return {row.block_hash: row.claims for row in result}
+
+    async def _poll(self, job_id: str, state: Tuple[str, Optional[int]]) -> List[Tuple[str, Any]]:
+        """Events for a job's stored state: its fields if they moved on from ``state``, then its blocks."""
+        async with AsyncSessionLocal() as db:
+            job = await db.get(FactCheckJob, job_id)
+            if job is None:
+                return []
+            fields = _job_fields(FactCheckJobSchema.model_validate(job))
+            events: List[Tuple[str, Any]] = []
+            if (job.status, job.page_version) != state and job.status not in TERMINAL_STATUSES:
+                events.append(("job", fields))
+            events.extend(("block", block) for block in await self._block_results(db, job))
+            if job.status in TERMINAL_STATUSES:
+                events.append((job.status, fields))
+            return events
+
+    async def _block_results(self, db: AsyncSession, job: FactCheckJob) -> List[Dict[str, Any]]:
+        """Results for the job's blocks that have verdicts, in document order."""
+        blocks = job.blocks or []
+        stored = await self._stored_blocks(db, job.page_id, {block["hash"] for block in blocks})
+        return [
+            _block_result(block["path"], block["hash"], block.get("reused", False), stored[block["hash"]])
+            for block in blocks if block["hash"] in stored
+        ]
+
+    async def _fail_job(self, job_id: str, error: str) -> None:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(FactCheckJob, job_id)
+            if job is None:
+                return
+            job.status = "failed"
+            job.error = error
+            job.finished_at = datetime.utcnow()
+            await db.commit()
+            self.failed += 1
+            self._publish(job_id, "failed", _job_fields(FactCheckJobSchema.model_validate(job)))
+
+    def _publish(self, job_id: str, event: str, data: Any) -> None:
+        for queue in self._listeners.get(job_id, []):
+            queue.put_nowait((event, data))
+
+    def _unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        queues = self._listeners.get(job_id, [])
+        if queue in queues:
+            queues.remove(queue)
+        if not queues:
+            self._listeners.pop(job_id, None)
+
+def _job_fields(job: FactCheckJobSchema) -> Dict[str, Any]:
+    return job.model_dump(mode="json", exclude={"results"})
+
+def _block_result(path: List[int], digest: str, reused: bool, claims: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"path": path, "hash": digest, "reused": reused, "claims": claims}
+
+fact_check_jobs = FactCheckJobRunner(workers=settings.fact_check_job_workers)
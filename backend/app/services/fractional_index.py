@@ -0,0 +1,53 @@
+from typing import List, Optional
+
+# Keys are base-62 fractions (digits after an implied "0."), compared as plain
+# strings. No key ends in "0", so there is always room between two keys.
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_BASE = len(DIGITS)
+
+def key_between(before: Optional[str], after: Optional[str]) -> str:
+    """A key sorting strictly between ``before`` and ``after`` (None = open end)."""
+    before = before or ""
+    if after is not None and before >= after:
+        raise ValueError(f"{before!r} does not sort before {after!r}")
+    return _midpoint(before, after)
+
+def evenly_spaced_keys(count: int) -> List[str]:
+    """``count`` ascending keys of equal length, spread across the key space.
+
+    Used when a whole document is (re)written, so later inserts between any
+    two neighbours start from short keys.
+    """
+    if count <= 0:
+        return []
+    width = 1
+    while _BASE ** width <= count:
+        width += 1
+    span = _BASE ** width
+    keys = []
+    for index in range(1, count + 1):
+        value = index * span // (count + 1)
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, _BASE)
+            digits.append(DIGITS[digit])
+        keys.append("".join(reversed(digits)).rstrip("0"))
+    return keys
+
+def _midpoint(before: str, after: Optional[str]) -> str:
+    if after is not None:
+        # Copy the shared prefix, padding ``before`` with zeros
+        prefix = 0
+        while prefix < len(after) and (before[prefix] if prefix < len(before) else "0") == after[prefix]:
+            prefix += 1
+        if prefix > 0:
+            return after[:prefix] + _midpoint(before[prefix:], after[prefix:])
+
+    low = DIGITS.index(before[0]) if before else 0
+    high = DIGITS.index(after[0]) if after is not None else _BASE
+    if high - low > 1:
+        return DIGITS[(low + high) // 2]
+    # Adjacent first digits: a longer key between them
+    if after is not None and len(after) > 1:
+        return after[0]
+    return DIGITS[low] + _midpoint(before[1:], None)
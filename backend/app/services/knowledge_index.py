@@ -0,0 +1,306 @@
+import functools
+import json
+import logging
+import math
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..core.log import configure_logging
+from .claims import MIN_CLAIM_CHARS, content_terms, split_sentences, tokenize
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+CORPUS_SUFFIXES = {".txt", ".md"}
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "this", "to", "was", "were", "which", "with",
+}
+_BM25_K1 = 1.5
+_BM25_B = 0.75
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """numpy if installed, imported on first use so processes without a corpus never load it."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+@dataclass
+class Passage:
+    text: str
+    source: str
+    score: float = 0.0
+
+def _terms(tokens: List[str]) -> List[str]:
+    return [token for token in tokens if token not in _STOPWORDS]
+
+class KnowledgeIndex:
+    """Sentence-level retrieval over a directory of reference documents.
+
+    Candidates come from a BM25 inverted index and are re-ranked by cosine
+    similarity of hashed TF-IDF vectors, kept in a memory-mapped float32 .npy
+    file next to the passage list. Without NumPy the re-ranking falls back to
+    IDF-weighted term overlap. The index is rebuilt whenever the corpus
+    files change.
+    """
+
+    def __init__(self, corpus_dir: str, index_dir: str = "", dimensions: int = 1024):
+        self.corpus_dir = Path(corpus_dir) if corpus_dir else None
+        if index_dir:
+            self.index_dir = Path(index_dir)
+        else:
+            self.index_dir = self.corpus_dir / ".index" if self.corpus_dir else None
+        self.dimensions = dimensions
+
+        self.passages: List[Passage] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._idf: Dict[str, float] = {}
+        self._lengths: List[int] = []
+        self._average_length = 0.0
+        self._vectors = None
+        self.loaded = False
+
+        self.local_answers = 0
+        self.lookups = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.corpus_dir is not None and self.corpus_dir.is_dir()
+
+    def load(self) -> None:
+        """Open the on-disk index, rebuilding it first if the corpus changed."""
+        if not self.enabled:
+            return
+        start = time.perf_counter()
+        manifest = self._manifest()
+        if self._read_manifest() != manifest:
+            self._build(manifest)
+        else:
+            with open(self.index_dir / "passages.json", encoding="utf-8") as f:
+                self.passages = [Passage(text=text, source=source) for text, source in json.load(f)]
+        self._build_postings()
+        self._open_vectors()
+        self.loaded = True
+        logger.info("Loaded %d knowledge passages in %.2fs (dense vectors: %s)",
+                    len(self.passages), time.perf_counter() - start, self._vectors is not None)
+
+    def search(self, text: str, limit: int = 5) -> List[Passage]:
+        """Passages most similar to ``text``, best first, scored in [0, 1]."""
+        if not self.loaded or not self.passages:
+            return []
+        query_terms = _terms(tokenize(text))
+        if not query_terms:
+            return []
+
+        candidates = self._bm25(query_terms, limit * 4)
+        if not candidates:
+            return []
+
+        if self._vectors is not None:
+            query = self._vector(query_terms)
+            scores = self._vectors[candidates] @ query
+            ranked = [(float(score), index) for score, index in zip(scores, candidates)]
+        else:
+            ranked = [(self._overlap(query_terms, index), index) for index in candidates]
+
+        ranked.sort(reverse=True)
+        return [
+            Passage(text=self.passages[index].text, source=self.passages[index].source, score=round(score, 4))
+            for score, index in ranked[:limit]
+        ]
+
+    def answer(self, text: str) -> Optional[Dict[str, Any]]:
+        """A verdict for a claim that restates a reference passage, else None.
+
+        A high score only says the claim and the passage share most of their
+        terms; "increases" against "decreases" still scores high. So a claim
+        is answered here only when it has the passage's terms in the passage's
+        order, differing in stopwords alone. Anything short of that goes to
+        a provider, which gets the passage as context.
+        """
+        if not self.loaded:
+            return None
+        self.lookups += 1
+        matches = self.search(text, limit=1)
+        if not matches:
+            return None
+        best = matches[0]
+        if best.score < settings.knowledge_answer_threshold or not _restates(text, best.text):
+            return None
+
+        self.local_answers += 1
+        return {
+            "result": f'Correct. This matches the reference text: "{best.text}"',
+            "confidence": round(min(best.score, 0.95), 2),
+            "sources": [f"{best.source}: {best.text}"],
+        }
+
+    def context(self, texts: List[str]) -> List[Passage]:
+        """Reference passages worth putting in a provider prompt for these claims."""
+        passages: Dict[str, Passage] = {}
+        for text in texts:
+            for passage in self.search(text, limit=settings.knowledge_context_passages):
+                if passage.score >= settings.knowledge_context_threshold:
+                    passages.setdefault(passage.text, passage)
+        ranked = sorted(passages.values(), key=lambda passage: passage.score, reverse=True)
+        return ranked[:max(settings.knowledge_context_passages, len(texts))]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "loaded": self.loaded,
+            "passages": len(self.passages),
+            "denseVectors": self._vectors is not None,
+            "lookups": self.lookups,
+            "localAnswers": self.local_answers,
+        }
+
+    def _build(self, manifest: Dict[str, Any]) -> None:
+        passages = []
+        for path in sorted(self._corpus_files()):
+            source = str(path.relative_to(self.corpus_dir))
+            text = path.read_text(encoding="utf-8", errors="replace")
+            for paragraph in re.split(r"\n\s*\n", text):
+                paragraph = " ".join(paragraph.split())
+                for start, end in split_sentences(paragraph):
+                    sentence = paragraph[start:end]
+                    if sum(ch.isalnum() for ch in sentence) >= MIN_CLAIM_CHARS:
+                        passages.append(Passage(text=sentence, source=source))
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.index_dir / "passages.json", "w", encoding="utf-8") as f:
+            json.dump([[passage.text, passage.source] for passage in passages], f, ensure_ascii=False)
+        self.passages = passages
+
+        vectors_path = self.index_dir / "vectors.npy"
+        if vectors_path.exists():
+            vectors_path.unlink()
+        np = _numpy()
+        if np is not None and passages:
+            self._build_postings()
+            vectors = np.lib.format.open_memmap(
+                vectors_path, mode="w+", dtype=np.float32, shape=(len(passages), self.dimensions)
+            )
+            for index, passage in enumerate(passages):
+                vectors[index] = self._vector(_terms(tokenize(passage.text)))
+            vectors.flush()
+            del vectors
+
+        # The manifest goes last so an interrupted build is redone on next load
+        with open(self.index_dir / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        logger.info("Indexed %d knowledge passages from %d files", len(passages), len(manifest["files"]))
+
+    def _build_postings(self) -> None:
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = []
+        for index, passage in enumerate(self.passages):
+            terms = _terms(tokenize(passage.text))
+            lengths.append(len(terms))
+            counts: Dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                postings.setdefault(term, []).append((index, count))
+
+        total = len(self.passages)
+        self._postings = postings
+        self._lengths = lengths
+        self._average_length = sum(lengths) / total if total else 0.0
+        self._idf = {
+            term: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in postings.items()
+        }
+
+    def _open_vectors(self) -> None:
+        self._vectors = None
+        vectors_path = self.index_dir / "vectors.npy"
+        np = _numpy()
+        if np is None or not vectors_path.exists():
+            return
+        vectors = np.load(vectors_path, mmap_mode="r")
+        if vectors.shape == (len(self.passages), self.dimensions):
+            self._vectors = vectors
+
+    def _bm25(self, query_terms: List[str], limit: int) -> List[int]:
+        scores: Dict[int, float] = {}
+        for term in set(query_terms):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for index, count in self._postings[term]:
+                norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * self._lengths[index] / self._average_length)
+                scores[index] = scores.get(index, 0.0) + idf * count * (_BM25_K1 + 1) / (count + norm)
+        return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+    def _vector(self, terms: List[str]):
+        """L2-normalized hashed TF-IDF vector over unigrams and adjacent bigrams."""
+        np = _numpy()
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        features = [(term, self._idf.get(term, 1.0)) for term in terms]
+        features += [
+            (f"{a} {b}", (self._idf.get(a, 1.0) + self._idf.get(b, 1.0)) / 2)
+            for a, b in zip(terms, terms[1:])
+        ]
+        for feature, weight in features:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.dimensions] += sign * weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _overlap(self, query_terms: List[str], index: int) -> float:
+        """Geometric mean of IDF-weighted term coverage in both directions."""
+        query = set(query_terms)
+        passage = set(_terms(tokenize(self.passages[index].text)))
+        shared = sum(self._idf.get(term, 1.0) for term in query & passage)
+        query_weight = sum(self._idf.get(term, 1.0) for term in query)
+        passage_weight = sum(self._idf.get(term, 1.0) for term in passage)
+        if not query_weight or not passage_weight:
+            return 0.0
+        return math.sqrt((shared / query_weight) * (shared / passage_weight))
+
+    def _corpus_files(self) -> List[Path]:
+        return [
+            path for path in self.corpus_dir.rglob("*")
+            if path.is_file() and path.suffix.lower() in CORPUS_SUFFIXES and self.index_dir not in path.parents
+        ]
+
+    def _manifest(self) -> Dict[str, Any]:
+        files = {}
+        for path in self._corpus_files():
+            stat = path.stat()
+            files[str(path.relative_to(self.corpus_dir))] = [stat.st_size, stat.st_mtime_ns]
+        return {"format": INDEX_FORMAT, "dimensions": self.dimensions, "dense": _numpy() is not None, "files": files}
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.index_dir / "manifest.json", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+def _restates(claim: str, passage: str) -> bool:
+    """Whether the two differ in stopwords only."""
+    return content_terms(tokenize(claim)) == content_terms(tokenize(passage))
+
+knowledge_index = KnowledgeIndex(
+    corpus_dir=settings.knowledge_corpus_dir,
+    index_dir=settings.knowledge_index_dir,
+    dimensions=settings.knowledge_dimensions,
+)
+
+if __name__ == "__main__":
+    # python -m app.services.knowledge_index  (rebuilds when the corpus changed)
+    configure_logging()
+    knowledge_index.load()
+    print(json.dumps(knowledge_index.stats()))
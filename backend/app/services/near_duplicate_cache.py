@@ -0,0 +1,298 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no cross-process lock; run a single worker there
+    fcntl = None
+
+from ..core.config import settings
+from .claims import content_terms, tokenize
+
+logger = logging.getLogger(__name__)
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+class _Entry:
+    __slots__ = ("text", "result", "shingles", "signature", "terms", "created_at")
+
+    def __init__(self, text: str, result: Dict[str, Any], shingles: FrozenSet[int],
+                 signature: Tuple[int, ...], created_at: float):
+        self.text = text
+        self.result = result
+        self.shingles = shingles
+        self.signature = signature
+        self.terms = content_terms(tokenize(text))
+        self.created_at = created_at
+
+class NearDuplicateCache:
+    """MinHash/LSH lookup of verdicts for claims worded almost like earlier ones.
+
+    Claims are shingled into word unigrams and bigrams and summarized by a
+    MinHash signature split into LSH bands; candidates sharing any band are
+    scored by exact Jaccard similarity of their shingles. A candidate only
+    matches when the two claims differ in stopwords alone: every other word,
+    negations and numbers included, must be the same and in the same order.
+    A high Jaccard score is no evidence of the same meaning, since "boils at
+    90" and "boils at 100", "increases" and "decreases" or "the Sun orbits
+    the Earth" and "the Earth orbits the Sun" share most of their shingles.
+
+    Entries are kept in LRU order up to ``max_entries`` and appended to a
+    JSON-lines file, which is replayed on startup and compacted when it grows
+    to twice the bound. Every worker process appends to the same file from a
+    background thread, under an exclusive lock on ``<path>.lock``;
+    compaction rewrites it from the records of all of them, not from one
+    process's memory.
+    """
+
+    def __init__(self, threshold: float, max_entries: int, ttl: float, path: str,
+                 bands: int = 16, rows: int = 4):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.bands = bands
+        self.rows = rows
+
+        # Fixed seed: signatures must stay comparable across restarts
+        rng = random.Random(0x5EED)
+        self._permutations = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(bands * rows)
+        ]
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+        self._log_lines = 0
+        # Records waiting for the writer task, which appends them off the event loop
+        self._unwritten: List[Dict[str, Any]] = []
+        self._writer: Optional[asyncio.Task] = None
+        self.loaded = False
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def load(self) -> None:
+        """Replay the persisted entries, keeping the newest ``max_entries``."""
+        if not self.enabled or self.loaded:
+            return
+        self.loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        with self._locked():
+            if self._line_count() > 2 * self.max_entries:
+                self._compact()
+            for record in self._read_records():
+                self._insert(record["k"], record["text"], record["result"], record["t"])
+            self._log_lines = self._line_count()
+        logger.info("Loaded %d near-duplicate claims from %s", len(self._entries), self.path)
+
+    def lookup(self, text: str) -> Optional[Dict[str, Any]]:
+        """The stored verdict of the closest earlier claim, with ``matchScore`` set."""
+        if not self.enabled:
+            return None
+        shingles = _shingles(text)
+        if not shingles:
+            return None
+        signature = self._signature(shingles)
+        terms = content_terms(tokenize(text))
+
+        now = time.time()
+        best_key, best_score = None, 0.0
+        for candidate_key in self._candidates(signature):
+            entry = self._entries.get(candidate_key)
+            if entry is None:
+                continue
+            if self.ttl > 0 and now - entry.created_at > self.ttl:
+                continue
+            if entry.terms != terms:
+                continue
+            score = len(shingles & entry.shingles) / len(shingles | entry.shingles)
+            if score > best_score:
+                best_key, best_score = candidate_key, score
+
+        if best_key is None or best_score < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(best_key)
+        entry = self._entries[best_key]
+        result = dict(entry.result)
+        result["matchScore"] = round(best_score, 4)
+        result["matchedText"] = entry.text
+        return result
+
+    def add(self, key: str, text: str, result: Dict[str, Any]) -> None:
+        if not self.enabled or key in self._entries:
+            return
+        result = {name: value for name, value in result.items() if name not in ("cached", "matchScore", "matchedText")}
+        created_at = time.time()
+        if not self._insert(key, text, result, created_at):
+            return
+        if self.path:
+            self._unwritten.append({"k": key, "text": text, "result": result, "t": created_at})
+            if self._writer is None or self._writer.done():
+                self._writer = asyncio.create_task(self._write_unwritten())
+
+    async def flush(self) -> None:
+        """Wait until every added claim has been written to the file."""
+        if self._writer is not None:
+            await self._writer
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._buckets.clear()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self._log_lines = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _insert(self, key: str, text: str, result: Dict[str, Any], created_at: float) -> bool:
+        shingles = _shingles(text)
+        if not shingles:
+            return False
+        self._remove(key)
+        entry = _Entry(text, result, shingles, self._signature(shingles), created_at)
+        self._entries[key] = entry
+        for band in self._bands(entry.signature):
+            self._buckets.setdefault(band, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+        return True
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band in self._bands(entry.signature):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def _candidates(self, signature: Tuple[int, ...]) -> Set[str]:
+        candidates: Set[str] = set()
+        for band in self._bands(signature):
+            candidates |= self._buckets.get(band, set())
+        return candidates
+
+    def _bands(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def _signature(self, shingles: FrozenSet[int]) -> Tuple[int, ...]:
+        return tuple(
+            min(((a * shingle + b) % _PRIME) & _MAX_HASH for shingle in shingles)
+            for a, b in self._permutations
+        )
+
+    async def _write_unwritten(self) -> None:
+        while self._unwritten:
+            records, self._unwritten = self._unwritten, []
+            await asyncio.to_thread(self._append, records)
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._locked():
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+                self._log_lines += len(records)
+                if self._log_lines > 2 * self.max_entries:
+                    self._compact()
+        except OSError as e:
+            logger.warning("Could not persist near-duplicate claims: %s", e)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_records(self) -> Iterator[Dict[str, Any]]:
+        """Unexpired records of the file, oldest first; the caller holds the lock."""
+        now = time.time()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if self.ttl > 0 and now - record["t"] > self.ttl:
+                    continue
+                yield record
+
+    def _line_count(self) -> int:
+        with open(self.path, "rb") as f:
+            return sum(1 for _ in f)
+
+    def _compact(self) -> None:
+        """Rewrite the file with the newest ``max_entries`` live claims of every process.
+
+        The caller holds the lock. The new file is written under a unique name
+        next to the log, so a crash or another writer never sees it half-done.
+        """
+        records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        for record in self._read_records():
+            records.pop(record["k"], None)
+            records[record["k"]] = record
+        kept = list(records.values())[-self.max_entries:]
+
+        fd, temporary = tempfile.mkstemp(
+            dir=os.path.dirname(self.path) or ".", prefix=f"{os.path.basename(self.path)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in kept))
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        self._log_lines = len(kept)
+
+def _shingles(text: str) -> FrozenSet[int]:
+    """Hashed word unigrams and bigrams of the normalized claim."""
+    words = tokenize(text)
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return frozenset(zlib.crc32(gram.encode("utf-8")) for gram in grams)
+
+near_duplicate_cache = NearDuplicateCache(
+    threshold=settings.near_duplicate_threshold,
+    max_entries=settings.near_duplicate_max_entries,
+    ttl=settings.near_duplicate_ttl,
+    path=settings.near_duplicate_path,
+)
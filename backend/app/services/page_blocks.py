@@ -0,0 +1,107 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Text, cast, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.page import Page, PageBlock
+from . import page_search
+from .fractional_index import evenly_spaced_keys
+
+def block_text(node: Any) -> str:
+    return page_search.content_text([node])
+
+async def content_json(db: AsyncSession, page_id: str) -> bytes:
+    """The page's content array, spliced together from the stored block JSON."""
+    result = await db.execute(
+        select(cast(PageBlock.content, Text))
+        .where(PageBlock.page_id == page_id)
+        .order_by(PageBlock.position)
+    )
+    return b"[" + b",".join(text.encode("utf-8") for text in result.scalars()) + b"]"
+
+async def load_content(db: AsyncSession, page_id: str) -> List[Any]:
+    result = await db.execute(
+        select(PageBlock.content).where(PageBlock.page_id == page_id).order_by(PageBlock.position)
+    )
+    return list(result.scalars())
+
+async def replace_blocks(db: AsyncSession, page_id: str, content: List[Any]) -> None:
+    """Rewrite every block of a page from a full content array (not committed)."""
+    await db.execute(delete(PageBlock).where(PageBlock.page_id == page_id))
+    now = datetime.utcnow()
+    db.add_all([
+        PageBlock(page_id=page_id, position=position, content=node, text=block_text(node), updated_at=now)
+        for position, node in zip(evenly_spaced_keys(len(content)), content)
+    ])
+    await db.flush()
+
+async def neighbour_positions(db: AsyncSession, page_id: str, after_id: Optional[str],
+                              before_id: Optional[str]) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """Positions a new block goes between, or None if a neighbour id is unknown."""
+    if after_id is not None:
+        low = await _position(db, page_id, after_id)
+        if low is None:
+            return None
+        high = await db.scalar(
+            select(func.min(PageBlock.position))
+            .where(PageBlock.page_id == page_id, PageBlock.position > low)
+        )
+        return low, high
+    if before_id is not None:
+        high = await _position(db, page_id, before_id)
+        if high is None:
+            return None
+        low = await db.scalar(
+            select(func.max(PageBlock.position))
+            .where(PageBlock.page_id == page_id, PageBlock.position < high)
+        )
+        return low, high
+    low = await db.scalar(select(func.max(PageBlock.position)).where(PageBlock.page_id == page_id))
+    return low, None
+
+async def block_index(db: AsyncSession, page_id: str, position: str) -> int:
+    """Index in the content array of the block at ``position``."""
+    return await db.scalar(
+        select(func.count()).select_from(PageBlock).where(PageBlock.page_id == page_id, PageBlock.position < position)
+    )
+
+async def touch_page(db: AsyncSession, page_id: str, text_changed: bool) -> Optional[Tuple[int, datetime]]:
+    """Bump the page version after a block write, refreshing search columns if the text changed.
+
+    The search text is re-aggregated inside the database from the per-block
+    text column, so no block content is read back into Python.
+    """
+    table = Page.__table__
+    values: Dict[str, Any] = {"version": table.c.version + 1, "updated_at": datetime.utcnow()}
+    if text_changed:
+        text = func.coalesce(_aggregated_text(db, page_id), "")
+        values["search_text"] = text
+        if db.bind.dialect.name == "postgresql":
+            values["search_vector"] = page_search.search_vector(table.c.title, text)
+    row = (await db.execute(
+        update(table).where(table.c.id == page_id).values(**values).returning(table.c.version, table.c.updated_at)
+    )).first()
+    return (row.version, row.updated_at) if row is not None else None
+
+def _aggregated_text(db: AsyncSession, page_id: str):
+    blocks = PageBlock.__table__
+    if db.bind.dialect.name == "postgresql":
+        return (
+            select(func.string_agg(blocks.c.text, aggregate_order_by(literal("\n"), blocks.c.position)))
+            .where(blocks.c.page_id == page_id, blocks.c.text != "")
+            .scalar_subquery()
+        )
+    ordered = (
+        select(blocks.c.text)
+        .where(blocks.c.page_id == page_id, blocks.c.text != "")
+        .order_by(blocks.c.position)
+        .subquery()
+    )
+    return select(func.group_concat(ordered.c.text, "\n")).scalar_subquery()
+
+async def _position(db: AsyncSession, page_id: str, block_id: str) -> Optional[str]:
+    return await db.scalar(
+        select(PageBlock.position).where(PageBlock.id == block_id, PageBlock.page_id == page_id)
+    )
@@ -0,0 +1,272 @@
+import argparse
+import asyncio
+import json
+import logging
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..core.log import configure_logging
+from ..models.page import Page, PageVersion
+from . import page_blocks
+from .content_patch import apply_json_patch
+
+logger = logging.getLogger(__name__)
+
+class PageHistory:
+    """Version history of pages as compressed snapshots plus JSON Patch deltas.
+
+    Each write that changes a page's title or content adds one entry in the
+    same transaction: usually a delta from the previous entry, and a full
+    snapshot once the deltas since the last snapshot outweigh it (or every
+    ``snapshot_interval`` versions, which bounds the replay). Storage grows
+    with the size of the edits rather than document size times saves.
+
+    Versions without an entry (sharing, storage-mode changes) did not change
+    the document, so they rebuild to the nearest entry below them.
+    """
+
+    def __init__(self, snapshot_interval: int, snapshot_ratio: float, retention_days: float,
+                 min_versions: int, compact_interval: float):
+        self.snapshot_interval = max(snapshot_interval, 1)
+        self.snapshot_ratio = snapshot_ratio
+        self.retention_days = retention_days
+        self.min_versions = max(min_versions, 1)
+        self.compact_interval = compact_interval
+        self._task: Optional[asyncio.Task] = None
+
+        self.snapshots = 0
+        self.deltas = 0
+        self.compacted = 0
+
+    async def start(self) -> None:
+        if self.compact_interval > 0 and self.retention_days > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def record(self, db: AsyncSession, page_id: str, version: int, ops: List[Dict[str, Any]],
+                     title: Optional[str] = None, current: Optional[Tuple[str, List[Any]]] = None) -> None:
+        """Add the history entry for ``version`` to the session (not committed).
+
+        ``ops`` is the JSON Patch from the previous version's content and
+        ``title`` the new title if it changed. ``current`` is the new
+        (title, content) when the caller has it at hand; otherwise the content
+        is read back from the database if a snapshot is due, so callers
+        passing None must have written it already.
+        """
+        if not ops and title is None:
+            return
+
+        result = await db.execute(
+            select(PageVersion.version, PageVersion.kind, PageVersion.size)
+            .where(
+                PageVersion.page_id == page_id,
+                PageVersion.version >= func.coalesce(self._last_snapshot(page_id), 0),
+            )
+        )
+        entries = result.all()
+        snapshot = next((entry for entry in entries if entry.kind == "snapshot"), None)
+
+        if snapshot is not None:
+            delta: Dict[str, Any] = {"ops": ops}
+            if title is not None:
+                delta["title"] = title
+            encoding, payload = _compress(delta)
+            delta_bytes = sum(entry.size for entry in entries if entry.kind == "delta") + len(payload)
+            if (version - snapshot.version < self.snapshot_interval
+                    and delta_bytes < snapshot.size * self.snapshot_ratio):
+                db.add(PageVersion(
+                    page_id=page_id, version=version, kind="delta", encoding=encoding,
+                    payload=payload, size=len(payload), created_at=datetime.utcnow(),
+                ))
+                self.deltas += 1
+                return
+
+        if current is None:
+            stored_title, content = await self._load_current(db, page_id)
+            current = (title if title is not None else stored_title, content)
+        db.add(self._snapshot(page_id, version, *current))
+        self.snapshots += 1
+
+    async def list_versions(self, db: AsyncSession, page_id: str, limit: int = 50,
+                            before: Optional[int] = None) -> List[Any]:
+        """History entries newest first, without their payloads."""
+        query = (
+            select(PageVersion.version, PageVersion.kind, PageVersion.size, PageVersion.created_at)
+            .where(PageVersion.page_id == page_id)
+            .order_by(PageVersion.version.desc())
+            .limit(limit)
+        )
+        if before is not None:
+            query = query.where(PageVersion.version < before)
+        return list((await db.execute(query)).all())
+
+    async def rebuild(self, db: AsyncSession, page_id: str,
+                      version: int) -> Optional[Tuple[int, datetime, str, List[Any]]]:
+        """Replay deltas from the nearest snapshot at or below ``version``.
+
+        Returns (entry version, entry created_at, title, content), or None if
+        the version predates the retained history.
+        """
+        base = await db.scalar(
+            select(func.max(PageVersion.version))
+            .where(PageVersion.page_id == page_id, PageVersion.kind == "snapshot", PageVersion.version <= version)
+        )
+        if base is None:
+            return None
+        result = await db.execute(
+            select(PageVersion)
+            .where(PageVersion.page_id == page_id, PageVersion.version >= base, PageVersion.version <= version)
+            .order_by(PageVersion.version)
+        )
+        title, content, entry = "", [], None
+        for entry in result.scalars():
+            data = _decompress(entry.encoding, entry.payload)
+            if entry.kind == "snapshot":
+                title, content = data["title"], data["content"]
+            else:
+                content = apply_json_patch(content, data["ops"]) if data["ops"] else content
+                title = data.get("title", title)
+        return entry.version, entry.created_at, title, content
+
+    async def compact(self) -> int:
+        """Drop entries past the retention window; returns the pages compacted.
+
+        The oldest kept entry is rewritten as a snapshot when it is a delta, so
+        every retained version can still be rebuilt. The newest
+        ``min_versions`` entries of a page are always kept.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        async with AsyncSessionLocal() as db:
+            page_ids = list((await db.execute(
+                select(PageVersion.page_id).where(PageVersion.created_at < cutoff).distinct()
+            )).scalars())
+
+        compacted = 0
+        for page_id in page_ids:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(PageVersion.version, PageVersion.kind, PageVersion.created_at)
+                    .where(PageVersion.page_id == page_id)
+                    .order_by(PageVersion.version.desc())
+                )
+                entries = result.all()
+                kept = [
+                    entry for index, entry in enumerate(entries)
+                    if index < self.min_versions or entry.created_at >= cutoff
+                ]
+                oldest = kept[-1]
+                if oldest.version == entries[-1].version:
+                    continue
+
+                if oldest.kind == "delta":
+                    _, _, title, content = await self.rebuild(db, page_id, oldest.version)
+                    snapshot = self._snapshot(page_id, oldest.version, title, content)
+                    await db.execute(
+                        update(PageVersion)
+                        .where(PageVersion.page_id == page_id, PageVersion.version == oldest.version)
+                        .values(kind="snapshot", encoding=snapshot.encoding, payload=snapshot.payload,
+                                size=snapshot.size)
+                    )
+                await db.execute(
+                    delete(PageVersion).where(PageVersion.page_id == page_id, PageVersion.version < oldest.version)
+                )
+                await db.commit()
+            compacted += 1
+
+        self.compacted += compacted
+        return compacted
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "compression": "zstd" if zstandard is not None else "zlib",
+            "snapshots": self.snapshots,
+            "deltas": self.deltas,
+            "compactedPages": self.compacted,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            try:
+                compacted = await self.compact()
+                if compacted:
+                    logger.info("Compacted history of %d pages", compacted)
+            except Exception as e:
+                logger.error("Page history compaction failed: %s", e)
+
+    def _last_snapshot(self, page_id: str):
+        return (
+            select(func.max(PageVersion.version))
+            .where(PageVersion.page_id == page_id, PageVersion.kind == "snapshot")
+            .scalar_subquery()
+        )
+
+    def _snapshot(self, page_id: str, version: int, title: str, content: List[Any]) -> PageVersion:
+        return PageVersion(**self.snapshot_values(page_id, version, title, content))
+
+    def snapshot_values(self, page_id: str, version: int, title: str, content: List[Any]) -> Dict[str, Any]:
+        """Column values of a snapshot entry, for bulk inserts that bypass ``record``."""
+        encoding, payload = _compress({"title": title, "content": content})
+        return {
+            "page_id": page_id, "version": version, "kind": "snapshot", "encoding": encoding,
+            "payload": payload, "size": len(payload), "created_at": datetime.utcnow(),
+        }
+
+    async def _load_current(self, db: AsyncSession, page_id: str) -> Tuple[str, List[Any]]:
+        page = (await db.execute(
+            select(Page.title, Page.content, Page.storage_mode).where(Page.id == page_id)
+        )).first()
+        if page.storage_mode == "blocks":
+            return page.title, await page_blocks.load_content(db, page_id)
+        return page.title, page.content or []
+
+def _compress(data: Dict[str, Any]) -> Tuple[str, bytes]:
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(raw)
+    return "zlib", zlib.compress(raw, 9)
+
+def _decompress(encoding: str, payload: bytes) -> Dict[str, Any]:
+    if encoding == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this page version")
+        raw = zstandard.ZstdDecompressor().decompress(payload)
+    else:
+        raw = zlib.decompress(payload)
+    return json.loads(raw)
+
+page_history = PageHistory(
+    snapshot_interval=settings.page_history_snapshot_interval,
+    snapshot_ratio=settings.page_history_snapshot_ratio,
+    retention_days=settings.page_history_retention_days,
+    min_versions=settings.page_history_min_versions,
+    compact_interval=settings.page_history_compact_interval,
+)
+
+if __name__ == "__main__":
+    # python -m app.services.page_history --compact
+    parser = argparse.ArgumentParser(description="Maintain page version history")
+    parser.add_argument("--compact", action="store_true", help="drop entries past the retention window")
+    args = parser.parse_args()
+    configure_logging()
+    if args.compact:
+        print(f"[PAGE HISTORY] Compacted history of {asyncio.run(page_history.compact())} pages")
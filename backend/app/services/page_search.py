@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import html
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Text, bindparam, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..core.log import configure_logging
+from ..models.page import Page, PageBlock
+from .claims import iter_text_blocks
+
+logger = logging.getLogger(__name__)
+
+# ts_headline options: a couple of short fragments around the matches
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=18, MinWords=6, FragmentDelimiter=\" … \""
+SNIPPET_CHARS = 160
+
+def content_text(content: Optional[List[Any]]) -> str:
+    """Plain text of a Slate document, one line per text block."""
+    return "\n".join(text for _, text in iter_text_blocks(content or []))
+
+def _config():
+    return cast(literal(settings.search_language), REGCONFIG)
+
+def search_vector(title: Any, text: Any):
+    """tsvector weighting the title above the body; arguments may be columns or values."""
+    return func.setweight(func.to_tsvector(_config(), func.coalesce(title, "")), "A").op("||")(
+        func.setweight(func.to_tsvector(_config(), func.coalesce(text, "")), "B")
+    )
+
+def search_query(query: str):
+    return func.websearch_to_tsquery(_config(), query)
+
+def headline(text: Any, ts_query: Any):
+    return func.ts_headline(_config(), text, ts_query, HEADLINE_OPTIONS)
+
+def search_values(db: AsyncSession, title: Any, content: Optional[List[Any]] = None,
+                  content_changed: bool = True) -> Dict[str, Any]:
+    """Column values that keep the search index current after a write.
+
+    The plain text is only re-derived when the content changed; a title-only
+    change re-weights the vector from the stored text.
+    """
+    values: Dict[str, Any] = {}
+    if content_changed:
+        values["search_text"] = content_text(content)
+    if db.bind.dialect.name == "postgresql":
+        values["search_vector"] = search_vector(title, values.get("search_text", Page.search_text))
+    return values
+
+def fallback_snippet(text: str, query: str) -> str:
+    """Highlight the first matching term, like ts_headline, for databases without it."""
+    terms = [term for term in re.findall(r"\w+", query.lower()) if term != "or"]
+    lowered = text.lower()
+    positions = [position for position in (lowered.find(term) for term in terms) if position >= 0]
+    if not positions:
+        return html.escape(text[:SNIPPET_CHARS])
+    start = max(min(positions) - SNIPPET_CHARS // 3, 0)
+    fragment = html.escape(text[start:start + SNIPPET_CHARS])
+    for term in terms:
+        fragment = re.sub(f"({re.escape(term)})", r"<b>\1</b>", fragment, flags=re.IGNORECASE)
+    return ("… " if start else "") + fragment
+
+async def backfill(batch_size: int = 500, rebuild: bool = False) -> int:
+    """Populate the search columns in primary-key batches; returns pages updated.
+
+    Only pages without search text are touched unless ``rebuild`` is set.
+    Versions and updated_at are left alone, so clients see no change.
+    """
+    table = Page.__table__
+    updated = 0
+    last_id = ""
+    while True:
+        async with AsyncSessionLocal() as db:
+            query = (
+                select(table.c.id, table.c.title, table.c.content, table.c.storage_mode)
+                .where(table.c.id > last_id)
+                .order_by(table.c.id)
+                .limit(batch_size)
+            )
+            if not rebuild:
+                query = query.where(table.c.search_text.is_(None))
+            rows = (await db.execute(query)).all()
+            if not rows:
+                return updated
+
+            values = {
+                "search_text": bindparam("b_search_text"),
+                "updated_at": table.c.updated_at,
+            }
+            if db.bind.dialect.name == "postgresql":
+                values["search_vector"] = search_vector(table.c.title, bindparam("b_search_text", type_=Text))
+            statement = update(table).where(table.c.id == bindparam("b_id")).values(**values)
+            params = []
+            for row in rows:
+                if row.storage_mode == "blocks":
+                    text = await _block_text(db, row.id)
+                else:
+                    text = content_text(row.content)
+                params.append({"b_id": row.id, "b_search_text": text})
+            await db.execute(statement, params)
+            await db.commit()
+
+        updated += len(rows)
+        last_id = rows[-1].id
+        logger.info("Indexed %d pages", updated)
+
+async def _block_text(db: AsyncSession, page_id: str) -> str:
+    result = await db.execute(
+        select(PageBlock.text)
+        .where(PageBlock.page_id == page_id, PageBlock.text != "")
+        .order_by(PageBlock.position)
+    )
+    return "\n".join(result.scalars())
+
+if __name__ == "__main__":
+    # python -m app.services.page_search [--batch-size N] [--rebuild]
+    parser = argparse.ArgumentParser(description="Backfill the page full-text search columns")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--rebuild", action="store_true", help="re-index pages that already have search text")
+    args = parser.parse_args()
+    configure_logging()
+    print(f"[PAGE SEARCH] Backfill complete: {asyncio.run(backfill(args.batch_size, args.rebuild))} pages")
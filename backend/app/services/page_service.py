@@ -1,12 +1,46 @@
+import base64
+import json
+import logging
+import re
 import uuid
-from typing import List, Optional
+from typing import Any, List, NamedTuple, Optional, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session
-from ..models.page import Page
-from ..schemas.page import PageCreate, PageUpdate
+from sqlalchemy import JSON, Text, and_, cast, delete, func, literal, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
+from ..models.fact_check import BlockFactCheck, FactCheckJob
+from ..models.page import Page, PageBlock, PageVersion
+from ..schemas.page import PageCreate, PageUpdate, PagePatch, encode_page_json
+from . import page_blocks, page_search
+from .content_patch import apply_json_patch, apply_slate_operations, diff_json, is_array_index, parse_pointer
+from .fractional_index import key_between
+from .page_history import page_history
+from .shared_page_cache import shared_page_cache
+
+logger = logging.getLogger(__name__)
+
+# Postgres path elements it would read as array subscripts, including "-1" (last) and "01"
+_INTEGER_TOKEN = re.compile(r"^\s*[+-]?\d+\s*$")
+
+class VersionConflictError(Exception):
+    def __init__(self, current_version: int):
+        super().__init__(f"Page is at version {current_version}")
+        self.current_version = current_version
+
+class StorageModeError(Exception):
+    pass
+
+class PageJSON(NamedTuple):
+    id: str
+    version: int
+    updated_at: datetime
+    body: bytes
 
 class PageService:
-    def create_page(self, db: Session, page: PageCreate) -> Page:
+    async def create_page(self, db: AsyncSession, page: PageCreate) -> Page:
         db_page = Page(
             id=str(uuid.uuid4()),
             title=page.title,
@@ -14,79 +48,495 @@ class PageService:
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
+        for field, value in page_search.search_values(db, db_page.title, db_page.content).items():
+            setattr(db_page, field, value)
         db.add(db_page)
-        db.commit()
-        db.refresh(db_page)
+        await page_history.record(db, db_page.id, 1, [], title=db_page.title,
+                                  current=(db_page.title, db_page.content))
+        await db.commit()
+        await db.refresh(db_page)
         return db_page
 
-    def get_page(self, db: Session, page_id: str) -> Optional[Page]:
-        return db.query(Page).filter(Page.id == page_id).first()
+    async def get_page(self, db: AsyncSession, page_id: str) -> Optional[Page]:
+        return await db.get(Page, page_id)
 
-    def get_page_by_share_token(self, db: Session, token: str) -> Optional[Page]:
-        print(f"[PAGE SERVICE] Searching for page with token: {token}")
-        
-        # First, check if any page with this token exists at all
-        any_page = db.query(Page).filter(Page.share_token == token).first()
-        
-        if any_page:
-            print(f"[PAGE SERVICE] Found page: id={any_page.id}, title={any_page.title}")
-            print(f"[PAGE SERVICE] Page is_public: {any_page.is_public}")
-            print(f"[PAGE SERVICE] Page share_token: {any_page.share_token}")
+    async def get_page_json(self, db: AsyncSession, page_id: Optional[str] = None,
+                            share_token: Optional[str] = None) -> Optional[PageJSON]:
+        """Serialize a page straight from its stored JSON text.
+
+        The content column is read as text and spliced into the response body,
+        so large documents are never decoded into Python objects or walked by
+        pydantic. Field names match the ``Page`` response schema.
+        """
+        query = select(
+            Page.id, Page.title, cast(Page.content, Text).label("content_json"), Page.created_at,
+            Page.updated_at, Page.is_public, Page.share_token, Page.version, Page.storage_mode,
+        )
+        if page_id is not None:
+            query = query.where(Page.id == page_id)
         else:
-            print(f"[PAGE SERVICE] No page found with token: {token}")
-            
-            # Debug: Show all pages with share tokens
-            all_shared_pages = db.query(Page).filter(Page.share_token.isnot(None)).all()
-            print(f"[PAGE SERVICE] Total pages with share tokens: {len(all_shared_pages)}")
-            for p in all_shared_pages:
-                print(f"[PAGE SERVICE] Existing shared page: {p.id} - token: {p.share_token} - public: {p.is_public}")
-        
-        # Now get the public page only
-        public_page = db.query(Page).filter(
-            Page.share_token == token, 
-            Page.is_public == True
-        ).first()
-        
-        if public_page:
-            print(f"[PAGE SERVICE] Found public page: {public_page.id}")
+            query = query.where(Page.share_token == share_token, Page.is_public == True)
+
+        row = (await db.execute(query)).first()
+        if row is None:
+            return None
+
+        if row.storage_mode == "blocks":
+            content_json = await page_blocks.content_json(db, row.id)
         else:
-            print(f"[PAGE SERVICE] No public page found with token: {token}")
-        
-        return public_page
+            content_json = row.content_json.encode("utf-8") if row.content_json is not None else None
+        body = encode_page_json(row, content_json)
+        return PageJSON(row.id, row.version, row.updated_at, body)
+
+    async def get_content(self, db: AsyncSession, page: Page) -> List[Any]:
+        """The page's Slate content, whichever storage mode it uses."""
+        if page.storage_mode == "blocks":
+            return await page_blocks.load_content(db, page.id)
+        return page.content or []
+
+    async def get_page_by_share_token(self, db: AsyncSession, token: str) -> Optional[Page]:
+        query = select(Page).where(Page.share_token == token, Page.is_public == True)
+        return (await db.execute(query)).scalars().first()
+
+    async def get_pages(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Page]:
+        result = await db.execute(select(Page).order_by(Page.updated_at.desc()).offset(skip).limit(limit))
+        pages = result.scalars().all()
+        for page in pages:
+            if page.storage_mode == "blocks":
+                set_committed_value(page, "content", await page_blocks.load_content(db, page.id))
+        return pages
+
+    async def get_page_summaries(self, db: AsyncSession, limit: int = 50,
+                                 cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+        """List id/title/updated_at/is_public, newest first, by keyset pagination.
+
+        ``cursor`` is the opaque value returned with the previous batch; the
+        query seeks on the (updated_at, id) index so every batch costs the same.
+        """
+        query = (
+            select(Page.id, Page.title, Page.updated_at, Page.is_public)
+            .order_by(Page.updated_at.desc(), Page.id.desc())
+            .limit(limit)
+        )
+        if cursor:
+            updated_at, page_id = self._decode_cursor(cursor)
+            query = query.where(tuple_(Page.updated_at, Page.id) < tuple_(updated_at, page_id))
+
+        rows = (await db.execute(query)).all()
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = self._encode_cursor(rows[-1].updated_at, rows[-1].id)
+        return rows, next_cursor
 
-    def get_pages(self, db: Session, skip: int = 0, limit: int = 100) -> List[Page]:
-        return db.query(Page).order_by(Page.updated_at.desc()).offset(skip).limit(limit).all()
+    async def search_pages(self, db: AsyncSession, query: str, limit: int = 20,
+                           cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+        """Rank pages matching ``query`` with highlighted snippets, best first.
 
-    def update_page(self, db: Session, page_id: str, page_update: PageUpdate) -> Optional[Page]:
-        db_page = db.query(Page).filter(Page.id == page_id).first()
+        On Postgres this is a GIN-indexed tsvector match ranked by
+        ts_rank_cd; the inner query picks one page of ids so ts_headline only
+        runs for the rows returned. Other databases fall back to substring
+        matching on the stored text, ordered by id. ``cursor`` continues after
+        the last (rank, id) of the previous batch.
+        """
+        after = self._decode_search_cursor(cursor) if cursor else None
+
+        if db.bind.dialect.name == "postgresql":
+            ts_query = page_search.search_query(query)
+            rank = func.ts_rank_cd(Page.search_vector, ts_query)
+            matches = select(Page.id, rank.label("rank")).where(Page.search_vector.op("@@")(ts_query))
+            if after is not None:
+                matches = matches.where(or_(rank < after[0], and_(rank == after[0], Page.id > after[1])))
+            matches = matches.order_by(rank.desc(), Page.id).limit(limit).subquery()
+            statement = (
+                select(
+                    Page.id, Page.title, Page.updated_at, matches.c.rank,
+                    page_search.headline(Page.search_text, ts_query).label("snippet"),
+                )
+                .join(matches, matches.c.id == Page.id)
+                .order_by(matches.c.rank.desc(), Page.id)
+            )
+            rows = [
+                {"id": row.id, "title": row.title, "updated_at": row.updated_at, "rank": row.rank, "snippet": row.snippet}
+                for row in (await db.execute(statement)).all()
+            ]
+        else:
+            statement = select(Page.id, Page.title, Page.updated_at, Page.search_text).order_by(Page.id).limit(limit)
+            for term in query.split():
+                term = term.lower()
+                statement = statement.where(or_(
+                    func.lower(Page.title).contains(term, autoescape=True),
+                    func.lower(Page.search_text).contains(term, autoescape=True),
+                ))
+            if after is not None:
+                statement = statement.where(Page.id > after[1])
+            rows = [
+                {
+                    "id": row.id, "title": row.title, "updated_at": row.updated_at, "rank": 0.0,
+                    "snippet": page_search.fallback_snippet(row.search_text or "", query),
+                }
+                for row in (await db.execute(statement)).all()
+            ]
+
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = self._encode_search_cursor(rows[-1]["rank"], rows[-1]["id"])
+        return rows, next_cursor
+
+    def _encode_search_cursor(self, rank: float, page_id: str) -> str:
+        raw = json.dumps([rank, page_id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def _decode_search_cursor(self, cursor: str) -> Tuple[float, str]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            rank, page_id = json.loads(raw)
+            return float(rank), str(page_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    def _encode_cursor(self, updated_at: datetime, page_id: str) -> str:
+        raw = json.dumps([updated_at.isoformat(), page_id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor: str) -> Tuple[datetime, str]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            updated_at, page_id = json.loads(raw)
+            return datetime.fromisoformat(updated_at), str(page_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    async def update_page(self, db: AsyncSession, page_id: str, page_update: PageUpdate,
+                          expected_version: Optional[int] = None) -> Optional[Page]:
+        db_page = await db.get(Page, page_id)
         if db_page:
+            if expected_version is not None and db_page.version != expected_version:
+                raise VersionConflictError(db_page.version)
             update_data = page_update.dict(exclude_unset=True)
+            title_changed = "title" in update_data and update_data["title"] != db_page.title
+            if db_page.storage_mode == "blocks" and update_data.get("content") is not None:
+                content = update_data.pop("content")
+                previous = await page_blocks.load_content(db, page_id)
+                await page_blocks.replace_blocks(db, page_id, content)
+                content_changed = True
+            else:
+                content = update_data.get("content")
+                previous = db_page.content
+                content_changed = "content" in update_data and content != previous
+            if content_changed or title_changed:
+                # Recorded before the row is modified, so no query autoflushes it
+                await page_history.record(
+                    db, page_id, db_page.version + 1,
+                    diff_json(previous, content) if content_changed else [],
+                    title=update_data["title"] if title_changed else None,
+                    current=(update_data.get("title", db_page.title), content) if content_changed else None,
+                )
             for field, value in update_data.items():
                 setattr(db_page, field, value)
+            if content_changed or title_changed:
+                search = page_search.search_values(db, db_page.title, content, content_changed)
+                for field, value in search.items():
+                    setattr(db_page, field, value)
             db_page.updated_at = datetime.utcnow()
-            db.commit()
-            db.refresh(db_page)
+            await self._commit_versioned(db, page_id)
+            shared_page_cache.invalidate_page(page_id)
+            await db.refresh(db_page)
+            if db_page.storage_mode == "blocks":
+                # The column is empty for block pages; callers write the returned content back
+                set_committed_value(db_page, "content", await page_blocks.load_content(db, page_id))
         return db_page
 
-    def delete_page(self, db: Session, page_id: str) -> bool:
-        db_page = db.query(Page).filter(Page.id == page_id).first()
+    async def patch_page(self, db: AsyncSession, page_id: str, page_patch: PagePatch) -> Optional[Tuple[int, datetime]]:
+        """Apply Slate operations or a JSON Patch on top of ``baseVersion``.
+
+        Returns the new (version, updated_at), or None if the page does not
+        exist. Raises VersionConflictError if the page has moved past the base.
+        """
+        if self._can_patch_in_database(db, page_patch):
+            result = await self._patch_in_database(db, page_id, page_patch)
+            if result is not None:
+                return result
+
+        db_page = await db.get(Page, page_id)
+        if db_page is None:
+            return None
+        if db_page.version != page_patch.baseVersion:
+            raise VersionConflictError(db_page.version)
+
+        previous = await self.get_content(db, db_page)
+        content = previous
+        if page_patch.operations:
+            content = apply_slate_operations(content, page_patch.operations)
+        if page_patch.patch:
+            content = apply_json_patch(content, page_patch.patch)
+        content_changed = bool(page_patch.operations or page_patch.patch)
+        await page_history.record(
+            db, page_id, db_page.version + 1, diff_json(previous, content) if content_changed else [],
+            title=page_patch.title,
+            current=(page_patch.title if page_patch.title is not None else db_page.title, content),
+        )
+        if content_changed and db_page.storage_mode == "blocks":
+            await page_blocks.replace_blocks(db, page_id, content)
+        elif content_changed:
+            db_page.content = content
+        if page_patch.title is not None:
+            db_page.title = page_patch.title
+        if content_changed or page_patch.title is not None:
+            for field, value in page_search.search_values(db, db_page.title, content, content_changed).items():
+                setattr(db_page, field, value)
+
+        db_page.updated_at = datetime.utcnow()
+        await self._commit_versioned(db, page_id)
+        shared_page_cache.invalidate_page(page_id)
+        return db_page.version, db_page.updated_at
+
+    async def _commit_versioned(self, db: AsyncSession, page_id: str) -> None:
+        """Commit, turning a lost optimistic-locking race into VersionConflictError."""
+        try:
+            await db.commit()
+        except StaleDataError:
+            await db.rollback()
+            current = (await db.execute(select(Page.version).where(Page.id == page_id))).scalar_one_or_none()
+            raise VersionConflictError(current or 0)
+
+    def _can_patch_in_database(self, db: AsyncSession, page_patch: PagePatch) -> bool:
+        """Plain value replacements can be pushed down to Postgres as jsonb_set."""
+        if db.bind.dialect.name != "postgresql" or page_patch.operations or not page_patch.patch:
+            return False
+        return all(
+            operation.get("op") == "replace" and "value" in operation
+            and isinstance(operation.get("path"), str) and operation["path"].startswith("/")
+            and operation["path"] != "/" and self._pushdown_pointer(operation["path"])
+            for operation in page_patch.patch
+        )
+
+    def _pushdown_pointer(self, pointer: str) -> bool:
+        """Whether Postgres resolves every token as RFC 6901 does.
+
+        ``#>`` and ``jsonb_set`` accept negative and zero-padded array
+        subscripts that JSON Pointer rejects; such patches take the Python
+        path, which answers them with the same error on every database.
+        """
+        return all(
+            is_array_index(token) or not _INTEGER_TOKEN.match(token) for token in parse_pointer(pointer)
+        )
+
+    async def _patch_in_database(self, db: AsyncSession, page_id: str, page_patch: PagePatch) -> Optional[Tuple[int, datetime]]:
+        """Rewrite only the replaced values inside the JSON column.
+
+        Returns None when the row did not match (missing page, version
+        conflict or a path that does not exist), leaving the caller to take
+        the load-and-apply path, which reports the precise error.
+        """
+        content = cast(Page.content, JSONB)
+        conditions = [Page.id == page_id, Page.version == page_patch.baseVersion, Page.storage_mode == "document"]
+        for operation in page_patch.patch:
+            path = literal(parse_pointer(operation["path"]), ARRAY(Text))
+            conditions.append(cast(Page.content, JSONB).op("#>")(path).isnot(None))
+            content = func.jsonb_set(content, path, cast(literal(json.dumps(operation["value"])), JSONB), False)
+
+        values = {
+            "content": cast(content, JSON),
+            "version": Page.version + 1,
+            "updated_at": datetime.utcnow(),
+        }
+        if page_patch.title is not None:
+            values["title"] = page_patch.title
+
+        # Replacing a text leaf (or a whole subtree) changes the searchable text
+        text_changed = any(
+            parse_pointer(operation["path"])[-1] == "text" or isinstance(operation["value"], (dict, list))
+            for operation in page_patch.patch
+        )
+        returning = [Page.version, Page.updated_at]
+        if text_changed:
+            returning.append(cast(Page.content, Text).label("content_json"))
+
+        statement = (
+            update(Page)
+            .where(*conditions)
+            .values(**values)
+            .returning(*returning)
+            .execution_options(synchronize_session=False)
+        )
+        row = (await db.execute(statement)).first()
+        if row is None:
+            await db.rollback()
+            return None
+        if text_changed or page_patch.title is not None:
+            new_content = json.loads(row.content_json) if text_changed else None
+            search = page_search.search_values(db, Page.title, new_content, text_changed)
+            table = Page.__table__
+            await db.execute(
+                update(table).where(table.c.id == page_id).values(updated_at=table.c.updated_at, **search)
+            )
+        await page_history.record(db, page_id, row.version, page_patch.patch, title=page_patch.title)
+        await db.commit()
+        shared_page_cache.invalidate_page(page_id)
+        return row.version, row.updated_at
+
+    async def delete_page(self, db: AsyncSession, page_id: str) -> bool:
+        db_page = await db.get(Page, page_id)
         if db_page:
-            db.delete(db_page)
-            db.commit()
+            await db.delete(db_page)
+            await db.execute(delete(PageBlock).where(PageBlock.page_id == page_id))
+            await db.execute(delete(PageVersion).where(PageVersion.page_id == page_id))
+            await db.execute(delete(BlockFactCheck).where(BlockFactCheck.page_id == page_id))
+            await db.execute(delete(FactCheckJob).where(FactCheckJob.page_id == page_id))
+            await db.commit()
+            shared_page_cache.invalidate_page(page_id)
             return True
         return False
 
-    def share_page(self, db: Session, page_id: str) -> Optional[str]:
-        print(f"[PAGE SERVICE] Sharing page: {page_id}")
-        
-        db_page = db.query(Page).filter(Page.id == page_id).first()
+    async def get_versions(self, db: AsyncSession, page_id: str, limit: int = 50,
+                           before: Optional[int] = None) -> Optional[Tuple[List[Any], Optional[int]]]:
+        """A page of history entries, newest first; None if the page does not exist."""
+        if await self._page_version(db, page_id) == 0:
+            return None
+        rows = await page_history.list_versions(db, page_id, limit=limit, before=before)
+        next_cursor = rows[-1].version if len(rows) == limit else None
+        return rows, next_cursor
+
+    async def get_version(self, db: AsyncSession, page_id: str,
+                          version: int) -> Optional[Tuple[datetime, str, List[Any]]]:
+        """The page's (created_at, title, content) as of ``version``, rebuilt from its history."""
+        if not 0 < version <= await self._page_version(db, page_id):
+            return None
+        rebuilt = await page_history.rebuild(db, page_id, version)
+        if rebuilt is None:
+            return None
+        _, created_at, title, content = rebuilt
+        return created_at, title, content
+
+    async def set_storage_mode(self, db: AsyncSession, page_id: str, mode: str) -> Optional[Page]:
+        """Move a page's content between the JSON column and page_blocks rows."""
+        db_page = await db.get(Page, page_id)
+        if db_page is None or db_page.storage_mode == mode:
+            return db_page
+
+        if mode == "blocks":
+            await page_blocks.replace_blocks(db, page_id, db_page.content or [])
+            db_page.content = []
+        else:
+            db_page.content = await page_blocks.load_content(db, page_id)
+            await db.execute(delete(PageBlock).where(PageBlock.page_id == page_id))
+        db_page.storage_mode = mode
+        db_page.updated_at = datetime.utcnow()
+        await self._commit_versioned(db, page_id)
+        shared_page_cache.invalidate_page(page_id)
+        return db_page
+
+    async def get_block_range(self, db: AsyncSession, page_id: str, limit: int = 50,
+                              cursor: Optional[str] = None) -> Optional[Tuple[int, List[PageBlock], Optional[str]]]:
+        """Up to ``limit`` blocks in document order after the ``cursor`` position.
+
+        Returns (page version, blocks, next cursor), or None if the page does
+        not exist. Raises StorageModeError for pages stored as one document.
+        """
+        page = (await db.execute(
+            select(Page.version, Page.storage_mode).where(Page.id == page_id)
+        )).first()
+        if page is None:
+            return None
+        if page.storage_mode != "blocks":
+            raise StorageModeError("Page is not stored as blocks")
+
+        query = select(PageBlock).where(PageBlock.page_id == page_id).order_by(PageBlock.position).limit(limit)
+        if cursor:
+            query = query.where(PageBlock.position > cursor)
+        blocks = list((await db.execute(query)).scalars())
+        next_cursor = blocks[-1].position if len(blocks) == limit else None
+        return page.version, blocks, next_cursor
+
+    async def insert_block(self, db: AsyncSession, page_id: str, content: dict, after_id: Optional[str] = None,
+                           before_id: Optional[str] = None) -> Optional[Tuple[PageBlock, int, datetime]]:
+        """Insert one block between two neighbours; returns (block, page version, updated_at)."""
+        mode = await db.scalar(select(Page.storage_mode).where(Page.id == page_id))
+        if mode is None:
+            return None
+        if mode != "blocks":
+            raise StorageModeError("Page is not stored as blocks")
+        neighbours = await page_blocks.neighbour_positions(db, page_id, after_id, before_id)
+        if neighbours is None:
+            return None
+
+        block = PageBlock(
+            page_id=page_id, position=key_between(*neighbours), content=content,
+            text=page_blocks.block_text(content), updated_at=datetime.utcnow(),
+        )
+        db.add(block)
+        try:
+            await db.flush()
+        except IntegrityError:
+            # Another insert took the same position first
+            await db.rollback()
+            raise VersionConflictError(await self._page_version(db, page_id))
+        page_version, updated_at = await page_blocks.touch_page(db, page_id, text_changed=bool(block.text))
+        index = await page_blocks.block_index(db, page_id, block.position)
+        await page_history.record(db, page_id, page_version, [{"op": "add", "path": f"/{index}", "value": content}])
+        await db.commit()
+        shared_page_cache.invalidate_page(page_id)
+        return block, page_version, updated_at
+
+    async def update_block(self, db: AsyncSession, page_id: str, block_id: str, content: dict,
+                           base_version: int) -> Optional[Tuple[PageBlock, int, datetime]]:
+        """Replace one block's content if it is still at ``base_version``; touches one block row."""
+        current = (await db.execute(
+            select(PageBlock.version, PageBlock.text).where(PageBlock.id == block_id, PageBlock.page_id == page_id)
+        )).first()
+        if current is None:
+            return None
+        if current.version != base_version:
+            raise VersionConflictError(current.version)
+
+        text = page_blocks.block_text(content)
+        table = PageBlock.__table__
+        row = (await db.execute(
+            update(table)
+            .where(table.c.id == block_id, table.c.version == base_version)
+            .values(content=content, text=text, version=table.c.version + 1, updated_at=datetime.utcnow())
+            .returning(table.c.position, table.c.version)
+        )).first()
+        if row is None:
+            await db.rollback()
+            raise VersionConflictError(await db.scalar(select(PageBlock.version).where(PageBlock.id == block_id)) or 0)
+
+        page_version, updated_at = await page_blocks.touch_page(db, page_id, text_changed=text != current.text)
+        index = await page_blocks.block_index(db, page_id, row.position)
+        await page_history.record(db, page_id, page_version, [{"op": "replace", "path": f"/{index}", "value": content}])
+        await db.commit()
+        shared_page_cache.invalidate_page(page_id)
+        block = PageBlock(id=block_id, page_id=page_id, position=row.position, content=content, version=row.version)
+        return block, page_version, updated_at
+
+    async def delete_block(self, db: AsyncSession, page_id: str, block_id: str) -> Optional[Tuple[int, datetime]]:
+        result = await db.execute(
+            delete(PageBlock)
+            .where(PageBlock.id == block_id, PageBlock.page_id == page_id)
+            .returning(PageBlock.text, PageBlock.position)
+        )
+        deleted = result.first()
+        if deleted is None:
+            await db.rollback()
+            return None
+        touched = await page_blocks.touch_page(db, page_id, text_changed=bool(deleted.text))
+        index = await page_blocks.block_index(db, page_id, deleted.position)
+        await page_history.record(db, page_id, touched[0], [{"op": "remove", "path": f"/{index}"}])
+        await db.commit()
+        shared_page_cache.invalidate_page(page_id)
+        return touched
+
+    async def _page_version(self, db: AsyncSession, page_id: str) -> int:
+        return await db.scalar(select(Page.version).where(Page.id == page_id)) or 0
+
+    async def share_page(self, db: AsyncSession, page_id: str) -> Optional[str]:
+        db_page = await db.get(Page, page_id)
         if not db_page:
-            print(f"[PAGE SERVICE] Page not found: {page_id}")
+            logger.info("Cannot share missing page %s", page_id)
             return None
         
         # Generate unique share token
         share_token = str(uuid.uuid4())
-        print(f"[PAGE SERVICE] Generated share token: {share_token}")
         
         # Update page
         db_page.is_public = True
@@ -94,21 +544,20 @@ class PageService:
         db_page.updated_at = datetime.utcnow()
         
         try:
-            db.commit()
-            db.refresh(db_page)
-            print(f"[PAGE SERVICE] Page shared successfully. is_public: {db_page.is_public}, token: {db_page.share_token}")
+            await db.commit()
+            shared_page_cache.invalidate_page(page_id)
+            await db.refresh(db_page)
+            logger.info("Shared page %s", page_id)
             return share_token
         except Exception as e:
-            print(f"[PAGE SERVICE] Error sharing page: {e}")
-            db.rollback()
+            logger.error("Sharing page %s failed: %s", page_id, e)
+            await db.rollback()
             return None
 
-    def unshare_page(self, db: Session, page_id: str) -> bool:
-        print(f"[PAGE SERVICE] Unsharing page: {page_id}")
-        
-        db_page = db.query(Page).filter(Page.id == page_id).first()
+    async def unshare_page(self, db: AsyncSession, page_id: str) -> bool:
+        db_page = await db.get(Page, page_id)
         if not db_page:
-            print(f"[PAGE SERVICE] Page not found: {page_id}")
+            logger.info("Cannot unshare missing page %s", page_id)
             return False
         
         db_page.is_public = False
@@ -116,12 +565,13 @@ class PageService:
         db_page.updated_at = datetime.utcnow()
         
         try:
-            db.commit()
-            print(f"[PAGE SERVICE] Page unshared successfully")
+            await db.commit()
+            shared_page_cache.invalidate_page(page_id)
+            logger.info("Unshared page %s", page_id)
             return True
         except Exception as e:
-            print(f"[PAGE SERVICE] Error unsharing page: {e}")
-            db.rollback()
+            logger.error("Unsharing page %s failed: %s", page_id, e)
+            await db.rollback()
             return False
 
-page_service = PageService()
\ No newline at end of file
+page_service = PageService()
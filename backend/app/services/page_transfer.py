@@ -0,0 +1,275 @@
+import logging
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import Text, cast, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.page import Page, PageBlock, PageVersion
+from ..schemas.page import PageImport, encode_page_json
+from . import page_blocks, page_search
+from .fractional_index import evenly_spaced_keys
+from .page_history import page_history
+from .write_coalescer import write_coalescer
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+# zlib window bits for the gzip container
+GZIP_WBITS = 31
+# Export lines are gathered into writes of about this size
+EXPORT_CHUNK_BYTES = 64 * 1024
+# Decompressed bytes produced per step, so a small upload cannot inflate all at once
+DECOMPRESS_CHUNK_BYTES = 1024 * 1024
+MAX_REPORTED_ERRORS = 100
+
+@dataclass
+class ImportSummary:
+    imported: int = 0
+    # Lines whose page id already exists
+    skipped: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def fail(self, line: int, message: str, count: int = 1) -> None:
+        self.failed += count
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "message": message})
+
+class PageTransfer:
+    """Bulk export and import of pages as NDJSON, one page per line.
+
+    Export reads pages through a server-side cursor in ``batch_size`` rows
+    and writes each line as the ``Page`` response JSON, content spliced in
+    from its stored text, so memory stays flat however many pages there are.
+    Import parses the upload as it arrives and inserts each ``batch_size``
+    pages with multi-row INSERTs in a transaction of their own: a failed
+    batch leaves the batches before it in place.
+    """
+
+    def __init__(self, batch_size: int, max_line_bytes: int, min_blocks: int):
+        self.batch_size = max(batch_size, 1)
+        self.max_line_bytes = max_line_bytes
+        self.min_blocks = min_blocks
+
+        self.exported = 0
+        self.imported = 0
+
+    async def export(self, compress: bool = False) -> AsyncIterator[bytes]:
+        """NDJSON of every page ordered by id, gzipped if ``compress``."""
+        # Autosaves buffered in this process would otherwise be missing
+        await write_coalescer.flush_all()
+        encoder = zlib.compressobj(6, zlib.DEFLATED, GZIP_WBITS) if compress else None
+        buffer = bytearray()
+        exported = 0
+
+        async with AsyncSessionLocal() as db:
+            query = select(
+                Page.id, Page.title, cast(Page.content, Text).label("content_json"), Page.created_at,
+                Page.updated_at, Page.is_public, Page.share_token, Page.version, Page.storage_mode,
+            ).order_by(Page.id).execution_options(yield_per=self.batch_size)
+            result = await db.stream(query)
+            async for row in result:
+                if row.storage_mode == "blocks":
+                    content_json = await page_blocks.content_json(db, row.id)
+                else:
+                    content_json = row.content_json.encode("utf-8") if row.content_json is not None else None
+                buffer += encode_page_json(row, content_json)
+                buffer += b"\n"
+                exported += 1
+                if len(buffer) >= EXPORT_CHUNK_BYTES:
+                    chunk = encoder.compress(bytes(buffer)) if encoder is not None else bytes(buffer)
+                    buffer.clear()
+                    if chunk:
+                        yield chunk
+
+        chunk = bytes(buffer)
+        if encoder is not None:
+            chunk = encoder.compress(chunk) + encoder.flush()
+        if chunk:
+            yield chunk
+        self.exported += exported
+        logger.info("Exported %d pages", exported)
+
+    async def import_pages(self, chunks: AsyncIterator[bytes]) -> ImportSummary:
+        """Insert the pages of an NDJSON upload, plain or gzipped.
+
+        Lines keep their ``id`` unless a page with that id exists, in which
+        case they are skipped; a ``share_token`` already in use is dropped
+        and the page imported unshared. Each page starts a new history at
+        version 1. Invalid lines are reported by line number and skipped.
+        """
+        summary = ImportSummary()
+        batch: List[Tuple[int, PageImport]] = []
+        batch_bytes = 0
+
+        async for number, line in self._lines(self._decompressed(chunks), summary):
+            try:
+                page = PageImport.model_validate_json(line)
+            except ValidationError as e:
+                error = e.errors()[0]
+                location = ".".join(str(part) for part in error["loc"])
+                summary.fail(number, f"{location}: {error['msg']}" if location else error["msg"])
+                continue
+            batch.append((number, page))
+            batch_bytes += len(line)
+            # Few huge pages fill a batch by size before they fill it by count
+            if len(batch) >= self.batch_size or batch_bytes >= self.max_line_bytes:
+                await self._insert_batch(batch, summary)
+                batch, batch_bytes = [], 0
+        if batch:
+            await self._insert_batch(batch, summary)
+
+        self.imported += summary.imported
+        logger.info("Imported %d pages (%d skipped, %d failed)", summary.imported, summary.skipped, summary.failed)
+        return summary
+
+    def stats(self) -> Dict[str, Any]:
+        return {"exported": self.exported, "imported": self.imported}
+
+    async def _decompressed(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """The upload's bytes, gunzipped when it starts with the gzip magic number."""
+        decoder = None
+        first = True
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if first:
+                first = False
+                if chunk.startswith(GZIP_MAGIC):
+                    decoder = zlib.decompressobj(GZIP_WBITS)
+            if decoder is None:
+                yield chunk
+                continue
+            data = decoder.decompress(chunk, DECOMPRESS_CHUNK_BYTES)
+            while data:
+                yield data
+                data = decoder.decompress(decoder.unconsumed_tail, DECOMPRESS_CHUNK_BYTES)
+        if decoder is not None:
+            tail = decoder.flush()
+            if tail:
+                yield tail
+
+    async def _lines(self, data: AsyncIterator[bytes],
+                     summary: ImportSummary) -> AsyncIterator[Tuple[int, bytes]]:
+        """Non-blank lines with their 1-based numbers; over-long lines are reported and dropped."""
+        buffer = bytearray()
+        number = 1
+        # Set while discarding the rest of an over-long line
+        oversized = False
+        async for chunk in data:
+            buffer += chunk
+            start = 0
+            while True:
+                end = buffer.find(b"\n", start)
+                if end < 0:
+                    break
+                if not oversized:
+                    if end - start > self.max_line_bytes:
+                        summary.fail(number, f"Line exceeds {self.max_line_bytes} bytes")
+                    elif buffer[start:end].strip():
+                        yield number, bytes(buffer[start:end])
+                oversized = False
+                number += 1
+                start = end + 1
+            del buffer[:start]
+            if len(buffer) > self.max_line_bytes:
+                if not oversized:
+                    summary.fail(number, f"Line exceeds {self.max_line_bytes} bytes")
+                    oversized = True
+                buffer.clear()
+        if not oversized and buffer.strip():
+            yield number, bytes(buffer)
+
+    async def _insert_batch(self, batch: List[Tuple[int, PageImport]], summary: ImportSummary) -> None:
+        async with AsyncSessionLocal() as db:
+            ids = [page.id for _, page in batch if page.id is not None]
+            tokens = [page.share_token for _, page in batch if page.share_token]
+            existing: Set[str] = set()
+            taken: Set[str] = set()
+            if ids:
+                existing.update((await db.execute(select(Page.id).where(Page.id.in_(ids)))).scalars())
+            if tokens:
+                taken.update((await db.execute(
+                    select(Page.share_token).where(Page.share_token.in_(tokens))
+                )).scalars())
+
+            pages: List[Dict[str, Any]] = []
+            blocks: List[Dict[str, Any]] = []
+            versions: List[Dict[str, Any]] = []
+            now = datetime.utcnow()
+            for _, page in batch:
+                if page.id in existing:
+                    summary.skipped += 1
+                    continue
+                page_id = page.id or str(uuid.uuid4())
+                existing.add(page_id)
+                share_token = page.share_token if page.share_token and page.share_token not in taken else None
+                if share_token is not None:
+                    taken.add(share_token)
+
+                content = page.content or []
+                in_blocks = 0 < self.min_blocks <= len(content)
+                pages.append({
+                    "id": page_id,
+                    "title": page.title,
+                    "content": [] if in_blocks else content,
+                    "created_at": _utc(page.created_at) or now,
+                    "updated_at": _utc(page.updated_at) or now,
+                    "is_public": page.is_public and share_token is not None,
+                    "share_token": share_token,
+                    "version": 1,
+                    "storage_mode": "blocks" if in_blocks else "document",
+                    "search_text": page_search.content_text(content),
+                })
+                if in_blocks:
+                    blocks.extend(
+                        {
+                            "id": str(uuid.uuid4()), "page_id": page_id, "position": position, "content": node,
+                            "text": page_blocks.block_text(node), "version": 1, "updated_at": now,
+                        }
+                        for position, node in zip(evenly_spaced_keys(len(content)), content)
+                    )
+                versions.append(page_history.snapshot_values(page_id, 1, page.title, content))
+
+            if not pages:
+                return
+            try:
+                await db.execute(insert(Page.__table__), pages)
+                if blocks:
+                    await db.execute(insert(PageBlock.__table__), blocks)
+                await db.execute(insert(PageVersion.__table__), versions)
+                if db.bind.dialect.name == "postgresql":
+                    table = Page.__table__
+                    await db.execute(
+                        update(table)
+                        .where(table.c.id.in_([row["id"] for row in pages]))
+                        .values(search_vector=page_search.search_vector(table.c.title, table.c.search_text),
+                                updated_at=table.c.updated_at)
+                    )
+                await db.commit()
+            except SQLAlchemyError as e:
+                await db.rollback()
+                logger.error("Page import batch starting at line %d failed: %s", batch[0][0], e)
+                summary.fail(batch[0][0], f"Batch of {len(pages)} pages failed: {e.__class__.__name__}", len(pages))
+                return
+            summary.imported += len(pages)
+            page_history.snapshots += len(versions)
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC, like the timestamps the app writes."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+page_transfer = PageTransfer(
+    batch_size=settings.page_transfer_batch_size,
+    max_line_bytes=settings.page_import_max_line_bytes,
+    min_blocks=settings.block_storage_min_blocks,
+)
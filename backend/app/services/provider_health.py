@@ -0,0 +1,234 @@
+import bisect
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from ..core.metrics import provider_call_duration
+
+# Upper bounds (seconds) of the latency buckets; the last bucket is open-ended
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0]
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with exponential decay.
+
+    Once ``window`` samples have been recorded all counts are halved, so
+    quantiles follow the provider's recent behaviour instead of its lifetime.
+    """
+
+    def __init__(self, buckets: List[float] = LATENCY_BUCKETS, window: int = 1000):
+        self.buckets = list(buckets)
+        self.window = window
+        self.counts = [0.0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.sum = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+
+        if self.total >= self.window:
+            self.counts = [count / 2 for count in self.counts]
+            self.total /= 2
+            self.sum /= 2
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile by interpolating inside its bucket."""
+        if self.total == 0:
+            return 0.0
+
+        target = q * self.total
+        cumulative = 0.0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= target:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (target - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": round(self.total, 2),
+            "mean": round(self.sum / self.total, 4) if self.total else 0.0,
+            "p50": round(self.quantile(0.5), 4),
+            "p95": round(self.quantile(0.95), 4),
+            "p99": round(self.quantile(0.99), 4),
+        }
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker over a rolling window of call outcomes.
+
+    The breaker opens when the windowed error rate crosses ``error_threshold``
+    (given at least ``min_requests`` calls) or after ``consecutive_failures``
+    failures in a row. After ``cooldown`` seconds it lets a limited number of
+    probe calls through; a successful probe closes it, a failed one re-opens
+    it with a doubled cooldown (capped at ``max_cooldown``).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, window: float = 60.0, min_requests: int = 5, error_threshold: float = 0.5,
+                 consecutive_failures: int = 5, cooldown: float = 30.0, max_cooldown: float = 300.0,
+                 half_open_probes: int = 1):
+        self.window = window
+        self.min_requests = min_requests
+        self.error_threshold = error_threshold
+        self.consecutive_failures = consecutive_failures
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.half_open_probes = half_open_probes
+
+        self._state = self.CLOSED
+        self._cooldown = cooldown
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._failure_streak = 0
+        # (timestamp, succeeded, latency seconds)
+        self._outcomes: deque = deque()
+
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._cooldown:
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+            self._probes_in_flight += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def release(self) -> None:
+        """Give back a probe slot for a call that was cancelled before finishing."""
+        if self._state == self.HALF_OPEN and self._probes_in_flight > 0:
+            self._probes_in_flight -= 1
+
+    def record_success(self, seconds: float) -> None:
+        self._record(True, seconds)
+        self._failure_streak = 0
+        if self._state == self.HALF_OPEN:
+            self._close()
+
+    def record_failure(self, seconds: float) -> None:
+        self._record(False, seconds)
+        self._failure_streak += 1
+
+        if self._state == self.HALF_OPEN:
+            self._open(min(self._cooldown * 2, self.max_cooldown))
+        elif self._state == self.CLOSED and self._should_trip():
+            self._open(self.base_cooldown)
+
+    def error_rate(self) -> float:
+        self._trim()
+        if not self._outcomes:
+            return 0.0
+        failures = sum(1 for _, succeeded, _ in self._outcomes if not succeeded)
+        return failures / len(self._outcomes)
+
+    def mean_latency(self) -> Optional[float]:
+        self._trim()
+        latencies = [seconds for _, succeeded, seconds in self._outcomes if succeeded]
+        if not latencies:
+            return None
+        return sum(latencies) / len(latencies)
+
+    def snapshot(self) -> Dict[str, Any]:
+        mean_latency = self.mean_latency()
+        return {
+            "state": self.state,
+            "errorRate": round(self.error_rate(), 4),
+            "windowCalls": len(self._outcomes),
+            "meanLatency": round(mean_latency, 4) if mean_latency is not None else None,
+            "failureStreak": self._failure_streak,
+            "timesOpened": self.times_opened,
+            "rejected": self.rejected,
+            "cooldown": self._cooldown,
+        }
+
+    def _record(self, succeeded: bool, seconds: float) -> None:
+        self._outcomes.append((time.monotonic(), succeeded, seconds))
+        self._trim()
+
+    def _trim(self) -> None:
+        cutoff = time.monotonic() - self.window
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _should_trip(self) -> bool:
+        if self._failure_streak >= self.consecutive_failures:
+            return True
+        return len(self._outcomes) >= self.min_requests and self.error_rate() >= self.error_threshold
+
+    def _open(self, cooldown: float) -> None:
+        self._state = self.OPEN
+        self._cooldown = cooldown
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+        self.times_opened += 1
+
+    def _close(self) -> None:
+        self._state = self.CLOSED
+        self._cooldown = self.base_cooldown
+        self._probes_in_flight = 0
+        self._failure_streak = 0
+        self._outcomes.clear()
+
+class ProviderHealth:
+    """Measured latency, outcome counters and circuit breaker for one AI provider."""
+
+    def __init__(self, name: str, breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.latency = LatencyHistogram()
+        self.breaker = breaker or CircuitBreaker()
+        self.successes = 0
+        self.failures = 0
+
+    @property
+    def available(self) -> bool:
+        return self.breaker.state != CircuitBreaker.OPEN
+
+    def record_success(self, seconds: float) -> None:
+        self.successes += 1
+        self.latency.record(seconds)
+        self.breaker.record_success(seconds)
+        provider_call_duration.observe(seconds, provider=self.name, outcome="success")
+
+    def record_failure(self, seconds: float) -> None:
+        self.failures += 1
+        self.breaker.record_failure(seconds)
+        provider_call_duration.observe(seconds, provider=self.name, outcome="error")
+
+    def expected_latency(self, default: float) -> float:
+        """Expected time to a good answer: mean latency inflated by the error rate."""
+        mean_latency = self.breaker.mean_latency()
+        if mean_latency is None:
+            mean_latency = default
+        return mean_latency / max(1.0 - self.breaker.error_rate(), 0.05)
+
+    def hedge_delay(self, percentile: float, default: float, minimum: float,
+                    maximum: float, min_samples: int) -> float:
+        """How long to wait on this provider before hedging to the next one."""
+        if self.latency.total < min_samples:
+            return default
+        return min(max(self.latency.quantile(percentile), minimum), maximum)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "latency": self.latency.snapshot(),
+            "breaker": self.breaker.snapshot(),
+        }
@@ -0,0 +1,83 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+
+class SharedPageEntry:
+    def __init__(self, page_id: str, body: bytes, etag: str, last_modified: str, ttl: float):
+        self.page_id = page_id
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = time.monotonic() + ttl
+
+class SharedPageCache:
+    """Process-local TTL/LRU cache of serialized shared-page bodies by share token.
+
+    Writes to a page invalidate it through ``invalidate_page``; the TTL bounds
+    staleness for writes made through other worker processes.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, SharedPageEntry]" = OrderedDict()
+        self._tokens_by_page: Dict[str, str] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[SharedPageEntry]:
+        entry = self._entries.get(token)
+        if entry is None or entry.expires_at < time.monotonic():
+            if entry is not None:
+                self._drop(token)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return entry
+
+    def set(self, token: str, page_id: str, body: bytes, etag: str, last_modified: str) -> SharedPageEntry:
+        entry = SharedPageEntry(page_id, body, etag, last_modified, self.ttl)
+        if self.max_entries <= 0:
+            return entry
+
+        self._drop(token)
+        self._entries[token] = entry
+        self._tokens_by_page[page_id] = token
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+        return entry
+
+    def invalidate_page(self, page_id: str) -> None:
+        token = self._tokens_by_page.get(page_id)
+        if token is not None:
+            self._drop(token)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tokens_by_page.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    def _drop(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is not None and self._tokens_by_page.get(entry.page_id) == token:
+            del self._tokens_by_page[entry.page_id]
+
+shared_page_cache = SharedPageCache(
+    max_entries=settings.shared_page_cache_size,
+    ttl=settings.shared_page_cache_ttl,
+)
@@ -0,0 +1,209 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..schemas.page import Page as PageSchema, PageUpdate
+from .page_service import page_service, VersionConflictError
+
+logger = logging.getLogger(__name__)
+
+class _PendingWrite:
+    def __init__(self, base_version: int):
+        self.base_version = base_version
+        self.data: Dict[str, Any] = {}
+        self.updated_at = datetime.utcnow()
+
+class _PageLock:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+class WriteCoalescer:
+    """Buffers the latest PUT per page and writes it once per interval.
+
+    A burst of autosaves for one page collapses into one UPDATE. While a write
+    is buffered, responses carry the version the flush will produce (base + 1),
+    so clients echoing it back in If-Match keep matching across the burst.
+
+    Staging a PUT and flushing a page hold the same per-page lock, so a
+    flush never takes the buffer between a PUT reading the row and staging
+    its fields on top of it.
+
+    A flush that fails for any reason but a conflict puts the write back for
+    the next flush. A write dropped on a conflict was already acknowledged,
+    so the page's next PUT is answered 409 instead of going ahead as if it
+    had been saved.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._pending: Dict[str, _PendingWrite] = {}
+        self._flushing: Dict[str, asyncio.Task] = {}
+        self._locks: Dict[str, _PageLock] = {}
+        self._task: Optional[asyncio.Task] = None
+        # Page id -> version the page was at when its buffered write was dropped
+        self._dropped: Dict[str, int] = {}
+
+        self.submitted = 0
+        self.flushed = 0
+        self.conflicts = 0
+        self.failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    async def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush_all()
+
+    async def submit(self, db: AsyncSession, page_id: str, page_update: PageUpdate,
+                     expected_version: Optional[int] = None) -> Optional[PageSchema]:
+        """Buffer an update and return the page as it will look once flushed."""
+        async with self._page_lock(page_id):
+            db_page = await page_service.get_page(db, page_id=page_id)
+            if db_page is None:
+                return None
+            if self.take_conflict(page_id) is not None:
+                raise VersionConflictError(db_page.version)
+
+            pending = self._pending.get(page_id)
+            if pending is not None and pending.base_version != db_page.version:
+                # The row moved underneath the buffer; its flush would conflict anyway
+                self.discard(page_id)
+                pending = None
+
+            current_version = pending.base_version + 1 if pending else db_page.version
+            if expected_version is not None and expected_version != current_version:
+                raise VersionConflictError(current_version)
+
+            if pending is None:
+                pending = _PendingWrite(db_page.version)
+                self._pending[page_id] = pending
+            predicted_version = pending.base_version + 1
+
+            pending.data.update(page_update.dict(exclude_unset=True))
+            pending.updated_at = datetime.utcnow()
+            self.submitted += 1
+
+            content = {}
+            if db_page.storage_mode == "blocks" and "content" not in pending.data:
+                content["content"] = await page_service.get_content(db, db_page)
+            return PageSchema.model_validate(db_page).model_copy(update={
+                **content,
+                **pending.data,
+                "version": predicted_version,
+                "updatedAt": pending.updated_at,
+            })
+
+    async def flush_page(self, page_id: str) -> bool:
+        """Write out a page's buffered update now, e.g. before it is read; True if there was one."""
+        task = self._flushing.get(page_id)
+        if task is None:
+            if page_id not in self._pending:
+                return False
+            # A task, so a caller that goes away does not cancel the write halfway
+            task = asyncio.create_task(self._flush(page_id))
+            self._flushing[page_id] = task
+        await asyncio.shield(task)
+        return True
+
+    def discard(self, page_id: str) -> None:
+        self._pending.pop(page_id, None)
+
+    def take_conflict(self, page_id: str) -> Optional[int]:
+        """The version a dropped buffered write conflicted with, reported once."""
+        return self._dropped.pop(page_id, None)
+
+    async def flush_all(self) -> None:
+        for page_id in list(self._pending):
+            await self.flush_page(page_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._pending),
+            "submitted": self.submitted,
+            "flushed": self.flushed,
+            "conflicts": self.conflicts,
+            "failures": self.failures,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush_all()
+            except Exception as e:
+                logger.error("Autosave flush failed: %s", e)
+
+    @asynccontextmanager
+    async def _page_lock(self, page_id: str) -> AsyncIterator[None]:
+        page_lock = self._locks.setdefault(page_id, _PageLock())
+        page_lock.users += 1
+        try:
+            async with page_lock.lock:
+                yield
+        finally:
+            page_lock.users -= 1
+            if not page_lock.users:
+                del self._locks[page_id]
+
+    async def _flush(self, page_id: str) -> None:
+        try:
+            async with self._page_lock(page_id):
+                await self._write(page_id)
+        finally:
+            self._flushing.pop(page_id, None)
+
+    async def _write(self, page_id: str) -> None:
+        pending = self._pending.pop(page_id, None)
+        if pending is None:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await page_service.update_page(
+                    db,
+                    page_id=page_id,
+                    page_update=PageUpdate(**pending.data),
+                    expected_version=pending.base_version,
+                )
+            self.flushed += 1
+        except VersionConflictError as e:
+            self.conflicts += 1
+            self._dropped[page_id] = e.current_version
+            logger.warning("Dropped buffered write for %s: %s", page_id, e)
+        except Exception as e:
+            # Flushes run inside unrelated requests and the background loop;
+            # keep the write for the next attempt rather than failing either
+            self.failures += 1
+            self._restore(page_id, pending)
+            logger.error("Buffered write for %s failed, will retry: %s", page_id, e)
+
+    def _restore(self, page_id: str, pending: _PendingWrite) -> None:
+        newer = self._pending.get(page_id)
+        if newer is not None:
+            if newer.base_version != pending.base_version:
+                return
+            # Fields submitted since the failed flush win over the older ones
+            pending.data.update(newer.data)
+            pending.updated_at = newer.updated_at
+        self._pending[page_id] = pending
+
+write_coalescer = WriteCoalescer(interval=settings.autosave_coalesce_interval)
@@ -0,0 +1,99 @@
+"""CPU time per MB of document for page responses, before and after the fast path.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_page_serialization [--sizes 0.1 1 5] [--repeat 5]
+
+Each strategy starts from what the database driver hands back and ends with
+the response body bytes:
+
+* ``pydantic+json``: decode the JSON column, validate through the ``Page``
+  schema (``from_attributes``) and encode with the stdlib encoder. This is
+  the path every page response took before.
+* ``pydantic+orjson``: the same, encoded by ``ORJSONResponse``.
+* ``raw splice``: read the column as text and splice it into the body with
+  ``encode_page_json`` (``read_page`` / ``read_shared_page`` today).
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.serialization import orjson
+from app.schemas.page import Page, encode_page_json
+
+WORDS = "the quick brown fox jumps over lazy dog fact check claim source evidence mountain river".split()
+
+def make_content(target_bytes: int) -> list:
+    rng = random.Random(42)
+    content, size = [], 0
+    while size < target_bytes:
+        block = {
+            "type": rng.choice(["p", "h2", "blockquote"]),
+            "id": f"b{len(content)}",
+            "children": [
+                {"text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40)))},
+                {"text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 10))), "bold": True},
+            ],
+        }
+        content.append(block)
+        size += len(json.dumps(block))
+    return content
+
+def make_row(content_json: str, content=None) -> SimpleNamespace:
+    now = datetime.now(timezone.utc)
+    return SimpleNamespace(
+        id="5b0f3c9e-0000-4000-8000-000000000000", title="Benchmark page", content=content,
+        created_at=now, updated_at=now, is_public=True, share_token=None, version=3,
+        content_json=content_json,
+    )
+
+def pydantic_json(content_json: str) -> bytes:
+    row = make_row(content_json, json.loads(content_json))
+    data = jsonable_encoder(Page.model_validate(row), by_alias=True)
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def pydantic_orjson(content_json: str) -> bytes:
+    row = make_row(content_json, json.loads(content_json))
+    return orjson.dumps(Page.model_validate(row).model_dump(mode="json", by_alias=True))
+
+def raw_splice(content_json: str) -> bytes:
+    row = make_row(content_json)
+    return encode_page_json(row, row.content_json.encode("utf-8"))
+
+def measure(strategy, content_json: str, repeat: int) -> float:
+    """Best-of-``repeat`` CPU seconds for one response."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        strategy(content_json)
+        best = min(best, time.process_time() - start)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[0.1, 1.0, 5.0], help="document sizes in MB")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    strategies = [("pydantic+json", pydantic_json), ("raw splice", raw_splice)]
+    if orjson is not None:
+        strategies.insert(1, ("pydantic+orjson", pydantic_orjson))
+
+    print(f"{'size MB':>8} {'strategy':>16} {'CPU ms':>10} {'CPU ms/MB':>10} {'speedup':>8}")
+    for size in args.sizes:
+        content_json = json.dumps(make_content(int(size * 1024 * 1024)))
+        megabytes = len(content_json) / (1024 * 1024)
+        baseline = None
+        for name, strategy in strategies:
+            seconds = measure(strategy, content_json, args.repeat)
+            baseline = baseline or seconds
+            print(f"{megabytes:>8.2f} {name:>16} {seconds * 1000:>10.2f} "
+                  f"{seconds * 1000 / megabytes:>10.2f} {baseline / seconds:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
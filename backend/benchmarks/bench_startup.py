@@ -0,0 +1,156 @@
+"""Cold start time and multi-core throughput of the production server.
+
+Run from the backend directory against a migrated database:
+
+    python -m benchmarks.bench_startup [--workers 1 4] [--duration 10] [--path /]
+
+Three measurements:
+
+* ``import``: wall time of ``import app.main`` in a fresh interpreter (best
+  of ``--repeat``), the part of a cold start the code controls. Pass
+  ``--importtime`` to list the slowest modules.
+* ``ready``: from spawning ``python -m app.serve`` until ``/health``
+  answers, per worker count. ``stop`` is the time from SIGTERM until the
+  server has exited.
+* ``req/s``: requests served while ``--clients`` load processes each
+  keep ``--concurrency`` requests to ``--path`` in flight for
+  ``--duration`` seconds. The load processes take cores too, so compare
+  worker counts on the same machine rather than reading absolute numbers.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+import httpx
+
+def import_time(repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import app.main"], check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def slowest_imports(count: int) -> List[Tuple[int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[0].startswith("import time:") and parts[1].strip().isdigit():
+            # app modules and what app.main imports directly, each with everything it pulled in
+            name = parts[2].rstrip()
+            depth = (len(name) - len(name.lstrip())) // 2
+            if depth <= 1 or name.strip().startswith("app."):
+                modules.append((int(parts[1]), name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(workers: int, port: int) -> Tuple[subprocess.Popen, float]:
+    """Start the server and wait until it answers; returns the process and seconds to ready."""
+    env = {**os.environ, "LOG_LEVEL": "WARNING"}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--skip-migrations", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers)],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}/health"
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return process, time.perf_counter() - start
+        except httpx.TransportError:
+            pass
+        time.sleep(0.02)
+
+def stop_server(process: subprocess.Popen) -> float:
+    start = time.perf_counter()
+    process.send_signal(signal.SIGTERM)
+    process.wait(timeout=60)
+    return time.perf_counter() - start
+
+def _client(args: Tuple[str, int, float]) -> Tuple[int, int, List[float]]:
+    url, concurrency, duration = args
+
+    async def run():
+        latencies: List[float] = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+            async def loop():
+                nonlocal errors
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        response = await client.get(url)
+                        if response.status_code >= 500:
+                            errors += 1
+                    except httpx.HTTPError:
+                        errors += 1
+                    latencies.append(time.perf_counter() - start)
+
+            await asyncio.gather(*(loop() for _ in range(concurrency)))
+        return len(latencies), errors, latencies
+
+    return asyncio.run(run())
+
+def throughput(url: str, clients: int, concurrency: int, duration: float) -> Tuple[float, float, float, int]:
+    """(requests per second, p50 ms, p99 ms, errors) under closed-loop load."""
+    with multiprocessing.get_context("spawn").Pool(clients) as pool:
+        results = pool.map(_client, [(url, concurrency, duration)] * clients)
+    latencies = sorted(latency for _, _, batch in results for latency in batch)
+    requests = sum(count for count, _, _ in results)
+    errors = sum(errors for _, errors, _ in results)
+    if not latencies:
+        return 0.0, 0.0, 0.0, errors
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000
+    return requests / duration, p50, p99, errors
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--path", default="/", help="endpoint to load, e.g. /api/pages/summaries")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=max((os.cpu_count() or 2) // 2, 1))
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight per client process")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="list the N slowest imports")
+    args = parser.parse_args()
+
+    print(f"import app.main: {import_time(args.repeat) * 1000:.0f} ms (best of {args.repeat})")
+    for microseconds, module in slowest_imports(args.importtime) if args.importtime else []:
+        print(f"  {microseconds / 1000:>8.1f} ms  {module}")
+
+    print(f"\n{'workers':>8} {'ready ms':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'stop ms':>8}")
+    for workers in args.workers:
+        port = free_port()
+        process, ready = start_server(workers, port)
+        try:
+            # Every worker has to be up before the load starts
+            time.sleep(0.5 * workers)
+            rate, p50, p99, errors = throughput(
+                f"http://127.0.0.1:{port}{args.path}", args.clients, args.concurrency, args.duration
+            )
+        finally:
+            stop = stop_server(process)
+        print(f"{workers:>8} {ready * 1000:>9.0f} {rate:>9.0f} {p50:>8.1f} {p99:>8.1f} {errors:>7} {stop * 1000:>8.0f}")
+
+if __name__ == "__main__":
+    main()
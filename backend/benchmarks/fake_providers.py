@@ -0,0 +1,239 @@
+"""Local stand-ins for the Gemini, OpenAI and Hugging Face APIs, for load tests.
+
+    python -m benchmarks.fake_providers --port 9100 [--latency-ms 300] [--jitter-ms 100]
+        [--error-rate 0.01] [--rpm 600] [--provider gemini:latency-ms=800,error-rate=0.05]
+
+Point the app at it with ``GEMINI_BASE_URL=http://127.0.0.1:9100``,
+``OPENAI_BASE_URL=http://127.0.0.1:9100/v1`` and
+``HUGGINGFACE_BASE_URL=http://127.0.0.1:9100``, plus any non-empty
+``GEMINI_API_KEY`` / ``OPENAI_API_KEY``.
+
+Each call waits a normally distributed latency (``latency-ms`` mean,
+``jitter-ms`` deviation; streams spread it over their chunks). A call
+fails with a 500 with probability ``error-rate``. It gets a 429 with
+``Retry-After`` once the provider has answered ``rpm`` calls in the last
+minute, or with probability ``rate-limit-rate``. Verdicts are derived
+from a hash of the prompt, so the same claim always gets the same answer.
+
+``GET /stats`` returns the calls per provider and status; ``POST /reset``
+clears them.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, fields, replace
+from typing import Deque, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+PROVIDERS = ("gemini", "openai", "huggingface")
+
+_BATCH = re.compile(r"Fact-check each of these (\d+) numbered statements")
+_VERDICTS = [
+    ("Correct. The statement matches established records.", 0.92),
+    ("Incorrect. Reliable sources contradict the statement.", 0.88),
+    ("Uncertain. Available sources disagree on this point.", 0.45),
+]
+
+@dataclass
+class Behavior:
+    latency_ms: float = 300.0
+    jitter_ms: float = 100.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    # Calls answered per sliding minute before 429s; 0 = unlimited
+    rpm: float = 0.0
+
+    def describe(self) -> Dict[str, float]:
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+def parse_overrides(default: Behavior, specs: List[str]) -> Dict[str, Behavior]:
+    """Per-provider behaviors from ``name:key=value,...`` specs on top of ``default``."""
+    behaviors = {name: replace(default) for name in PROVIDERS}
+    for spec in specs:
+        name, _, settings = spec.partition(":")
+        if name not in behaviors:
+            raise ValueError(f"Unknown provider {name!r}; expected one of {', '.join(PROVIDERS)}")
+        for setting in filter(None, settings.split(",")):
+            key, _, value = setting.partition("=")
+            attribute = key.strip().replace("-", "_")
+            if not hasattr(default, attribute):
+                raise ValueError(f"Unknown setting {key!r} in {spec!r}")
+            setattr(behaviors[name], attribute, float(value))
+    return behaviors
+
+class FakeProvider:
+    def __init__(self, name: str, behavior: Behavior, rng: random.Random):
+        self.name = name
+        self.behavior = behavior
+        self.rng = rng
+        self.calls: Dict[int, int] = {}
+        self._answered: Deque[float] = deque()
+
+    def outcome(self) -> Optional[JSONResponse]:
+        """The error response for this call, if it fails; None to answer it."""
+        now = time.monotonic()
+        while self._answered and now - self._answered[0] > 60:
+            self._answered.popleft()
+        behavior = self.behavior
+        if (behavior.rpm and len(self._answered) >= behavior.rpm) or self.rng.random() < behavior.rate_limit_rate:
+            retry_after = 60 - (now - self._answered[0]) if behavior.rpm and self._answered else 1
+            return self._error(429, "Resource has been exhausted", {"Retry-After": str(max(int(retry_after), 1))})
+        if self.rng.random() < behavior.error_rate:
+            return self._error(500, "Internal error")
+        self._answered.append(now)
+        self.calls[200] = self.calls.get(200, 0) + 1
+        return None
+
+    def latency(self) -> float:
+        return max(self.rng.gauss(self.behavior.latency_ms, self.behavior.jitter_ms), 0.0) / 1000
+
+    def _error(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+        self.calls[status] = self.calls.get(status, 0) + 1
+        return JSONResponse({"error": {"code": status, "message": message}}, status_code=status, headers=headers)
+
+def verdict_text(prompt: str) -> str:
+    """A JSON verdict (or array of them for a batch prompt) that depends only on the prompt."""
+    batch = _BATCH.search(prompt)
+    count = int(batch.group(1)) if batch else 1
+    verdicts = []
+    for index in range(count):
+        digest = hashlib.sha256(f"{index}:{prompt}".encode("utf-8")).digest()
+        result, confidence = _VERDICTS[digest[0] % len(_VERDICTS)]
+        verdicts.append({"result": result, "confidence": confidence, "sources": ["Benchmark Stand-in"]})
+    return json.dumps(verdicts if batch else verdicts[0])
+
+def _chunks(text: str, count: int = 8) -> List[str]:
+    size = max(len(text) // count, 1)
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+def create_app(behaviors: Dict[str, Behavior], seed: int = 0) -> FastAPI:
+    rng = random.Random(seed)
+    providers = {name: FakeProvider(name, behaviors[name], rng) for name in PROVIDERS}
+    app = FastAPI(title="Fake AI providers")
+
+    async def stream(provider: FakeProvider, pieces: List[str], encode):
+        delay = provider.latency() / max(len(pieces), 1)
+        for piece in pieces:
+            await asyncio.sleep(delay)
+            yield encode(piece)
+
+    @app.post("/v1/models/{target}")
+    async def gemini(target: str, request: Request):
+        provider = providers["gemini"]
+        body = await request.json()
+        prompt = "".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+        text = verdict_text(prompt)
+
+        if target.endswith(":streamGenerateContent"):
+            error = provider.outcome()
+            if error is not None:
+                await asyncio.sleep(provider.latency() / 4)
+                return error
+
+            def encode(piece):
+                chunk = {"candidates": [{"content": {"parts": [{"text": piece}], "role": "model"}}]}
+                return f"data: {json.dumps(chunk)}\r\n\r\n"
+
+            return StreamingResponse(stream(provider, _chunks(text), encode), media_type="text/event-stream")
+
+        await asyncio.sleep(provider.latency())
+        error = provider.outcome()
+        if error is not None:
+            return error
+        return {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP"}],
+            "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4},
+        }
+
+    @app.post("/v1/chat/completions")
+    async def openai(request: Request):
+        provider = providers["openai"]
+        body = await request.json()
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        text = verdict_text(prompt)
+        base = {"id": "chatcmpl-bench", "created": int(time.time()), "model": body.get("model", "gpt-3.5-turbo")}
+
+        if body.get("stream"):
+            error = provider.outcome()
+            if error is not None:
+                await asyncio.sleep(provider.latency() / 4)
+                return error
+
+            def encode(piece):
+                chunk = {**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                return f"data: {json.dumps(chunk)}\n\n"
+
+            async def events():
+                async for event in stream(provider, _chunks(text), encode):
+                    yield event
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(provider.latency())
+        error = provider.outcome()
+        if error is not None:
+            return error
+        return {
+            **base,
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4,
+                      "total_tokens": (len(prompt) + len(text)) // 4},
+        }
+
+    @app.post("/models/{owner}/{model}")
+    async def huggingface(owner: str, model: str, request: Request):
+        provider = providers["huggingface"]
+        prompt = (await request.json()).get("inputs", "")
+        await asyncio.sleep(provider.latency())
+        error = provider.outcome()
+        if error is not None:
+            return error
+        result = json.loads(verdict_text(prompt))["result"]
+        return [{"generated_text": f"{prompt} {result}"}]
+
+    @app.get("/stats")
+    async def stats():
+        return {
+            name: {"behavior": provider.behavior.describe(), "calls": {str(k): v for k, v in provider.calls.items()}}
+            for name, provider in providers.items()
+        }
+
+    @app.post("/reset")
+    async def reset():
+        for provider in providers.values():
+            provider.calls.clear()
+        return {"reset": True}
+
+    return app
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=Behavior.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=Behavior.jitter_ms)
+    parser.add_argument("--error-rate", type=float, default=Behavior.error_rate)
+    parser.add_argument("--rate-limit-rate", type=float, default=Behavior.rate_limit_rate)
+    parser.add_argument("--rpm", type=float, default=Behavior.rpm)
+    parser.add_argument("--provider", action="append", default=[], metavar="NAME:KEY=VALUE,...",
+                        help="per-provider override, e.g. openai:error-rate=0.2,rpm=60")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    default = Behavior(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate, args.rpm)
+    app = create_app(parse_overrides(default, args.provider), seed=args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""Reproducible load test of the API against local provider stand-ins.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test [--scenarios autosave shared fact_check] [--workers 1]
+        [--database-url URL] [--scale 1.0] [--output report.json]
+        [--baseline benchmarks/baseline.json [--update-baseline]] [--threshold 0.25]
+
+The harness does the following:
+
+1. Start ``benchmarks.fake_providers`` (provider latency and failures are set
+   with ``--provider-latency-ms``, ``--provider-error-rate``,
+   ``--provider-rpm`` and per-provider ``--provider`` overrides).
+2. Migrate a fresh SQLite database, or the scratch database given by
+   ``--database-url`` (for example a local Postgres; its existing rows
+   are left alone).
+3. Start ``python -m app.serve`` and drive each scenario with a fixed,
+   seeded sequence of requests:
+
+   * ``autosave``: editors save large documents back to back. Half send
+     the whole document with ``PUT`` and ``If-Match``; the rest send
+     one-block JSON Patches.
+   * ``shared``: many readers fetch a few shared pages with a skewed
+     popularity, some revalidating with ``If-None-Match``, while a writer
+     keeps editing the most popular page.
+   * ``fact_check``: bursts of concurrent single and batch fact-checks
+     whose claims repeat with a skewed distribution, as when many users
+     check the same text.
+
+Each run prints and writes throughput and p50/p95/p99 latency per
+operation. With ``--baseline`` the run is compared with a stored report
+and exits with status 1 when an operation regresses past ``--threshold``:
+lower throughput, higher p95/p99, or a higher error rate. Baselines only
+compare runs on the same machine with the same options, which the
+report's ``meta`` records.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from random import Random
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from .bench_page_serialization import make_content
+from .bench_startup import free_port
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Lower is better for latencies, higher for throughput
+LATENCY_METRICS = ("p95Ms", "p99Ms")
+# Latency changes smaller than this are noise whatever the ratio
+MIN_LATENCY_DELTA_MS = 2.0
+MAX_ERROR_RATE_INCREASE = 0.01
+
+class Recorder:
+    """Latencies and outcomes per operation name."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.outcomes: Dict[str, Dict[str, int]] = {}
+
+    async def request(self, operation: str, send: Callable[[], Any]) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await send()
+        except httpx.HTTPError:
+            response = None
+        self.latencies.setdefault(operation, []).append(time.perf_counter() - start)
+        outcome = _outcome(response)
+        counts = self.outcomes.setdefault(operation, {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+        return response
+
+    def summary(self, duration: float) -> Dict[str, Dict[str, float]]:
+        operations = {}
+        for operation, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            counts = self.outcomes[operation]
+            operations[operation] = {
+                "count": len(latencies),
+                "throughputPerS": round(len(latencies) / duration, 2),
+                "errorRate": round(counts.get("error", 0) / len(latencies), 4),
+                "rejectedRate": round(counts.get("rejected", 0) / len(latencies), 4),
+                "conflictRate": round(counts.get("conflict", 0) / len(latencies), 4),
+                "p50Ms": _percentile(latencies, 0.50),
+                "p95Ms": _percentile(latencies, 0.95),
+                "p99Ms": _percentile(latencies, 0.99),
+                "maxMs": round(latencies[-1] * 1000, 2),
+            }
+        return operations
+
+def _outcome(response: Optional[httpx.Response]) -> str:
+    if response is None or response.status_code >= 500:
+        return "error"
+    if response.status_code == 429:
+        return "rejected"
+    if response.status_code in (409, 412):
+        return "conflict"
+    if response.status_code >= 400:
+        return "error"
+    return "ok"
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile in milliseconds."""
+    index = min(max(int(len(ordered) * fraction + 0.5) - 1, 0), len(ordered) - 1)
+    return round(ordered[index] * 1000, 2)
+
+def _zipf_picker(rng: Random, count: int, skew: float = 1.1) -> Callable[[], int]:
+    weights = [1 / (rank + 1) ** skew for rank in range(count)]
+    population = list(range(count))
+    return lambda: rng.choices(population, weights)[0]
+
+def _scaled(value: int, scale: float) -> int:
+    return max(int(value * scale), 1)
+
+# Scenarios
+
+async def _create_page(client: httpx.AsyncClient, title: str, content: List[Any]) -> Dict[str, Any]:
+    response = await client.post("/api/pages/", json={"title": title, "content": content})
+    response.raise_for_status()
+    return response.json()
+
+def _edit_block(rng: Random, content: List[Any]) -> int:
+    index = rng.randrange(len(content))
+    leaf = content[index]["children"][0]
+    leaf["text"] = f"{leaf['text']} edit{rng.randrange(1000)}"
+    return index
+
+async def autosave(client: httpx.AsyncClient, rng: Random, recorder: Recorder, scale: float, args) -> None:
+    editors = _scaled(8, scale)
+    saves = _scaled(25, scale)
+    template = make_content(int(args.page_kb * 1024))
+
+    async def editor(number: int):
+        content = copy.deepcopy(template)
+        page = await _create_page(client, f"Autosave {number}", content)
+        version = page["version"]
+        local_rng = Random(rng.random())
+        use_patch = number % 2 == 1
+        for _ in range(saves):
+            index = _edit_block(local_rng, content)
+            if use_patch:
+                body = {"baseVersion": version, "patch": [
+                    {"op": "replace", "path": f"/{index}/children/0/text", "value": content[index]["children"][0]["text"]}
+                ]}
+                response = await recorder.request(
+                    "autosave_patch", lambda: client.patch(f"/api/pages/{page['id']}", json=body)
+                )
+            else:
+                headers = {"If-Match": f'"{version}"'}
+                response = await recorder.request(
+                    "autosave_put",
+                    lambda: client.put(f"/api/pages/{page['id']}", json={"content": content}, headers=headers),
+                )
+            if response is not None and response.status_code == 200:
+                version = response.json()["version"]
+
+    await asyncio.gather(*(editor(number) for number in range(editors)))
+
+async def shared(client: httpx.AsyncClient, rng: Random, recorder: Recorder, scale: float, args) -> None:
+    pages = 5
+    readers = _scaled(64, scale)
+    reads = _scaled(40, scale)
+    tokens, ids = [], []
+    for number in range(pages):
+        page = await _create_page(client, f"Shared {number}", make_content(64 * 1024))
+        response = await client.post(f"/api/pages/{page['id']}/share")
+        response.raise_for_status()
+        tokens.append(response.json()["shareToken"])
+        ids.append(page["id"])
+
+    done = asyncio.Event()
+
+    async def reader(number: int):
+        local_rng = Random(rng.random())
+        pick = _zipf_picker(local_rng, pages)
+        etags: Dict[str, str] = {}
+        for _ in range(reads):
+            token = tokens[pick()]
+            if token in etags and local_rng.random() < 0.3:
+                headers = {"If-None-Match": etags[token]}
+                await recorder.request("shared_revalidate", lambda: client.get(f"/api/pages/shared/{token}", headers=headers))
+                continue
+            response = await recorder.request("shared_read", lambda: client.get(f"/api/pages/shared/{token}"))
+            if response is not None and "etag" in response.headers:
+                etags[token] = response.headers["etag"]
+
+    async def writer():
+        content = make_content(64 * 1024)
+        local_rng = Random(rng.random())
+        while not done.is_set():
+            _edit_block(local_rng, content)
+            await recorder.request("shared_write", lambda: client.put(f"/api/pages/{ids[0]}", json={"content": content}))
+            await asyncio.sleep(0.05)
+
+    writing = asyncio.create_task(writer())
+    try:
+        await asyncio.gather(*(reader(number) for number in range(readers)))
+    finally:
+        done.set()
+        await writing
+
+async def fact_check(client: httpx.AsyncClient, rng: Random, recorder: Recorder, scale: float, args) -> None:
+    subjects = ["The Eiffel Tower", "Mount Everest", "The Amazon river", "The Great Wall", "Lake Baikal",
+                "The Pacific Ocean", "The Sahara", "Mars", "The Moon", "Jupiter"]
+    facts = ["is {n} meters tall", "was completed in {y}", "is {n} kilometers long", "was first measured in {y}",
+             "is visible from {n} kilometers away"]
+    claim_rng = Random(args.seed)
+    claims = [
+        f"{claim_rng.choice(subjects)} {claim_rng.choice(facts).format(n=claim_rng.randrange(100, 9000), y=claim_rng.randrange(1700, 2020))}."
+        for _ in range(_scaled(200, scale))
+    ]
+    pick = _zipf_picker(rng, len(claims))
+    bursts = _scaled(5, scale)
+    burst_size = _scaled(50, scale)
+
+    for _ in range(bursts):
+        singles = [claims[pick()] for _ in range(burst_size)]
+        batches = [[claims[pick()] for _ in range(10)] for _ in range(max(burst_size // 10, 1))]
+        await asyncio.gather(
+            *(recorder.request("fact_check", lambda text=text: client.post("/api/ai/fact-check", json={"text": text}))
+              for text in singles),
+            *(recorder.request("fact_check_batch",
+                               lambda texts=texts: client.post("/api/ai/fact-check/batch", json={"texts": texts}))
+              for texts in batches),
+        )
+        await asyncio.sleep(0.5)
+
+SCENARIOS = {"autosave": autosave, "shared": shared, "fact_check": fact_check}
+
+# Processes
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(process.args)} exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+def _stop(process: subprocess.Popen) -> None:
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def _app_env(args, workdir: Path, providers_url: str) -> Dict[str, str]:
+    env = {
+        **os.environ,
+        # Nothing from a developer's .env, and no state carried over between runs
+        "ENV_FILE": "",
+        "DATABASE_URL": args.database_url or f"sqlite:///{workdir / 'bench.db'}",
+        "LOG_LEVEL": "WARNING",
+        "GEMINI_API_KEY": "benchmark",
+        "OPENAI_API_KEY": "benchmark",
+        "GEMINI_BASE_URL": providers_url,
+        "OPENAI_BASE_URL": f"{providers_url}/v1",
+        "HUGGINGFACE_BASE_URL": providers_url,
+        "FACT_CHECK_CACHE_DB": "False",
+        "NEAR_DUPLICATE_PATH": str(workdir / "near_duplicates.jsonl"),
+        "KNOWLEDGE_CORPUS_DIR": "",
+        "PAGE_HISTORY_COMPACT_INTERVAL": "0",
+    }
+    for setting in args.env:
+        key, _, value = setting.partition("=")
+        env[key] = value
+    return env
+
+async def _run_scenarios(base_url: str, providers_url: str, args) -> Dict[str, Any]:
+    results = {}
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client, \
+            httpx.AsyncClient(base_url=providers_url) as providers:
+        for name in args.scenarios:
+            await providers.post("/reset")
+            recorder = Recorder()
+            start = time.perf_counter()
+            await SCENARIOS[name](client, Random(f"{args.seed}:{name}"), recorder, args.scale, args)
+            duration = time.perf_counter() - start
+            calls = (await providers.get("/stats")).json()
+            results[name] = {
+                "durationS": round(duration, 3),
+                "operations": recorder.summary(duration),
+                "providerCalls": {provider: stats["calls"] for provider, stats in calls.items()},
+            }
+    return results
+
+def run(args) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="load-test-") as tmp:
+        workdir = Path(tmp)
+        providers_port, app_port = free_port(), free_port()
+        providers_url = f"http://127.0.0.1:{providers_port}"
+        provider_options = [
+            "--port", str(providers_port), "--seed", str(args.seed),
+            "--latency-ms", str(args.provider_latency_ms), "--jitter-ms", str(args.provider_jitter_ms),
+            "--error-rate", str(args.provider_error_rate), "--rpm", str(args.provider_rpm),
+        ]
+        for override in args.provider:
+            provider_options += ["--provider", override]
+        env = _app_env(args, workdir, providers_url)
+
+        subprocess.run([sys.executable, "-m", "app.serve", "--migrate-only"], cwd=BACKEND_DIR, env=env, check=True)
+        processes = []
+        try:
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.fake_providers", *provider_options], cwd=BACKEND_DIR
+            ))
+            _wait_until_up(f"{providers_url}/stats", processes[-1])
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "app.serve", "--skip-migrations", "--host", "127.0.0.1",
+                 "--port", str(app_port), "--workers", str(args.workers)],
+                cwd=BACKEND_DIR, env=env,
+            ))
+            _wait_until_up(f"http://127.0.0.1:{app_port}/health", processes[-1])
+            scenarios = asyncio.run(_run_scenarios(f"http://127.0.0.1:{app_port}", providers_url, args))
+        finally:
+            for process in reversed(processes):
+                _stop(process)
+
+    return {
+        "meta": {
+            "createdAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "database": (args.database_url or "sqlite").split(":", 1)[0],
+            "workers": args.workers,
+            "scale": args.scale,
+            "seed": args.seed,
+            "pageKb": args.page_kb,
+            "providers": {
+                "latencyMs": args.provider_latency_ms, "jitterMs": args.provider_jitter_ms,
+                "errorRate": args.provider_error_rate, "rpm": args.provider_rpm, "overrides": args.provider,
+            },
+            "env": args.env,
+        },
+        "scenarios": scenarios,
+    }
+
+# Reporting
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Regressions of ``report`` against ``baseline``, one line each."""
+    regressions = []
+    for scenario, result in baseline.get("scenarios", {}).items():
+        current = report["scenarios"].get(scenario)
+        if current is None:
+            continue
+        for operation, before in result["operations"].items():
+            after = current["operations"].get(operation)
+            if after is None:
+                regressions.append(f"{scenario}/{operation}: missing from this run")
+                continue
+            if after["throughputPerS"] < before["throughputPerS"] * (1 - threshold):
+                regressions.append(
+                    f"{scenario}/{operation}: throughput {before['throughputPerS']} -> {after['throughputPerS']}/s"
+                )
+            for metric in LATENCY_METRICS:
+                if (after[metric] > before[metric] * (1 + threshold)
+                        and after[metric] - before[metric] > MIN_LATENCY_DELTA_MS):
+                    regressions.append(f"{scenario}/{operation}: {metric} {before[metric]} -> {after[metric]}")
+            if after["errorRate"] > before["errorRate"] + MAX_ERROR_RATE_INCREASE:
+                regressions.append(f"{scenario}/{operation}: error rate {before['errorRate']} -> {after['errorRate']}")
+    return regressions
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"{'operation':>28} {'count':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'429s':>6}")
+    for scenario, result in report["scenarios"].items():
+        for operation, stats in result["operations"].items():
+            print(f"{scenario + '/' + operation:>28} {stats['count']:>6} {stats['throughputPerS']:>8.1f} "
+                  f"{stats['p50Ms']:>8.1f} {stats['p95Ms']:>8.1f} {stats['p99Ms']:>8.1f} "
+                  f"{stats['errorRate']:>7.2%} {stats['rejectedRate']:>6.1%}")
+        calls = {provider: sum(counts.values()) for provider, counts in result["providerCalls"].items()}
+        if any(calls.values()):
+            print(f"{'':>28} provider calls: {', '.join(f'{name}={count}' for name, count in calls.items())}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--database-url", help="scratch database to use instead of a fresh SQLite file")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies users and requests per scenario")
+    parser.add_argument("--page-kb", type=float, default=512, help="size of autosaved documents")
+    parser.add_argument("--connections", type=int, default=256, help="client connection pool size")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra app setting")
+    parser.add_argument("--provider-latency-ms", type=float, default=300)
+    parser.add_argument("--provider-jitter-ms", type=float, default=100)
+    parser.add_argument("--provider-error-rate", type=float, default=0.0)
+    parser.add_argument("--provider-rpm", type=float, default=0)
+    parser.add_argument("--provider", action="append", default=[], metavar="NAME:KEY=VALUE,...",
+                        help="per-provider override passed to benchmarks.fake_providers")
+    parser.add_argument("--output", type=Path, help="write the report here")
+    parser.add_argument("--baseline", type=Path, help="report to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="write this run to --baseline instead")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline is None:
+        return
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return
+    regressions = compare(report, json.loads(args.baseline.read_text()), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regressions past {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"\nNo regressions past {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import os
+import tempfile
+
+# Settings are read at import time, so point them at a scratch database first
+_DB_DIR = tempfile.mkdtemp(prefix="editor-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ["ENV_FILE"] = ""
+os.environ["LOG_LEVEL"] = "WARNING"
+os.environ["NEAR_DUPLICATE_PATH"] = ""
+
+import pytest
+from fastapi.testclient import TestClient
+
+@pytest.fixture(scope="session")
+def client():
+    from app.main import app
+    from app.serve import migrate
+
+    migrate()
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,41 @@
+def _paragraph(text):
+    return {"type": "p", "children": [{"text": text}]}
+
+def _blocks_page(client, count=4):
+    content = [_paragraph(f"Paragraph {index}") for index in range(count)]
+    page = client.post("/api/pages/", json={"title": "Blocks", "content": content}).json()
+    response = client.put(f"/api/pages/{page['id']}/storage", json={"mode": "blocks"})
+    assert response.json()["storageMode"] == "blocks"
+    return page["id"], content
+
+def test_put_content_returns_block_content(client):
+    page_id, content = _blocks_page(client)
+    content.append(_paragraph("Added"))
+
+    response = client.put(f"/api/pages/{page_id}", json={"title": "Blocks", "content": content})
+
+    assert response.status_code == 200
+    assert response.json()["content"] == content
+    assert client.get(f"/api/pages/{page_id}").json()["content"] == content
+
+def test_put_title_keeps_block_content(client):
+    page_id, content = _blocks_page(client)
+
+    response = client.put(f"/api/pages/{page_id}", json={"title": "Renamed"})
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed"
+    assert response.json()["content"] == content
+    assert client.get(f"/api/pages/{page_id}").json()["content"] == content
+
+def test_coalesced_title_put_keeps_block_content(client, monkeypatch):
+    from app.services.write_coalescer import write_coalescer
+
+    page_id, content = _blocks_page(client)
+    monkeypatch.setattr(write_coalescer, "interval", 60.0)
+
+    response = client.put(f"/api/pages/{page_id}", json={"title": "Buffered"})
+
+    assert response.json()["content"] == content
+    page = client.get(f"/api/pages/{page_id}").json()
+    assert (page["title"], page["content"]) == ("Buffered", content)
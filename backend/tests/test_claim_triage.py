@@ -0,0 +1,59 @@
+import pytest
+
+from app.services.claim_triage import ClaimTriage
+
+@pytest.fixture
+def triage():
+    return ClaimTriage(enabled=True, classifier_path="", classifier_threshold=0.2)
+
+@pytest.mark.parametrize("text", [
+    "Vaccines cause autism.",
+    "Penguins live in the Arctic.",
+    "Diamonds form from coal.",
+    "Cows drink milk.",
+    "Dogs see only in black and white.",
+    "You must drink eight glasses of water per day.",
+    "Adults should sleep at least seven hours a night.",
+    "The Eiffel Tower was completed in 1889.",
+    "Water boils at 100 degrees Celsius at sea level.",
+    "The Amazon River flows through Brazil and Peru.",
+    "Cool air is denser than warm air.",
+    "Great white sharks are mammals.",
+    "Fun fact: octopuses have three hearts.",
+    "The best treatment for a cold is antibiotics.",
+    "Green tea is great for your heart.",
+    "Water is H2O",
+    "Let us not forget that the moon landing was faked.",
+    "Please note that the museum is closed on Mondays.",
+])
+def test_checkable_claims_are_kept(triage, text):
+    assert triage.triage(text).checkable
+
+@pytest.mark.parametrize("text, category", [
+    ("Is the Eiffel Tower in Paris?", "question"),
+    ("I think pineapple belongs on pizza.", "opinion"),
+    ("We should all drink more water.", "opinion"),
+    ("This is the best song ever written.", "opinion"),
+    ("The view from the top was absolutely gorgeous.", "opinion"),
+    ("It's awesome.", "opinion"),
+    ("Please click the button below.", "instruction"),
+    ("Imagine a world without bees.", "instruction"),
+    ("All rights reserved by the publisher.", "boilerplate"),
+    ("See above", "fragment"),
+])
+def test_non_claims_are_skipped(triage, text, category):
+    result = triage.triage(text)
+    assert (result.checkable, result.category) == (False, category)
+    assert triage.verdict(result)["checkable"] is False
+
+def test_disabled_triage_checks_everything():
+    triage = ClaimTriage(enabled=False, classifier_path="", classifier_threshold=0.2)
+    assert triage.triage("Is the Eiffel Tower in Paris?").checkable
+
+def test_output_budget_follows_the_claim(triage):
+    short = "The Eiffel Tower was completed in 1889."
+    long = ("The Eiffel Tower was completed in 1889 and was the tallest structure in the world until 1930, "
+            "because it was built for the World's Fair, while the Chrysler Building later overtook it. "
+            "It is repainted every seven years.")
+    assert triage.output_fraction(short) == 0.4
+    assert triage.output_fraction(long) == 1.0
@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.schemas.page import PagePatch
+from app.services.page_service import page_service
+
+POSTGRES = SimpleNamespace(bind=SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+
+def _replace(path):
+    return PagePatch(baseVersion=1, patch=[{"op": "replace", "path": path, "value": "x"}])
+
+@pytest.mark.parametrize("path", ["/0/children/0/text", "/10/type", "/0/children/1/bold"])
+def test_plain_replacements_are_pushed_down(path):
+    assert page_service._can_patch_in_database(POSTGRES, _replace(path))
+
+@pytest.mark.parametrize("path", ["/-1/children/0/text", "/01/type", "/0/children/+1/text", "/0/children/ 1/text"])
+def test_non_rfc_indexes_take_the_python_path(path):
+    assert not page_service._can_patch_in_database(POSTGRES, _replace(path))
+
+@pytest.mark.parametrize("path", ["/-1/children/0/text", "/01/children/0/text"])
+def test_non_rfc_indexes_are_rejected(client, path):
+    content = [{"type": "p", "children": [{"text": "Hello"}]}]
+    page = client.post("/api/pages/", json={"title": "Patch", "content": content}).json()
+
+    response = client.patch(f"/api/pages/{page['id']}", json={
+        "baseVersion": page["version"], "patch": [{"op": "replace", "path": path, "value": "Bye"}],
+    })
+
+    assert response.status_code == 422
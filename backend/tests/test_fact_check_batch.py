@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from app.services.admission import AdmissionRejected
+from app.services.ai_service import ai_service
+
+CLAIMS = [f"The bridge over river number {index} was opened in {1900 + index}." for index in range(4)]
+
+async def _collect():
+    return [item async for item in ai_service.iter_fact_check_many(CLAIMS)]
+
+@pytest.fixture
+def provider_misses(monkeypatch):
+    async def miss(text):
+        return None
+
+    monkeypatch.setattr(ai_service, "_recall", miss)
+    monkeypatch.setattr(ai_service, "_fact_check_locally", miss)
+
+def test_rejected_claims_raise_instead_of_hanging(monkeypatch, provider_misses):
+    async def unpacked(texts):
+        return None
+
+    async def rejected(text, priority="interactive"):
+        raise AdmissionRejected(5)
+
+    monkeypatch.setattr(ai_service, "_fact_check_packed", unpacked)
+    monkeypatch.setattr(ai_service, "fact_check", rejected)
+
+    with pytest.raises(AdmissionRejected):
+        asyncio.run(asyncio.wait_for(_collect(), timeout=5))
+
+def test_failure_after_packed_call_reaches_the_consumer(monkeypatch, provider_misses):
+    async def packed(texts):
+        return [{"result": "Correct.", "confidence": 0.9, "sources": []} for _ in texts]
+
+    async def remember(text, result):
+        raise RuntimeError("cache unavailable")
+
+    monkeypatch.setattr(ai_service, "_fact_check_packed", packed)
+    monkeypatch.setattr(ai_service, "_remember", remember)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(asyncio.wait_for(_collect(), timeout=5))
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.services.ai_service import ai_service
+from app.services.fact_check_cache import fact_check_cache
+from app.services.fact_check_jobs import fact_check_jobs
+
+CONTENT = [{"type": "paragraph", "children": [{"text": "The Eiffel Tower was completed in 1889."}]}]
+UNAVAILABLE = {"result": "All AI services are temporarily unavailable.", "confidence": 0.0, "sources": ["System Error"]}
+CORRECT = {"result": "Correct.", "confidence": 0.9, "sources": ["Encyclopedia"]}
+
+def _verdicts(monkeypatch, verdict):
+    async def fact_check_many(texts, priority="bulk"):
+        for text in texts:
+            yield fact_check_cache.make_key(text), dict(verdict)
+
+    monkeypatch.setattr(ai_service, "iter_fact_check_many", fact_check_many)
+
+def _run_job(client, page_id):
+    job = client.post(f"/api/pages/{page_id}/fact-check").json()
+    deadline = time.monotonic() + 5
+    while job["status"] not in ("completed", "failed"):
+        assert time.monotonic() < deadline, "fact-check job did not finish"
+        time.sleep(0.02)
+        job = client.get(f"/api/pages/{page_id}/fact-check/{job['id']}").json()
+    return job
+
+@pytest.fixture
+def page_id(client):
+    return client.post("/api/pages/", json={"title": "Facts", "content": CONTENT}).json()["id"]
+
+def test_verdicts_are_reused_by_the_next_job(client, monkeypatch, page_id):
+    _verdicts(monkeypatch, CORRECT)
+    first = _run_job(client, page_id)
+    assert first["status"] == "completed"
+    assert first["results"][0]["claims"][0]["result"] == "Correct."
+
+    second = _run_job(client, page_id)
+    assert second["reusedBlockCount"] == 1
+
+def test_unavailable_verdicts_are_not_reused(client, monkeypatch, page_id):
+    _verdicts(monkeypatch, UNAVAILABLE)
+    first = _run_job(client, page_id)
+    assert first["status"] == "completed"
+    assert first["results"] == []
+
+    _verdicts(monkeypatch, CORRECT)
+    second = _run_job(client, page_id)
+    assert second["reusedBlockCount"] == 0
+    assert second["results"][0]["claims"][0]["result"] == "Correct."
+
+def test_stream_that_never_starts_leaves_no_listener(client, monkeypatch, page_id):
+    _verdicts(monkeypatch, CORRECT)
+    job = _run_job(client, page_id)
+
+    async def subscribe():
+        async with AsyncSessionLocal() as db:
+            await fact_check_jobs.subscribe(db, page_id=page_id, job_id=job["id"])
+        return fact_check_jobs.stats()["subscribers"]
+
+    assert client.portal.call(subscribe) == 0
+
+def test_finished_stream_leaves_no_listener(client, monkeypatch, page_id):
+    _verdicts(monkeypatch, CORRECT)
+    job = _run_job(client, page_id)
+
+    with client.stream("GET", f"/api/pages/{page_id}/fact-check/{job['id']}/stream?format=ndjson") as response:
+        events = [line for line in response.iter_lines() if line]
+    assert '"event": "completed"' in events[-2]
+    assert fact_check_jobs.stats()["subscribers"] == 0
@@ -0,0 +1,66 @@
+import pytest
+
+from app.core.config import settings
+from app.services.knowledge_index import KnowledgeIndex
+
+CORPUS = (
+    "The Eiffel Tower is located in Paris, France.\n\n"
+    "Water boils at 100 degrees Celsius at sea level.\n\n"
+    "Honey bees communicate the location of flowers through a waggle dance.\n"
+)
+
+@pytest.fixture
+def index(tmp_path):
+    (tmp_path / "corpus").mkdir()
+    (tmp_path / "corpus" / "facts.md").write_text(CORPUS, encoding="utf-8")
+    knowledge = KnowledgeIndex(str(tmp_path / "corpus"), str(tmp_path / "index"), dimensions=256)
+    knowledge.load()
+    return knowledge
+
+def test_restated_claim_is_answered_locally(index):
+    verdict = index.answer("The Eiffel Tower is located in Paris, France.")
+    assert verdict is not None
+    assert verdict["result"].startswith("Correct.")
+    assert verdict["sources"] == ["facts.md: The Eiffel Tower is located in Paris, France."]
+
+def test_negated_claim_is_not_answered(index):
+    assert index.answer("The Eiffel Tower is not located in Paris, France.") is None
+
+def test_changed_number_is_not_answered(index):
+    assert index.answer("Water boils at 90 degrees Celsius at sea level.") is None
+
+def test_unrelated_claim_is_not_answered(index):
+    assert index.answer("The Great Wall of China is visible from space.") is None
+    assert index.local_answers == 0
+
+def test_related_passages_are_offered_as_context(index):
+    passages = index.context(["Honey bees find flowers with a dance."])
+    assert passages
+    assert "waggle dance" in passages[0].text
+
+def test_index_is_reused_until_the_corpus_changes(tmp_path, index):
+    reopened = KnowledgeIndex(str(tmp_path / "corpus"), str(tmp_path / "index"), dimensions=256)
+    reopened.load()
+    assert [passage.text for passage in reopened.passages] == [passage.text for passage in index.passages]
+
+    (tmp_path / "corpus" / "more.txt").write_text("Mount Everest is the highest mountain above sea level.")
+    reopened.load()
+    assert len(reopened.passages) == len(index.passages) + 1
+
+def test_contradicting_claim_goes_to_a_provider_with_the_passage(tmp_path, monkeypatch):
+    # However close the score, a changed term is left to a provider
+    monkeypatch.setattr(settings, "knowledge_answer_threshold", 0.0)
+    (tmp_path / "corpus").mkdir()
+    (tmp_path / "corpus" / "health.md").write_text(
+        "Moderate coffee consumption decreases the risk of type 2 diabetes.\n", encoding="utf-8"
+    )
+    knowledge = KnowledgeIndex(str(tmp_path / "corpus"), str(tmp_path / "index"), dimensions=256)
+    knowledge.load()
+    claim = "Moderate coffee consumption increases the risk of type 2 diabetes."
+
+    assert knowledge.answer(claim) is None
+    assert [passage.source for passage in knowledge.context([claim])] == ["health.md"]
+
+def test_restatement_differing_in_stopwords_is_answered(index):
+    assert index.answer("The Eiffel Tower is located in Paris France") is not None
+    assert index.answer("Paris, France is where the Eiffel Tower is located.") is None
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.services.near_duplicate_cache import NearDuplicateCache
+
+VERDICT = {"result": "Correct.", "confidence": 0.9, "sources": ["Test"]}
+
+def _cache(text):
+    cache = NearDuplicateCache(threshold=0.7, max_entries=100, ttl=0, path="")
+    cache.add("key", text, VERDICT)
+    return cache
+
+@pytest.mark.parametrize("stored, claim", [
+    ("The capital of Australia is Canberra and has been for a long time.",
+     "The capital of Australia is Sydney and has been for a long time."),
+    ("Mount Everest is the highest mountain on Earth above sea level.",
+     "K2 is the highest mountain on Earth above sea level."),
+    ("Napoleon Bonaparte was born in France on the island of Corsica.",
+     "Napoleon Bonaparte was born in Germany on the island of Corsica."),
+])
+def test_entity_swap_is_not_reused(stored, claim):
+    assert _cache(stored).lookup(claim) is None
+
+@pytest.mark.parametrize("stored, claim", [
+    ("The Sun orbits the Earth once every year.", "The Earth orbits the Sun once every year."),
+    ("Drinking coffee increases the risk of heart disease in adults.",
+     "Drinking coffee decreases the risk of heart disease in adults."),
+    ("The flu vaccine is effective at preventing influenza in older adults.",
+     "The flu vaccine is ineffective at preventing influenza in older adults."),
+])
+def test_contradicting_claim_is_not_reused(stored, claim):
+    assert _cache(stored).lookup(claim) is None
+
+def test_rewording_with_same_entities_is_reused():
+    cache = _cache("The capital of Australia is Canberra and has been for a long time.")
+
+    result = cache.lookup("The capital of Australia is Canberra and it has been for a long time.")
+
+    assert result is not None
+    assert result["result"] == VERDICT["result"]
+
+def test_rewording_may_only_change_stopwords():
+    cache = _cache("The Great Wall of China was built over many centuries by several dynasties.")
+    assert cache.lookup("The Great Wall of China was built over many centuries by many dynasties.") is None
+    assert cache.lookup("The Great Wall of China has been built over many centuries by several dynasties.") is not None
+
+def test_different_number_is_not_reused():
+    cache = _cache("Water boils at 100 degrees Celsius at sea level on Earth.")
+    assert cache.lookup("Water boils at 90 degrees Celsius at sea level on Earth.") is None
+
+def test_negated_claim_is_not_reused():
+    cache = _cache("The Great Wall of China is visible from space with the naked eye.")
+    assert cache.lookup("The Great Wall of China is not visible from space with the naked eye.") is None
+
+def test_entries_are_replayed_from_the_log(tmp_path):
+    path = str(tmp_path / "near_duplicates.jsonl")
+    cache = NearDuplicateCache(threshold=0.7, max_entries=100, ttl=0, path=path)
+
+    async def add_claim():
+        cache.add("key", "The capital of Australia is Canberra and has been for a long time.", VERDICT)
+        await cache.flush()
+
+    asyncio.run(add_claim())
+
+    restarted = NearDuplicateCache(threshold=0.7, max_entries=100, ttl=0, path=path)
+    restarted.load()
+    assert restarted.lookup("The capital of Australia is Canberra and it has been for a long time.") is not None
+
+def test_compaction_keeps_records_of_every_process(tmp_path):
+    path = str(tmp_path / "near_duplicates.jsonl")
+    # Two workers sharing one file; compaction runs once a file passes 2 * max_entries lines
+    workers = [NearDuplicateCache(threshold=0.7, max_entries=4, ttl=0, path=path) for _ in range(2)]
+
+    async def add_claims():
+        for index in range(6):
+            for worker, name in zip(workers, ("Alpha", "Beta")):
+                worker.add(f"{name}-{index}", f"{name} Station number {index} opened in the year {1900 + index}.",
+                           VERDICT)
+                await worker.flush()
+
+    asyncio.run(add_claims())
+
+    restarted = NearDuplicateCache(threshold=0.7, max_entries=4, ttl=0, path=path)
+    restarted.load()
+    assert restarted.stats()["entries"] == 4
+    # The newest claims of both workers survive, not just those of the last one to compact
+    assert restarted.lookup("Alpha Station number 5 opened in the year 1905.") is not None
+    assert restarted.lookup("Beta Station number 5 opened in the year 1905.") is not None
+    assert not list(tmp_path.glob("*.tmp"))
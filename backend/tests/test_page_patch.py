@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+from app.schemas.page import PagePatch
+from app.services.page_service import page_service
+
+CONTENT = [{"type": "paragraph", "children": [{"text": "Hello"}]}]
+
+def _create_page(client):
+    response = client.post("/api/pages/", json={"title": "Patch me", "content": CONTENT})
+    assert response.status_code == 200
+    return response.json()
+
+def test_slate_operation_is_applied(client):
+    page = _create_page(client)
+
+    response = client.patch(f"/api/pages/{page['id']}", json={
+        "baseVersion": page["version"],
+        "operations": [{"type": "insert_text", "path": [0, 0], "offset": 5, "text": " world"}],
+    })
+    assert response.status_code == 200
+    assert response.json()["version"] == page["version"] + 1
+
+    stored = client.get(f"/api/pages/{page['id']}").json()
+    assert stored["content"][0]["children"][0]["text"] == "Hello world"
+
+def test_json_patch_is_applied(client):
+    page = _create_page(client)
+
+    response = client.patch(f"/api/pages/{page['id']}", json={
+        "baseVersion": page["version"],
+        "title": "Patched",
+        "patch": [{"op": "replace", "path": "/0/children/0/text", "value": "Bye"}],
+    })
+    assert response.status_code == 200
+
+    stored = client.get(f"/api/pages/{page['id']}").json()
+    assert stored["title"] == "Patched"
+    assert stored["content"][0]["children"][0]["text"] == "Bye"
+
+def test_stale_base_version_is_a_conflict(client):
+    page = _create_page(client)
+    first = client.patch(f"/api/pages/{page['id']}", json={"baseVersion": page["version"], "title": "One"})
+    assert first.status_code == 200
+
+    response = client.patch(f"/api/pages/{page['id']}", json={"baseVersion": page["version"], "title": "Two"})
+    assert response.status_code == 409
+    assert response.json()["detail"]["currentVersion"] == page["version"] + 1
+    assert client.get(f"/api/pages/{page['id']}").json()["title"] == "One"
+
+def test_unappliable_patch_is_rejected(client):
+    page = _create_page(client)
+
+    response = client.patch(f"/api/pages/{page['id']}", json={
+        "baseVersion": page["version"],
+        "patch": [{"op": "remove", "path": "/7"}],
+    })
+    assert response.status_code == 422
+
+def test_unknown_page_is_not_found(client):
+    response = client.patch("/api/pages/missing", json={"baseVersion": 1, "title": "Nope"})
+    assert response.status_code == 404
+
+def test_only_plain_replacements_are_pushed_down():
+    postgres = SimpleNamespace(bind=SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+    sqlite = SimpleNamespace(bind=SimpleNamespace(dialect=SimpleNamespace(name="sqlite")))
+    replace = PagePatch(baseVersion=1, patch=[{"op": "replace", "path": "/0/children/0/text", "value": "x"}])
+    insert = PagePatch(baseVersion=1, patch=[{"op": "add", "path": "/1", "value": {"text": "x"}}])
+
+    assert page_service._can_patch_in_database(postgres, replace)
+    assert not page_service._can_patch_in_database(postgres, insert)
+    assert not page_service._can_patch_in_database(sqlite, replace)
@@ -0,0 +1,8 @@
+def test_summaries_use_the_page_key_convention(client):
+    page = client.post("/api/pages/", json={"title": "Summary", "content": []}).json()
+
+    items = client.get("/api/pages/summaries", params={"limit": 500}).json()["items"]
+    summary = next(item for item in items if item["id"] == page["id"])
+
+    assert set(summary) == {"id", "title", "updated_at", "is_public"}
+    assert (summary["updated_at"], summary["is_public"]) == (page["updated_at"], page["is_public"])
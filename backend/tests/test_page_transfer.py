@@ -0,0 +1,46 @@
+import gzip
+import json
+
+CONTENT = [{"type": "paragraph", "children": [{"text": "Exported text"}]}]
+
+def _export(client, compress=False):
+    response = client.get("/api/pages/export", params={"gzip": compress})
+    assert response.status_code == 200
+    # TestClient decodes Content-Encoding, not an attachment's own gzip
+    body = gzip.decompress(response.content) if compress else response.content
+    return [json.loads(line) for line in body.splitlines()]
+
+def test_export_import_round_trip(client):
+    page = client.post("/api/pages/", json={"title": "Round trip", "content": CONTENT}).json()
+    line = next(line for line in _export(client) if line["id"] == page["id"])
+    assert line["content"] == CONTENT
+    client.delete(f"/api/pages/{page['id']}")
+
+    response = client.post("/api/pages/import", content=json.dumps(line).encode() + b"\n")
+    assert response.json() == {"imported": 1, "skipped": 0, "failed": 0, "errors": []}
+
+    restored = client.get(f"/api/pages/{page['id']}").json()
+    assert restored["title"] == "Round trip"
+    assert restored["content"] == CONTENT
+    assert restored["created_at"] == page["created_at"]
+
+    # Importing the same file again leaves the existing page alone
+    response = client.post("/api/pages/import", content=json.dumps(line).encode() + b"\n")
+    assert response.json()["skipped"] == 1
+
+def test_gzip_round_trip(client):
+    page = client.post("/api/pages/", json={"title": "Compressed", "content": CONTENT}).json()
+    line = next(line for line in _export(client, compress=True) if line["id"] == page["id"])
+    client.delete(f"/api/pages/{page['id']}")
+
+    response = client.post("/api/pages/import", content=gzip.compress(json.dumps(line).encode()))
+    assert response.json()["imported"] == 1
+    assert client.get(f"/api/pages/{page['id']}").json()["title"] == "Compressed"
+
+def test_invalid_lines_are_reported_and_skipped(client):
+    body = b'{"content": []}\nnot json\n{"title": "Imported", "content": []}\n'
+
+    result = client.post("/api/pages/import", content=body).json()
+
+    assert (result["imported"], result["failed"]) == (1, 2)
+    assert [error["line"] for error in result["errors"]] == [1, 2]
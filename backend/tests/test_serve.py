@@ -0,0 +1,15 @@
+from app.core.config import settings
+from app.serve import worker_environment
+
+def test_single_worker_keeps_the_configuration():
+    assert worker_environment(1) == {}
+
+def test_process_local_state_is_off_with_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "autosave_coalesce_interval", 2.0)
+    monkeypatch.setattr(settings, "gemini_rpm", 60)
+
+    environment = worker_environment(4)
+
+    assert environment["AUTOSAVE_COALESCE_INTERVAL"] == "0"
+    assert environment["SHARED_PAGE_CACHE_SIZE"] == "0"
+    assert environment["GEMINI_RPM"] == "15"
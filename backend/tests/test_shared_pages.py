@@ -0,0 +1,26 @@
+from app.services.shared_page_cache import shared_page_cache
+from app.services.write_coalescer import write_coalescer
+
+def _shared_page(client):
+    page = client.post("/api/pages/", json={"title": "Public", "content": []}).json()
+    token = client.post(f"/api/pages/{page['id']}/share").json()["shareToken"]
+    return page["id"], token
+
+def test_shared_page_includes_buffered_autosave(client, monkeypatch):
+    page_id, token = _shared_page(client)
+    monkeypatch.setattr(write_coalescer, "interval", 60.0)
+    shared_page_cache.clear()
+
+    client.put(f"/api/pages/{page_id}", json={"title": "Public, edited"})
+
+    assert client.get(f"/api/pages/shared/{token}").json()["title"] == "Public, edited"
+
+def test_unshared_page_is_not_cacheable(client):
+    page_id, token = _shared_page(client)
+    assert client.get(f"/api/pages/shared/{token}").status_code == 200
+
+    client.delete(f"/api/pages/{page_id}/share")
+
+    response = client.get(f"/api/pages/shared/{token}")
+    assert response.status_code == 404
+    assert response.headers["cache-control"] == "no-store"
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.schemas.page import PageUpdate
+from app.services.page_service import VersionConflictError, page_service
+from app.services.write_coalescer import write_coalescer
+
+CONTENT = [{"type": "paragraph", "children": [{"text": "Staged"}]}]
+
+@pytest.fixture
+def buffered(client, monkeypatch):
+    monkeypatch.setattr(write_coalescer, "interval", 60.0)
+    page = client.post("/api/pages/", json={"title": "Draft", "content": []}).json()
+    response = client.put(f"/api/pages/{page['id']}", json={"title": "Edited"})
+    assert response.status_code == 200
+    return page["id"]
+
+def test_if_match_mismatch_is_a_conflict(client):
+    page = client.post("/api/pages/", json={"title": "Draft", "content": []}).json()
+
+    response = client.put(f"/api/pages/{page['id']}", json={"title": "Edited"}, headers={"If-Match": '"5"'})
+    assert response.status_code == 409
+    assert response.headers["ETag"] == f'"{page["version"]}"'
+
+    response = client.put(f"/api/pages/{page['id']}", json={"title": "Edited"},
+                          headers={"If-Match": f'"{page["version"]}"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"{page["version"] + 1}"'
+
+def test_invalid_if_match_is_rejected(client):
+    page = client.post("/api/pages/", json={"title": "Draft", "content": []}).json()
+    response = client.put(f"/api/pages/{page['id']}", json={"title": "Edited"}, headers={"If-Match": "abc"})
+    assert response.status_code == 400
+
+def test_buffered_write_is_flushed_on_read(client, buffered):
+    assert write_coalescer.stats()["pending"] >= 1
+
+    response = client.get(f"/api/pages/{buffered}")
+    assert response.json()["title"] == "Edited"
+    assert response.headers["ETag"] == '"2"'
+
+def test_burst_of_puts_is_one_write(client, buffered):
+    flushed = write_coalescer.flushed
+
+    # Each response predicts the version the single flush will produce
+    for title in ("Second", "Third"):
+        response = client.put(f"/api/pages/{buffered}", json={"title": title}, headers={"If-Match": '"2"'})
+        assert response.status_code == 200
+        assert response.json()["version"] == 2
+
+    page = client.get(f"/api/pages/{buffered}").json()
+    assert page["title"] == "Third"
+    assert page["version"] == 2
+    assert write_coalescer.flushed == flushed + 1
+
+def test_failed_flush_keeps_the_write(client, monkeypatch, buffered):
+    update_page = page_service.update_page
+    calls = []
+
+    async def failing_once(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        return await update_page(*args, **kwargs)
+
+    monkeypatch.setattr(page_service, "update_page", failing_once)
+
+    # The failure is logged, not raised into the unrelated request
+    assert client.get(f"/api/pages/{buffered}/versions").status_code == 200
+    assert client.get(f"/api/pages/{buffered}").json()["title"] == "Edited"
+
+def test_dropped_write_is_reported_to_the_next_put_only(client, monkeypatch, buffered):
+    update_page = page_service.update_page
+
+    async def conflicting(*args, **kwargs):
+        raise VersionConflictError(7)
+
+    monkeypatch.setattr(page_service, "update_page", conflicting)
+
+    # Reads are not failed by a write the reader never made
+    response = client.get(f"/api/pages/{buffered}")
+    assert response.status_code == 200
+    assert response.json()["title"] == "Draft"
+
+    monkeypatch.setattr(page_service, "update_page", update_page)
+    response = client.put(f"/api/pages/{buffered}", json={"title": "Again"})
+    assert response.status_code == 409
+    # Reported once
+    assert client.put(f"/api/pages/{buffered}", json={"title": "Again"}).status_code == 200
+
+def test_flush_waits_for_a_put_being_staged(client, monkeypatch, buffered):
+    get_page = page_service.get_page
+    flushes = []
+
+    async def get_page_then_flush(db, page_id):
+        page = await get_page(db, page_id=page_id)
+        if not flushes:
+            # A background flush starting while the PUT is between reading and staging
+            flushes.append(asyncio.create_task(write_coalescer.flush_page(page_id)))
+            await asyncio.sleep(0.05)
+        return page
+
+    async def put_during_flush():
+        async with AsyncSessionLocal() as db:
+            await write_coalescer.submit(db, buffered, PageUpdate(content=CONTENT))
+        await flushes[0]
+
+    conflicts = write_coalescer.conflicts
+    monkeypatch.setattr(page_service, "get_page", get_page_then_flush)
+    client.portal.call(put_during_flush)
+    monkeypatch.setattr(page_service, "get_page", get_page)
+
+    page = client.get(f"/api/pages/{buffered}").json()
+    assert page["title"] == "Edited"
+    assert page["content"] == CONTENT
+    assert page["version"] == 2
+    assert write_coalescer.conflicts == conflicts
+
+def test_put_after_dropped_write_conflicts(client, monkeypatch, buffered):
+    async def conflicting(*args, **kwargs):
+        raise VersionConflictError(7)
+
+    monkeypatch.setattr(page_service, "update_page", conflicting)
+    client.get(f"/api/pages/{buffered}/versions")
+
+    response = client.put(f"/api/pages/{buffered}", json={"title": "Again"})
+    assert response.status_code == 409